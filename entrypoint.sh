@@ -47,6 +47,10 @@ echo "from django.contrib.auth.models import User; User.objects.create_superuser
 echo "Run google Oauth update"
 python setup_google_oauth.py
 
+# Start the background job worker (cinema cache refreshes queued from the web UI)
+echo "Starting background job worker..."
+python manage.py run_background_jobs &
+
 # Start Gunicorn
 echo "Starting Gunicorn server..."
 exec gunicorn --bind 0.0.0.0:8080 \
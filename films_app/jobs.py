@@ -0,0 +1,211 @@
+import glob
+import io
+import logging
+import os
+import socket
+import threading
+import traceback
+from django.conf import settings
+from django.core.management import call_command
+from .models import BackgroundJob
+from .leases import REFRESH_LEASE, hold_lease
+from .tmdb_cache import get_disk_cache
+from .utils import get_cache_directory
+
+logger = logging.getLogger(__name__)
+
+# Seconds between writes of buffered job output to the database
+LOG_FLUSH_INTERVAL = 2.0
+
+# Seconds a running job's lease survives without a heartbeat from its worker
+JOB_LEASE_TTL = getattr(settings, 'JOB_LEASE_TTL', 300)
+
+
+class JobLog(io.TextIOBase):
+    """
+    File-like object that collects a job's output and appends it to the job's log.
+
+    Management commands run by a job write to it through their stdout and
+    stderr. Output is buffered and written to the database by a single
+    flusher thread every LOG_FLUSH_INTERVAL seconds, so progress can be polled
+    while the job runs and worker threads never write to the database
+    themselves.
+
+    Usage:
+        with JobLog(job) as log:
+            call_command('update_movie_cache', stdout=log, stderr=log)
+    """
+
+    def __init__(self, job, flush_interval=LOG_FLUSH_INTERVAL):
+        super().__init__()
+        self.job = job
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name=f'job-{job.pk}-log', daemon=True)
+
+    def __enter__(self):
+        self._flusher.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stopped.set()
+        self._flusher.join()
+        self._write_buffer()
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        with self._lock:
+            self._buffer.append(text)
+        return len(text)
+
+    def _write_buffer(self):
+        with self._lock:
+            text, self._buffer = ''.join(self._buffer), []
+        if text:
+            self.job.append_log(text)
+
+    def _flush_periodically(self):
+        from django.db import connection
+        try:
+            while not self._stopped.wait(self.flush_interval):
+                self._write_buffer()
+        finally:
+            connection.close()
+
+
+def cleanup_cache_files(log=None):
+    """
+    Evict expired and over-budget TMDB cache entries and remove leftover JSON cache files.
+
+    Shared by cache refresh jobs and the update_cinema_cache.py script.
+
+    Args:
+        log (JobLog, optional): Also receives the progress messages, which
+            always go to the module logger
+    """
+    def report(message, level=logging.INFO):
+        logger.log(level, message)
+        if log is not None:
+            log.write(f"{message}\n")
+
+    report("Cleaning up cache files")
+
+    # Fresh and stale-but-servable entries are kept so the refresh starts warm
+    disk_cache = get_disk_cache()
+    expired_count = disk_cache.evict_expired()
+    oversized_count = disk_cache.enforce_size_limit()
+    report(f"Evicted {expired_count} expired and {oversized_count} over-budget entries from the TMDB cache")
+
+    # Find any remaining JSON files (e.g. from the old one-file-per-entry cache)
+    json_files = glob.glob(os.path.join(get_cache_directory(), "*.json"))
+
+    deleted_count = 0
+    for file_path in json_files:
+        file_name = os.path.basename(file_path)
+
+        # Skip cache info files
+        if file_name in ['cache_info.json', 'cinema_cache_info.json']:
+            continue
+
+        try:
+            os.remove(file_path)
+            deleted_count += 1
+            report(f"Deleted cache file: {file_name}")
+        except Exception as e:
+            report(f"Error deleting cache file {file_name}: {str(e)}", logging.WARNING)
+
+    report(f"Cleaned up {deleted_count} cache files")
+
+
+def refresh_cinema_cache(log, max_pages=0):
+    """
+    Flag films for status checks and refresh the cinema cache.
+
+    Args:
+        log (JobLog): Receives the commands' output
+        max_pages (int): Maximum number of discover pages per movie type (0 for all)
+    """
+    # Fails the job straight away if the cron script or another worker is refreshing
+    with hold_lease(REFRESH_LEASE):
+        cleanup_cache_files(log)
+
+        log.write("\nScheduling status checks...\n")
+        call_command('update_release_status', stdout=log, stderr=log)
+
+        log.write("\nUpdating the cinema cache...\n")
+        call_command(
+            'update_movie_cache',
+            force=True,
+            max_pages=max_pages,
+            batch_size=15,
+            prioritize_flags=True,
+            time_window_months=6,
+            use_parallel=True,
+            resume=True,          # Continue an interrupted run instead of starting over
+            stdout=log,
+            stderr=log,
+        )
+
+
+# Handler for each BackgroundJob.job_type; called with the job's log and options
+JOB_HANDLERS = {
+    'refresh_cinema_cache': refresh_cinema_cache,
+}
+
+
+def worker_name():
+    """Identify this worker process as host:pid."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_job(job_type, user=None, **options):
+    """
+    Queue a job, or return the unfinished job of the same type if there is one.
+
+    Args:
+        job_type (str): One of BackgroundJob.JOB_TYPE_CHOICES
+        user (User, optional): The user who requested the job
+        **options: Keyword arguments for the job handler
+
+    Returns:
+        tuple: (job, created)
+    """
+    # A job left running by a crashed worker would otherwise block new ones forever
+    BackgroundJob.fail_abandoned(JOB_LEASE_TTL)
+    pending = BackgroundJob.objects.filter(job_type=job_type, status__in=['queued', 'running']).first()
+    if pending:
+        return pending, False
+    job = BackgroundJob.objects.create(job_type=job_type, created_by=user, options=options)
+    logger.info(f"Queued {job}")
+    return job, True
+
+
+def run_job(job):
+    """
+    Run a claimed job, recording its output and final status.
+
+    The worker holds the job's lease while it runs, renewed in the background.
+
+    Args:
+        job (BackgroundJob): A job in the running state, see BackgroundJob.claim_next
+
+    Returns:
+        bool: True if the job succeeded
+    """
+    with JobLog(job) as log:
+        try:
+            # The lease's heartbeat shows the job is still alive; see BackgroundJob.fail_abandoned
+            with hold_lease(job.lease_name, ttl=JOB_LEASE_TTL):
+                JOB_HANDLERS[job.job_type](log, **job.options)
+        except Exception as e:
+            log.write(f"\nJob failed: {e}\n")
+            logger.error(f"{job} failed: {e}\n{traceback.format_exc()}")
+            status = 'failed'
+        else:
+            status = 'succeeded'
+    job.finish(status)
+    return status == 'succeeded'
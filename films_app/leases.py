@@ -0,0 +1,119 @@
+import logging
+import os
+import socket
+import threading
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import connection
+from .models import Lease
+
+logger = logging.getLogger(__name__)
+
+# Lease taken by every entry point that runs a cinema cache refresh
+REFRESH_LEASE = 'cinema-refresh'
+
+# Prefix of the work-item leases for the discover pages of a refresh run
+PAGE_LEASE_PREFIX = 'refresh-page:'
+
+DEFAULT_LEASE_TTL = 300
+
+# Leases held by this process, with their nesting depth, so an entry point
+# that calls another (the cron script calling update_movie_cache) re-enters
+# its own lease instead of locking itself out
+_held = {}
+_held_lock = threading.Lock()
+
+
+class LeaseUnavailable(Exception):
+    """Raised when a lease is held by another owner."""
+
+    def __init__(self, name, holder=None):
+        self.name = name
+        self.holder = holder
+        super().__init__(f"Lease {name} is held by {holder or 'another process'}")
+
+
+def lease_owner():
+    """Identify the calling thread across hosts and processes as host:pid:thread."""
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+class LeaseHeartbeat(threading.Thread):
+    """Background thread renewing a lease until stopped."""
+
+    def __init__(self, lease, ttl):
+        super().__init__(name=f'lease-heartbeat-{lease.name}', daemon=True)
+        self.lease = lease
+        self.ttl = ttl
+        self.lost = False
+        self._stopped = threading.Event()
+
+    def run(self):
+        try:
+            # Renew well before expiry so a slow renewal does not lose the lease
+            while not self._stopped.wait(self.ttl / 3):
+                if not self.lease.renew(self.ttl):
+                    self.lost = True
+                    logger.error(f"Lost lease {self.lease.name} to another owner")
+                    return
+        finally:
+            connection.close()
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+@contextmanager
+def hold_lease(name, ttl=None):
+    """
+    Hold a named lease for the duration of the block, renewing it in the background.
+
+    Re-entering a lease already held by the calling thread is allowed and
+    does not release it early.
+
+    Args:
+        name (str): The resource name, e.g. REFRESH_LEASE
+        ttl (float, optional): Seconds a lease survives without a heartbeat.
+            Defaults to settings.REFRESH_LEASE_TTL.
+
+    Yields:
+        Lease: The held lease
+
+    Raises:
+        LeaseUnavailable: If another owner holds the lease
+    """
+    owner = lease_owner()
+    key = (name, owner)
+    with _held_lock:
+        lease = _held.get(key)
+        if lease is not None:
+            lease.depth += 1
+    if lease is not None:
+        try:
+            yield lease
+        finally:
+            with _held_lock:
+                lease.depth -= 1
+        return
+
+    ttl = ttl or getattr(settings, 'REFRESH_LEASE_TTL', DEFAULT_LEASE_TTL)
+    lease = Lease.acquire(name, owner, ttl)
+    if lease is None:
+        holder = Lease.objects.filter(name=name).values_list('owner', flat=True).first()
+        raise LeaseUnavailable(name, holder)
+
+    lease.depth = 1
+    heartbeat = LeaseHeartbeat(lease, ttl)
+    heartbeat.start()
+    with _held_lock:
+        _held[key] = lease
+    logger.info(f"Acquired lease {name} as {owner}")
+    try:
+        yield lease
+    finally:
+        heartbeat.stop()
+        with _held_lock:
+            del _held[key]
+        lease.release()
+        logger.info(f"Released lease {name}")
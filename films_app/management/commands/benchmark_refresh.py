@@ -0,0 +1,254 @@
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.defaultfilters import filesizeformat
+from films_app import tmdb_cache, tmdb_client
+from films_app.models import RefreshReport
+from films_app.tmdb_stub import FixtureBundle, TMDBStubServer, get_default_bundle_path
+
+# Statements counted as database writes
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+# Process-wide TMDB singletons built from settings on first use; prepare()
+# drops them so they are rebuilt against the stub and the scratch cache
+TMDB_SINGLETONS = (
+    (tmdb_client, '_client'),
+    (tmdb_client, '_rate_limiter'),
+    (tmdb_client, '_concurrency'),
+    (tmdb_client, '_circuit_breaker'),
+    (tmdb_cache, '_memory_cache'),
+    (tmdb_cache, '_disk_cache'),
+)
+
+
+class QueryCounter:
+    """Database execute wrapper counting statements on every connection it is installed on."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Start counting from zero."""
+        with self._lock:
+            self.queries = 0
+            self.writes = 0
+
+    def install(self, sender=None, connection=None, **kwargs):
+        """Add the counter to a connection; usable as a connection_created receiver."""
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.queries += 1
+            if sql.lstrip()[:7].upper().startswith(WRITE_STATEMENTS):
+                self.writes += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark a full cinema cache refresh against the local TMDB stub on a scratch database'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument(
+            '--bundle',
+            default=None,
+            help='Fixture bundle to replay (default: settings.TMDB_STUB_BUNDLE)',
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=1,
+            help='Number of refreshes; the first starts with empty caches, later ones reuse them',
+        )
+        parser.add_argument(
+            '--copy-db',
+            action='store_true',
+            default=False,
+            help='Start from a copy of the current database instead of an empty one',
+        )
+        parser.add_argument('--max-pages', type=int, default=0, help='Discover pages per movie type (0 for all recorded)')
+        parser.add_argument('--use_parallel', action='store_true', default=False, help='Refresh with the parallel pipeline')
+        parser.add_argument('--max_workers', type=int, default=None, help='Ceiling for the adaptive TMDB concurrency')
+        parser.add_argument('--engine', choices=['threads', 'async'], default='threads', help='Fetch engine')
+        parser.add_argument(
+            '--requests-per-second',
+            type=float,
+            default=None,
+            help='Override TMDB_REQUESTS_PER_SECOND; 0 disables the rate limiter',
+        )
+        parser.add_argument('--latency-ms', type=float, default=0, help='Latency added to every stub response')
+        parser.add_argument('--jitter-ms', type=float, default=0, help='Maximum random deviation from --latency-ms')
+        parser.add_argument('--error-rate', type=float, default=0, help='Share of stub responses that are 503s (0-1)')
+        parser.add_argument('--throttle-rate', type=float, default=0, help='Share of stub responses that are 429s (0-1)')
+        parser.add_argument('--seed', type=int, default=1, help='Seed for injected latency and failures')
+        parser.add_argument('--json', action='store_true', default=False, help='Print the results as JSON')
+
+    def handle(self, *args, **options):
+        """Handle the command."""
+        path = options['bundle'] or get_default_bundle_path()
+        if not os.path.exists(path):
+            raise CommandError(f'Fixture bundle {path} does not exist; record one with tmdb_stub --record')
+        connection = connections['default']
+        if connection.vendor != 'sqlite':
+            raise CommandError('benchmark_refresh runs on a scratch SQLite database and needs the SQLite backend')
+
+        bundle = FixtureBundle.load(path)
+        server = TMDBStubServer(
+            bundle,
+            latency=options['latency_ms'] / 1000,
+            jitter=options['jitter_ms'] / 1000,
+            error_rate=options['error_rate'],
+            throttle_rate=options['throttle_rate'],
+            seed=options['seed'],
+        ).start()
+        workdir = tempfile.mkdtemp(prefix='benchmark-refresh-')
+        counter = QueryCounter()
+        try:
+            self.prepare(server, workdir, options['copy_db'], options['requests_per_second'])
+            counter.install(connection=connection)
+            connection_created.connect(counter.install)
+
+            results = []
+            for number in range(1, options['runs'] + 1):
+                counter.reset()
+                results.append(self.run_refresh(number, counter, options))
+            stub_stats = server.stats()
+        finally:
+            connection_created.disconnect(counter.install)
+            server.stop()
+            connection.close()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        if options['json']:
+            self.stdout.write(json.dumps({'runs': results, 'stub': stub_stats}, indent=2))
+            return
+        self.stdout.write(f'Replayed {len(bundle)} recorded responses from {path}')
+        for result in results:
+            self.write_result(result)
+        self.stdout.write(
+            f'Stub served {stub_stats["requests"]} requests: {stub_stats["misses"]} not recorded, '
+            f'{stub_stats["errors_injected"]} 503s and {stub_stats["throttles_injected"]} 429s injected'
+        )
+
+    def prepare(self, server, workdir, copy_db, requests_per_second):
+        """Point TMDB traffic at the stub and the database and caches at scratch files.
+
+        Args:
+            server (TMDBStubServer): The running stub
+            workdir (str): Directory for the scratch database and disk cache
+            copy_db (bool): Whether to start from a copy of the current database
+            requests_per_second (float): Rate limit override, or None
+        """
+        # The TMDB client, rate limiter and caches read these when first used,
+        # so any already built are dropped below. The details TTLs in tmdb_api
+        # are read at import and are not overridden.
+        settings.TMDB_API_BASE_URL = server.url
+        settings.TMDB_API_KEY = settings.TMDB_API_KEY or 'benchmark'
+        settings.TMDB_CACHE_DB_PATH = os.path.join(workdir, 'tmdb_cache.sqlite3')
+        if requests_per_second is not None:
+            settings.TMDB_REQUESTS_PER_SECOND = requests_per_second
+        for module, name in TMDB_SINGLETONS:
+            setattr(module, name, None)
+
+        connection = connections['default']
+        scratch_path = os.path.join(workdir, 'db.sqlite3')
+        if copy_db:
+            connection.ensure_connection()
+            target = sqlite3.connect(scratch_path)
+            connection.connection.backup(target)
+            target.close()
+        connection.close()
+        # Worker threads open their connections from this same settings dict
+        connection.settings_dict['NAME'] = scratch_path
+        call_command('migrate', verbosity=0, interactive=False)
+
+    def run_refresh(self, number, counter, options):
+        """Run one forced refresh and collect its metrics.
+
+        Args:
+            number (int): Run number, starting at 1
+            counter (QueryCounter): Counter installed on every connection
+            options (dict): Command options
+
+        A refresh that fails, e.g. once injected errors trip the circuit
+        breaker, is recorded as a failed run and the benchmark carries on.
+
+        Returns:
+            dict: The run's report metrics plus duration, throughput and database counts
+        """
+        output = self.stdout if options['verbosity'] > 1 else io.StringIO()
+        last_report = RefreshReport.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+        error = None
+        started = time.monotonic()
+        try:
+            call_command(
+                'update_movie_cache',
+                force=True,
+                max_pages=options['max_pages'],
+                use_parallel=options['use_parallel'],
+                max_workers=options['max_workers'],
+                engine=options['engine'],
+                stdout=output,
+                stderr=output,
+            )
+        except CommandError as e:
+            error = str(e)
+        duration = time.monotonic() - started
+
+        report = RefreshReport.objects.filter(pk__gt=last_report).order_by('-pk').first()
+        metrics = report.metrics if report else {}
+        rows = metrics.get('rows', {})
+        tmdb = metrics.get('tmdb', {})
+        films = rows.get('created', 0) + rows.get('updated', 0) + rows.get('skipped', 0)
+        return {
+            'run': number,
+            'status': report.status if report else 'failed',
+            'duration': round(duration, 3),
+            'films': films,
+            'films_per_second': round(films / duration, 2) if duration else 0,
+            'calls_per_second': round(tmdb.get('total_calls', 0) / duration, 2) if duration else 0,
+            'db_queries': counter.queries,
+            'db_writes': counter.writes,
+            'error': error,
+            **metrics,
+        }
+
+    def write_result(self, result):
+        """Print one run's results."""
+        tmdb = result.get('tmdb', {})
+        details = tmdb.get('cache', {}).get('details', {})
+        hit_ratio = f'{details["hit_ratio"]:.0%}' if details else 'n/a'
+        style = self.style.SUCCESS if result['status'] == 'completed' else self.style.ERROR
+        self.stdout.write(style(
+            f'Run {result["run"]} ({"cold" if result["run"] == 1 else "warm"}, {result["status"]}): '
+            f'{result["duration"]:.2f}s, {result["films"]} films ({result["films_per_second"]}/s)'
+        ))
+        if result['error']:
+            self.stdout.write(self.style.ERROR(f'  Error: {result["error"]}'))
+        self.stdout.write(
+            f'  TMDB: {tmdb.get("total_calls", 0)} calls ({result["calls_per_second"]}/s), '
+            f'{filesizeformat(tmdb.get("bytes", 0))}, {tmdb.get("retries", 0)} retries, '
+            f'{tmdb.get("errors", 0)} errors, details cache hit ratio {hit_ratio}'
+        )
+        calls = ', '.join(f'{endpoint} {count}' for endpoint, count in tmdb.get('calls', {}).items())
+        if calls:
+            self.stdout.write(f'  Calls: {calls}')
+        phases = ', '.join(f'{phase} {seconds:.2f}s' for phase, seconds in result.get('phases', {}).items())
+        if phases:
+            self.stdout.write(f'  Phases: {phases}')
+        rows = ', '.join(f'{name} {count}' for name, count in result.get('rows', {}).items())
+        self.stdout.write(f'  Rows: {rows}')
+        self.stdout.write(f'  Database: {result["db_writes"]} writes of {result["db_queries"]} statements')
@@ -1,10 +1,10 @@
-import os
-import json
-import time
+import concurrent.futures
+from datetime import date
 from django.core.management.base import BaseCommand
 from django.conf import settings
 from films_app.models import Film
-from films_app.tmdb_api import get_movie_details, get_movie_by_imdb_id, get_uk_certification
+from films_app.tmdb_api import find_tmdb_id, get_movie_release_dates, get_uk_certification
+from films_app.tmdb_client import configure_client, get_worker_count
 
 class Command(BaseCommand):
     help = 'Fix missing UK certifications for films by checking the TMDB API'
@@ -25,83 +25,133 @@ class Command(BaseCommand):
             action='store_true',
             help='Check all films, not just those with missing certifications',
         )
+        parser.add_argument(
+            '--since',
+            type=date.fromisoformat,
+            default=None,
+            help='Only check films released in the UK on or after this date (YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--use_parallel',
+            action='store_true',
+            default=False,
+            help='Check films concurrently through the shared rate-limited TMDB client',
+        )
+        parser.add_argument(
+            '--max_workers',
+            type=int,
+            default=None,
+            help='Maximum number of concurrent TMDB requests for parallel processing',
+        )
 
     def handle(self, *args, **options):
         dry_run = options.get('dry_run', False)
         specific_film_id = options.get('film_id')
         check_all = options.get('all', False)
-        
+        since = options.get('since')
+        use_parallel = options.get('use_parallel', False)
+
         if specific_film_id:
             # Fix a specific film
             try:
                 film = Film.objects.get(imdb_id=specific_film_id)
-                self.fix_film_certification(film, dry_run)
             except Film.DoesNotExist:
                 self.stdout.write(self.style.ERROR(f"Film with ID {specific_film_id} not found"))
+                return
+            self.save_certifications([film] if self.fix_film_certification(film) else [], dry_run)
             return
-        
+
         # Get films with missing certifications or all films if check_all is True
         if check_all:
             films = Film.objects.all()
-            self.stdout.write(f"Checking all {films.count()} films for certification updates")
         else:
             films = Film.objects.filter(uk_certification__isnull=True)
-            self.stdout.write(f"Found {films.count()} films with missing UK certifications")
-        
-        updated_count = 0
-        for film in films:
-            if self.fix_film_certification(film, dry_run):
-                updated_count += 1
-            
-            # Add a small delay to avoid rate limiting
-            time.sleep(0.5)
-        
+        if since:
+            films = films.filter(uk_release_date__gte=since)
+        films = list(films)
+        scope = f" released since {since}" if since else ""
+        if check_all:
+            self.stdout.write(f"Checking all {len(films)} films{scope} for certification updates")
+        else:
+            self.stdout.write(f"Found {len(films)} films{scope} with missing UK certifications")
+
+        # Requests are paced by the shared TMDB rate limiter; changes are only
+        # collected here and written together at the end
+        if use_parallel and len(films) > 1:
+            max_workers = options.get('max_workers') or get_worker_count()
+            configure_client(max_concurrency=max_workers)
+            max_workers = max(1, min(max_workers, len(films)))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = executor.map(self.fix_film_certification, films)
+                changed = [film for film, updated in zip(films, results) if updated]
+        else:
+            changed = [film for film in films if self.fix_film_certification(film)]
+
+        self.save_certifications(changed, dry_run)
         if dry_run:
-            self.stdout.write(self.style.SUCCESS(f"Dry run completed. {updated_count} films would be updated."))
+            self.stdout.write(self.style.SUCCESS(f"Dry run completed. {len(changed)} films would be updated."))
         else:
-            self.stdout.write(self.style.SUCCESS(f"Updated certifications for {updated_count} films."))
+            self.stdout.write(self.style.SUCCESS(f"Updated certifications or TMDB IDs for {len(changed)} films."))
+
+    def save_certifications(self, films, dry_run=False):
+        """Write the new certifications and TMDB IDs of films with a single bulk update."""
+        if films and not dry_run:
+            Film.objects.bulk_update(films, ['uk_certification', 'tmdb_id'], batch_size=500)
 
-    def fix_film_certification(self, film, dry_run=False):
-        """Fix the certification for a single film"""
-        self.stdout.write(f"Checking {film.title} ({film.imdb_id})")
-        
+    def fix_film_certification(self, film):
+        """Look up the UK certification for a single film and set it on the instance if it changed.
+
+        Only the film's release dates are fetched, or taken from fresh cached
+        details. The TMDB ID stored on the film is preferred, so an IMDb
+        lookup is only needed for films that do not have one; the ID found is
+        then stored on the film so the lookup is not repeated.
+
+        Args:
+            film (Film): The film to check
+
+        Returns:
+            bool: True if the film's certification or TMDB ID changed and needs saving
+        """
+        try:
+            return self._fix_film_certification(film)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"  Error checking {film.title}: {str(e)}"))
+            return False
+
+    def _fix_film_certification(self, film):
         # Check if the film has a TMDB ID format or IMDb ID format
-        tmdb_id = None
-        if film.imdb_id.startswith('tmdb-'):
+        tmdb_id = film.tmdb_id
+        if not tmdb_id and film.imdb_id.startswith('tmdb-'):
             # Extract TMDB ID from the format "tmdb-123456"
             tmdb_id = film.imdb_id.replace('tmdb-', '')
-            self.stdout.write(f"  Using TMDB ID: {tmdb_id}")
-            movie_details = get_movie_details(tmdb_id)
-        else:
-            # This is an IMDb ID, use it directly
-            self.stdout.write(f"  Using IMDb ID: {film.imdb_id}")
-            movie_details = get_movie_by_imdb_id(film.imdb_id)
-            if movie_details:
-                tmdb_id = movie_details.get('id')
-        
-        if not movie_details:
-            self.stdout.write(self.style.WARNING(f"  Could not fetch details for {film.title}"))
+        if not tmdb_id:
+            # This is an IMDb ID without a known TMDB ID, so TMDB has to look it up
+            tmdb_id = find_tmdb_id(film.imdb_id)
+
+        # Only the release dates are needed, not the full details
+        release_dates = get_movie_release_dates(tmdb_id) if tmdb_id else None
+        if release_dates is None:
+            self.stdout.write(self.style.WARNING(f"Could not fetch release dates for {film.title} ({film.imdb_id})"))
             return False
-        
+
+        # The ID is confirmed by the fetch, so keep it for the next run
+        id_found = not film.tmdb_id
+        if id_found:
+            film.tmdb_id = int(tmdb_id)
+
         # Extract UK certification
-        release_dates = movie_details.get('release_dates', {})
         uk_certification = get_uk_certification(release_dates)
-        
+
         if not uk_certification:
-            self.stdout.write(self.style.WARNING(f"  No UK certification found for {film.title}"))
-            return False
-        
+            self.stdout.write(self.style.WARNING(f"No UK certification found for {film.title} ({film.imdb_id})"))
+            return id_found
+
         # Check if certification needs updating
         if film.uk_certification == uk_certification:
-            self.stdout.write(f"  Certification already up to date: {uk_certification}")
-            return False
-        
-        # Update the certification
+            self.stdout.write(f"Certification already up to date for {film.title}: {uk_certification}")
+            return id_found
+
         old_cert = film.uk_certification or 'None'
-        self.stdout.write(self.style.SUCCESS(f"  Updating certification from {old_cert} to {uk_certification}"))
-        
-        if not dry_run:
-            film.uk_certification = uk_certification
-            film.save(update_fields=['uk_certification'])
-        
-        return True 
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS(f"Updating certification for {film.title} from {old_cert} to {uk_certification}"))
+        film.uk_certification = uk_certification
+        return True
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
-from films_app.models import Film, Vote, CinemaVote, GenreTag, Activity, PageTracker
+from films_app.models import Film, Vote, CinemaVote, GenreTag, Activity, PageTracker, RefreshRun, Lease
+from films_app.leases import PAGE_LEASE_PREFIX
 from django.db.models import Q
 
 class Command(BaseCommand):
@@ -41,6 +42,11 @@ class Command(BaseCommand):
         PageTracker.objects.all().delete()
         self.stdout.write('Deleted all page trackers')
         
+        # Delete refresh run checkpoints
+        RefreshRun.objects.all().delete()
+        Lease.objects.filter(name__startswith=PAGE_LEASE_PREFIX).delete()
+        self.stdout.write('Deleted all refresh runs')
+        
         # Delete activities related to films
         if not keep_votes:
             Activity.objects.filter(
@@ -0,0 +1,52 @@
+import time
+from django.core.management.base import BaseCommand
+from films_app.models import BackgroundJob
+from films_app.jobs import JOB_LEASE_TTL, run_job, worker_name
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs, such as cinema cache refreshes requested from the web UI'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            default=False,
+            help='Run the jobs that are queued now and exit instead of waiting for more',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5.0,
+            help='Seconds to wait between checks of an empty queue',
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command."""
+        worker = worker_name()
+        self.stdout.write(f'Background job worker {worker} started')
+
+        # Jobs left running by a worker that crashed or was restarted
+        abandoned = BackgroundJob.fail_abandoned(JOB_LEASE_TTL)
+        if abandoned:
+            self.stdout.write(self.style.WARNING(f'Failed {abandoned} abandoned background jobs'))
+
+        processed = 0
+        while True:
+            job = BackgroundJob.claim_next(worker)
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            self.stdout.write(f'Running {job}')
+            succeeded = run_job(job)
+            processed += 1
+            if succeeded:
+                self.stdout.write(self.style.SUCCESS(f'Finished {job}'))
+            else:
+                self.stdout.write(self.style.ERROR(f'Finished {job}'))
+
+        self.stdout.write(f'Processed {processed} background jobs')
@@ -0,0 +1,75 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from films_app.tmdb_client import DEFAULT_BASE_URL
+from films_app.tmdb_stub import FixtureBundle, TMDBStubServer, get_default_bundle_path
+
+
+class Command(BaseCommand):
+    help = 'Serve recorded TMDB responses locally, or record them from the real API'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument(
+            '--bundle',
+            default=None,
+            help='Fixture bundle to replay or record into (default: settings.TMDB_STUB_BUNDLE)',
+        )
+        parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on')
+        parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+        parser.add_argument(
+            '--record',
+            action='store_true',
+            default=False,
+            help='Forward requests to --upstream and add the responses to the bundle',
+        )
+        parser.add_argument(
+            '--upstream',
+            default=DEFAULT_BASE_URL,
+            help='TMDB API root URL to record from',
+        )
+        parser.add_argument('--latency-ms', type=float, default=0, help='Latency added to every replayed response')
+        parser.add_argument('--jitter-ms', type=float, default=0, help='Maximum random deviation from --latency-ms')
+        parser.add_argument('--error-rate', type=float, default=0, help='Share of requests answered with a 503 (0-1)')
+        parser.add_argument('--throttle-rate', type=float, default=0, help='Share of requests answered with a 429 (0-1)')
+        parser.add_argument('--seed', type=int, default=None, help='Seed for injected latency and failures')
+
+    def handle(self, *args, **options):
+        """Handle the command."""
+        path = options['bundle'] or get_default_bundle_path()
+        if os.path.exists(path):
+            bundle = FixtureBundle.load(path)
+        elif options['record']:
+            bundle = FixtureBundle()
+        else:
+            raise CommandError(f'Fixture bundle {path} does not exist; record one first with --record')
+
+        server = TMDBStubServer(
+            bundle,
+            host=options['host'],
+            port=options['port'],
+            upstream=options['upstream'] if options['record'] else None,
+            latency=options['latency_ms'] / 1000,
+            jitter=options['jitter_ms'] / 1000,
+            error_rate=options['error_rate'],
+            throttle_rate=options['throttle_rate'],
+            seed=options['seed'],
+        )
+        mode = f'recording from {server.upstream}' if options['record'] else 'replaying'
+        self.stdout.write(f'TMDB stub {mode} {len(bundle)} responses from {path}')
+        self.stdout.write(f'Set TMDB_API_BASE_URL={server.url} to use it; press Ctrl+C to stop')
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            stats = server.stats()
+            self.stdout.write(
+                f'Served {stats["requests"]} requests: {stats["misses"]} not in the bundle, '
+                f'{stats["errors_injected"]} 503s and {stats["throttles_injected"]} 429s injected'
+            )
+            if options['record']:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                bundle.save(path)
+                self.stdout.write(self.style.SUCCESS(f'Saved {len(bundle)} responses to {path}'))
@@ -1,20 +1,116 @@
 import os
 import json
 import time
+import hashlib
+import queue
+import threading
 import concurrent.futures
-from django.core.management.base import BaseCommand
+from contextlib import contextmanager
+from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
+from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
-from films_app.models import Film, PageTracker
+from films_app.models import Film, Lease, PageTracker, RefreshReport, RefreshRun
+from films_app.leases import PAGE_LEASE_PREFIX, REFRESH_LEASE, LeaseHeartbeat, LeaseUnavailable, hold_lease, lease_owner
 from films_app.utils import fetch_and_update_film_from_tmdb, get_cache_directory
-from films_app.tmdb_api import search_movies, get_now_playing_movies, get_upcoming_movies, get_movie_details, get_movie_by_imdb_id, format_tmdb_data_for_film
+from films_app.tmdb_api import search_movies, get_now_playing_movies, get_upcoming_movies, get_movie_details, format_tmdb_data_for_film
+from films_app.tmdb_api import get_changed_movie_ids, invalidate_movie_details, CHANGES_MAX_DAYS, get_discover_movie_ids
+from films_app.tmdb_api import get_discover_page, format_discover_listing, find_tmdb_id, get_movie_release_dates
+from films_app.tmdb_client import CircuitBreaker, configure_client, get_circuit_breaker, get_concurrency_controller, get_request_stats, get_worker_count
+from films_app import tmdb_async
 from datetime import datetime, date, timedelta
-from django.core.cache import cache
 
-# Add locks for page processing
-PAGE_LOCK_PREFIX = 'movie_page_lock_'
-PAGE_LOCK_TIMEOUT = 300  # 5 minutes
+# Discover pages of a refresh run are handed out as leased work items, so
+# several processes can split one run; see --join
+PAGE_LEASE_TTL = getattr(settings, 'PAGE_LEASE_TTL', 300)
+PAGE_LEASE_POLL_SECONDS = 5
+
+# Films due for a status check are taken from the schedule in order of urgency;
+# the rest wait for the next run
+DEFAULT_STATUS_CHECK_LIMIT = 200
+
+# Film fields refreshed from TMDB movie details
+FILM_DETAIL_FIELDS = [
+    'tmdb_id', 'title', 'year', 'poster_url', 'director', 'plot', 'genres', 'runtime', 'actors',
+    'uk_certification', 'popularity', 'vote_count', 'vote_average', 'revenue',
+]
+
+# Film fields refreshed from a discover listing row
+FILM_LISTING_FIELDS = ['title', 'year', 'poster_url', 'popularity', 'vote_count', 'vote_average']
+
+# Film fields that only full TMDB details provide. Listing rows and details
+# are fingerprinted separately, so a film refreshed from its listing one run
+# and from its details the next is not rewritten when nothing changed.
+FILM_DETAILS_FINGERPRINT_FIELDS = [
+    field for field in FILM_DETAIL_FIELDS if field not in FILM_LISTING_FIELDS
+] + ['uk_release_date']
+
+
+def film_fingerprint(record, fields):
+    """Hash some of the TMDB content fields of a film record.
+    
+    Args:
+        record (dict): Film field values keyed by field name
+        fields (list): Fields to hash; those missing from the record are left out
+        
+    Returns:
+        str: Hex SHA-256 digest of the normalized fields
+    """
+    content = {field: record[field] for field in fields if field in record}
+    normalized = json.dumps(content, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def with_fingerprints(record):
+    """Add the listing fingerprint, and for records built from full details the details fingerprint.
+    
+    Args:
+        record (dict): A film record; it carries details_updated_at when built from full details
+        
+    Returns:
+        dict: A copy of the record with listing_fingerprint and possibly tmdb_fingerprint
+    """
+    record = dict(record, listing_fingerprint=film_fingerprint(record, FILM_LISTING_FIELDS))
+    if 'details_updated_at' in record:
+        record['tmdb_fingerprint'] = film_fingerprint(record, FILM_DETAILS_FINGERPRINT_FIELDS)
+    return record
+
+
+# Pages buffered between pipeline stages in update_movie_cache; bounds memory use
+PIPELINE_QUEUE_SIZE = 2
+
+
+def _pipeline_put(pipeline_queue, item, stop):
+    """Put an item on a pipeline queue, giving up if the pipeline is stopped.
+    
+    Returns:
+        bool: True if the item was queued
+    """
+    while not stop.is_set():
+        try:
+            pipeline_queue.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _pipeline_get(pipeline_queue, stop):
+    """Get the next item from a pipeline queue, or None once the pipeline is stopped."""
+    while not stop.is_set():
+        try:
+            return pipeline_queue.get(timeout=0.5)
+        except queue.Empty:
+            continue
+    return None
+
+
+# Number of results on a TMDB discover page
+DISCOVER_PAGE_SIZE = 20
+
+# Maximum number of values in one IN (...) lookup, below SQLite's variable limit
+ID_LOOKUP_CHUNK_SIZE = 500
 
 class Command(BaseCommand):
     help = 'Update the movie cache for cinema films'
@@ -41,8 +137,8 @@ class Command(BaseCommand):
         parser.add_argument(
             '--batch-delay',
             type=int,
-            default=2,
-            help='Delay in seconds between processing batches',
+            default=0,
+            help='Deprecated and ignored: TMDB throughput is governed by the TMDB_REQUESTS_PER_SECOND rate limiter',
         )
         parser.add_argument(
             '--time-window-months',
@@ -54,7 +150,13 @@ class Command(BaseCommand):
             '--prioritize-flags',
             action='store_true',
             default=True,
-            help='Prioritize films flagged for status checks',
+            help='Check the films that are due for a status check first',
+        )
+        parser.add_argument(
+            '--status-check-limit',
+            type=int,
+            default=DEFAULT_STATUS_CHECK_LIMIT,
+            help='Maximum number of due films to check per run, most overdue first',
         )
         parser.add_argument(
             '--use_parallel',
@@ -66,7 +168,41 @@ class Command(BaseCommand):
             '--max_workers',
             type=int,
             default=None,
-            help='Maximum number of worker threads for parallel processing',
+            help='Maximum number of concurrent TMDB requests for parallel processing '
+                 '(the actual number adapts to TMDB latency and rate limiting below this ceiling)',
+        )
+        parser.add_argument(
+            '--engine',
+            choices=['threads', 'async'],
+            default='threads',
+            help='Fetch engine for discover pages: thread pools (default) or asyncio',
+        )
+        parser.add_argument(
+            '--max-concurrency',
+            type=int,
+            default=tmdb_async.DEFAULT_CONCURRENCY,
+            help='Ceiling on concurrent TMDB requests for the async engine; the adaptive limit applies below it',
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            default=False,
+            help='Only refetch details for tracked films that changed on TMDB since the last successful sync '
+                 '(falls back to a full refresh when there is no usable sync point)',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            default=False,
+            help='Continue the most recent interrupted refresh run from its last checkpoint '
+                 '(starts a new run when there is none)',
+        )
+        parser.add_argument(
+            '--join',
+            action='store_true',
+            default=False,
+            help='Help the refresh run in progress in another process by taking discover pages it has not '
+                 'processed yet, then exit',
         )
 
     def handle(self, *args, **options):
@@ -81,21 +217,269 @@ class Command(BaseCommand):
         max_workers = options['max_workers']
         
         self.options = options  # Store options for use in other methods
+        self._discover_index = None
+        self._discover_index_lock = threading.Lock()
+        self.lease_owner = lease_owner()
+        
+        if options['engine'] == 'async' and not tmdb_async.AIOHTTP_AVAILABLE:
+            raise CommandError('The async engine requires aiohttp (pip install aiohttp)')
+        
+        # Cap the adaptive concurrency limit and size the shared TMDB connection
+        # pool to it so parallel workers reuse keep-alive connections
+        if use_parallel:
+            configure_client(max_concurrency=max_workers or get_worker_count())
+        
+        self.stdout.write(f'Starting update_movie_cache command with max_pages={max_pages}, batch_size={batch_size}, batch_delay={batch_delay}, time_window_months={time_window_months}, prioritize_flags={prioritize_flags}, use_parallel={use_parallel}, engine={options["engine"]}, incremental={options["incremental"]}')
+        
+        if options['join']:
+            with self.reporting('join'):
+                self.join_refresh_run(max_pages, time_window_months)
+            return
+        
+        # Only one refresh may run at a time across all processes and hosts
+        try:
+            with hold_lease(REFRESH_LEASE), self.reporting('refresh'):
+                self.refresh(max_pages, batch_size, batch_delay, time_window_months, prioritize_flags, use_parallel)
+        except LeaseUnavailable as e:
+            self.stdout.write(self.style.WARNING(f'Another cache refresh is already running ({e.holder}), exiting'))
+
+    @contextmanager
+    def reporting(self, mode):
+        """Record a RefreshReport for the enclosed work, whether or not it succeeds.
+        
+        Args:
+            mode (str): 'refresh' or 'join'; refresh() switches it to 'sync'
+                when the incremental sync was enough
+        """
+        stats = get_request_stats()
+        snapshot = stats.snapshot()
+        self.report_mode = mode
+        self.report_run = None
+        self.phase_times = {}
+        self.write_counts = {'created': 0, 'changed': 0, 'unchanged': 0}
+        self.status_counts = {'status_updated': 0, 'released': 0, 'left_cinemas': 0, 'no_longer_upcoming': 0}
+        started_at = timezone.now()
+        started = time.monotonic()
+        status = 'failed'
+        try:
+            yield
+            status = 'completed'
+        finally:
+            report = RefreshReport.objects.create(
+                run=self.report_run,
+                mode=self.report_mode,
+                status=status,
+                started_at=started_at,
+                finished_at=timezone.now(),
+                duration=round(time.monotonic() - started, 3),
+                metrics={
+                    'phases': self.phase_times,
+                    'tmdb': stats.report(since=snapshot),
+                    'rows': {
+                        'created': self.write_counts['created'],
+                        'updated': self.write_counts['changed'],
+                        'skipped': self.write_counts['unchanged'],
+                        **self.status_counts,
+                    },
+                    'concurrency': get_concurrency_controller().stats(),
+                },
+            )
+            tmdb = report.metrics['tmdb']
+            self.stdout.write(
+                f'Run report {report.pk}: {report.duration:.1f}s, {tmdb["total_calls"]} TMDB calls, '
+                f'{tmdb["bytes"]} bytes, {tmdb["retries"]} retries, {tmdb["errors"]} errors'
+            )
+
+    @contextmanager
+    def timed_phase(self, phase):
+        """Add the wall time of the enclosed block to the run report."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = self.phase_times.get(phase, 0) + time.monotonic() - started
+            self.phase_times[phase] = round(elapsed, 3)
+
+    def refresh(self, max_pages, batch_size, batch_delay, time_window_months, prioritize_flags, use_parallel):
+        """Run an incremental sync or a full refresh while holding the refresh lease."""
+        # Changes made on TMDB while this run is in progress are picked up by the next sync
+        sync_started_at = timezone.now()
         
-        self.stdout.write(f'Starting update_movie_cache command with max_pages={max_pages}, batch_size={batch_size}, batch_delay={batch_delay}, time_window_months={time_window_months}, prioritize_flags={prioritize_flags}, use_parallel={use_parallel}')
+        if self.options['incremental']:
+            with self.timed_phase('sync'):
+                synced = self.sync_changed_films(PageTracker.get_last_synced_at(), use_parallel)
+        else:
+            synced = False
+        if synced:
+            self.report_mode = 'sync'
+            PageTracker.mark_synced(sync_started_at)
+            self.stdout.write(self.style.SUCCESS('Successfully synced changed films'))
+            return
+        
+        run = RefreshRun.latest_resumable() if self.options['resume'] else None
+        if run:
+            self.stdout.write(f'Resuming refresh run {run.run_id} at phase {run.phase}')
+            self._take_over_run(run)
+        else:
+            # Pages completed by abandoned runs are of no further use
+            Lease.objects.filter(name__startswith=PAGE_LEASE_PREFIX).delete()
+            run = RefreshRun.objects.create(owner=self.lease_owner)
+            self.stdout.write(f'Starting refresh run {run.run_id}')
+        self.report_run = run
         
         # Update the cinema database cache
-        self.update_cinema_db_cache(
-            max_pages=max_pages, 
-            batch_size=batch_size, 
-            batch_delay=batch_delay, 
-            time_window_months=time_window_months,
-            prioritize_flags=prioritize_flags,
-            use_parallel=use_parallel
-        )
+        try:
+            self.update_cinema_db_cache(
+                max_pages=max_pages, 
+                batch_size=batch_size, 
+                batch_delay=batch_delay, 
+                time_window_months=time_window_months,
+                prioritize_flags=prioritize_flags,
+                use_parallel=use_parallel,
+                run=run
+            )
+        except Exception:
+            run.finish('failed')
+            raise
+        run.finish()
+        Lease.objects.filter(name__startswith=self._page_lease_prefix(run)).delete()
         
+        PageTracker.mark_synced(sync_started_at)
         self.stdout.write(self.style.SUCCESS('Successfully updated cinema database cache'))
-        return
+
+    def join_refresh_run(self, max_pages, time_window_months):
+        """Process discover pages of the refresh run in progress in another process.
+        
+        Pages are taken as leased work items, so this process and the one that
+        started the run never process the same page. The starting process waits
+        for pages held here before it reconciles cinema status.
+        
+        Args:
+            max_pages (int): Maximum number of pages to process per movie type (0 for all)
+            time_window_months (int): For upcoming films, the time window in months
+        """
+        run = RefreshRun.objects.filter(status='running').first()
+        if run is None:
+            self.stdout.write('No refresh run in progress to join')
+            return
+        
+        # The flagged phase may reset cinema status, so pages are only written after it
+        while not run.reached('flagged') and run.status == 'running':
+            self.stdout.write(f'Waiting for refresh run {run.run_id} to finish its flagged phase...')
+            time.sleep(PAGE_LEASE_POLL_SECONDS)
+            run.refresh_from_db()
+        
+        self.stdout.write(f'Joining refresh run {run.run_id} at phase {run.phase}')
+        self.report_run = run
+        self.fresh_films = self.get_fresh_films()
+        
+        for movie_type, window in (('now_playing', None), ('upcoming', time_window_months)):
+            run.refresh_from_db()
+            if run.status != 'running':
+                break
+            if run.reached(movie_type):
+                continue
+            self.stdout.write(f'Processing {movie_type} films...')
+            with self.timed_phase(movie_type):
+                self._process_movie_batch(movie_type, max_pages, window, run=run)
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'Finished helping refresh run {run.run_id}: created {self.write_counts["created"]}, '
+            f'changed {self.write_counts["changed"]}, unchanged {self.write_counts["unchanged"]}'
+        ))
+
+    def sync_changed_films(self, since, use_parallel):
+        """Refetch details for tracked films that changed on TMDB since the last sync.
+        
+        Args:
+            since (datetime): Start time of the last successful sync, or None
+            use_parallel (bool): Whether to fetch details with a thread pool
+            
+        Returns:
+            bool: True if the sync ran, False if a full refresh is needed instead
+        """
+        if since is None:
+            self.stdout.write('No previous sync recorded - running a full refresh')
+            return False
+        
+        if (timezone.now() - since).days >= CHANGES_MAX_DAYS:
+            self.stdout.write(f'Last sync at {since} is older than the {CHANGES_MAX_DAYS}-day changes feed - running a full refresh')
+            return False
+        
+        changed_ids = get_changed_movie_ids(since.date())
+        if changed_ids is None:
+            self.stdout.write(self.style.WARNING('Could not read the TMDB changes feed - running a full refresh'))
+            return False
+        
+        films = self.get_tracked_films(changed_ids)
+        self.stdout.write(f'{len(changed_ids)} films changed on TMDB since {since}, {len(films)} of them are tracked')
+        
+        if use_parallel and len(films) > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=get_worker_count()) as executor:
+                refreshed = list(executor.map(self.refresh_film_details, films))
+        else:
+            refreshed = [self.refresh_film_details(film) for film in films]
+        
+        self.write_counts['changed'] += sum(refreshed)
+        self.stdout.write(f'Refreshed details for {sum(refreshed)} changed films')
+        return True
+
+    def get_tracked_films(self, tmdb_ids):
+        """Get the films in the database with any of the given TMDB IDs.
+        
+        Films stored before TMDB IDs were recorded are matched by their
+        tmdb- prefixed placeholder IMDb ID.
+        
+        Args:
+            tmdb_ids (set): TMDB IDs to look up
+            
+        Returns:
+            list: Matching Film objects
+        """
+        tmdb_ids = sorted(tmdb_ids)
+        films = {}
+        for i in range(0, len(tmdb_ids), ID_LOOKUP_CHUNK_SIZE):
+            chunk = tmdb_ids[i:i + ID_LOOKUP_CHUNK_SIZE]
+            query = Q(tmdb_id__in=chunk) | Q(imdb_id__in=[f'tmdb-{tmdb_id}' for tmdb_id in chunk])
+            for film in Film.objects.filter(query):
+                films[film.pk] = film
+        return list(films.values())
+
+    def refresh_film_details(self, film):
+        """Refetch a film's TMDB details and update its stored fields.
+        
+        Cinema status flags are left alone; they are maintained by the full refresh.
+        
+        Args:
+            film (Film): The film to refresh
+            
+        Returns:
+            bool: True if the film was updated, False otherwise
+        """
+        tmdb_id = film.tmdb_id or int(film.imdb_id[len('tmdb-'):])
+        try:
+            # The cached copy predates the change, so go to TMDB
+            invalidate_movie_details(tmdb_id)
+            movie_details = get_movie_details(tmdb_id)
+            if not movie_details:
+                self.stdout.write(self.style.WARNING(f'Could not get movie details for {film.title} (TMDB ID: {tmdb_id})'))
+                return False
+            
+            movie_data = format_tmdb_data_for_film(movie_details)
+            movie_data['details_updated_at'] = timezone.now()
+            # Fingerprinted like the full refresh, so it does not rewrite the film again
+            record = with_fingerprints(self.detail_fields(movie_data))
+            for field, value in record.items():
+                setattr(film, field, value)
+            with transaction.atomic():
+                film.save(update_fields=list(record))
+                # A release date that moved into the window makes the film due sooner
+                Film.reschedule_status_checks(Film.objects.filter(pk=film.pk))
+            self.stdout.write(f'Refreshed {film.title} ({film.imdb_id})')
+            return True
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'Error refreshing {film.title}: {str(e)}'))
+            return False
 
     def update_db_cache(self, force):
         """Update the database cache by refreshing film data."""
@@ -122,8 +506,13 @@ class Command(BaseCommand):
         
         self.stdout.write(self.style.SUCCESS('Database cache update completed'))
 
-    def update_cinema_db_cache(self, max_pages, batch_size, batch_delay, time_window_months, prioritize_flags, use_parallel):
-        """Update the database cache with current and upcoming cinema films."""
+    def update_cinema_db_cache(self, max_pages, batch_size, batch_delay, time_window_months, prioritize_flags, use_parallel, run):
+        """Update the database cache with current and upcoming cinema films.
+        
+        The run is checkpointed after each phase (flagged films, now playing,
+        upcoming) and after each written discover page, so a resumed run skips
+        the work that was already committed.
+        """
         self.stdout.write('Updating cinema films in database...')
         
         # Calculate cutoff date for upcoming films
@@ -131,391 +520,805 @@ class Command(BaseCommand):
         cutoff_date = today + timedelta(days=30 * time_window_months)
         self.stdout.write(f'Using cutoff date: {cutoff_date} for upcoming films')
         
-        # Reset cinema status for all films if force is True
-        if self.options.get('force', False):
+        # Known films with fresh details are refreshed from the discover listing alone
+        self.fresh_films = self.get_fresh_films()
+        self.stdout.write(f'{len(self.fresh_films)} known films have fresh details')
+        
+        # Reset cinema status for all films if force is True; a resumed run has
+        # already done this before writing any pages
+        if self.options.get('force', False) and not run.reached('flagged'):
             self.stdout.write('Force reset requested - resetting cinema status for all films')
             Film.objects.all().update(is_in_cinema=False, is_upcoming=False)
         
-        # Process films that need status check first if prioritize_flags is True
-        if prioritize_flags:
-            self.stdout.write('Prioritizing films that need status check')
-            
-            # Get films that need status check
-            flagged_films = Film.objects.filter(needs_status_check=True)
-            flagged_count = flagged_films.count()
-            self.stdout.write(f'Found {flagged_count} films that need status check')
-            
-            if flagged_count > 0:
-                # Process flagged films in batches
-                processed_count = 0
-                
-                # Use parallel processing if enabled and there are enough films
-                if use_parallel and flagged_count > 5:
-                    self.stdout.write(f'Using parallel processing for {flagged_count} flagged films')
-                    
-                    # Process films in batches to avoid resource exhaustion
-                    for i in range(0, flagged_count, batch_size):
-                        batch = flagged_films[i:i+batch_size]
-                        self.stdout.write(f'Processing batch {i//batch_size + 1} of {(flagged_count-1)//batch_size + 1} ({len(batch)} films)')
-                        
-                        # Use ThreadPoolExecutor for parallel processing
-                        max_workers = self.options.get('max_workers') or max(1, min(8, len(batch)))  # Use provided max_workers or calculate based on batch size
-                        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                            # Submit all films for processing
-                            future_to_film = {executor.submit(self.update_film_status, film, self.options.get('force', False)): film for film in batch}
-                            
-                            # Process results as they complete
-                            for future in concurrent.futures.as_completed(future_to_film):
-                                film = future_to_film[future]
-                                try:
-                                    updated = future.result()
-                                    processed_count += 1
-                                    if processed_count % 10 == 0:
-                                        self.stdout.write(f'Processed {processed_count}/{flagged_count} flagged films')
-                                except Exception as e:
-                                    self.stdout.write(self.style.ERROR(f'Error processing film {film.title}: {str(e)}'))
-                        
-                        # Add delay between batches to avoid resource exhaustion
-                        if i + batch_size < flagged_count:
-                            self.stdout.write(f'Waiting {batch_delay} seconds before next batch...')
-                            time.sleep(batch_delay)
-                else:
-                    # Process films sequentially
-                    for i, film in enumerate(flagged_films):
-                        self.update_film_status(film, self.options.get('force', False))
-                        processed_count += 1
-                        
-                        if processed_count % 10 == 0:
-                            self.stdout.write(f'Processed {processed_count}/{flagged_count} flagged films')
-                        
-                        # Add delay between films to avoid resource exhaustion
-                        if i < flagged_count - 1:
-                            time.sleep(1)  # Short delay between individual films
-                
-                self.stdout.write(f'Processed {processed_count} flagged films')
+        # Move films whose release date or cinema run settles their status, so
+        # only films the dates cannot account for are checked against TMDB
+        if not run.reached('flagged'):
+            with self.timed_phase('transitions'):
+                self.apply_date_transitions()
         
-        # Process now playing films
-        self.stdout.write('Processing now playing films...')
-        now_playing_films = self._process_movie_batch('now_playing', max_pages, batch_size, batch_delay)
+        # Check films that are due for a status check first if prioritize_flags is True
+        if prioritize_flags and not run.reached('flagged'):
+            with self.timed_phase('flagged'):
+                self.process_due_films(batch_size, use_parallel)
+        
+        if not run.reached('flagged'):
+            run.advance('now_playing')
+        
+        if self.options.get('engine') == 'async':
+            # Fetch both movie types concurrently, then write them to the database.
+            # Page writes are idempotent, so a resumed run simply redoes both types.
+            if not run.reached('upcoming'):
+                with self.timed_phase('discover'):
+                    self._process_movies_async(max_pages, time_window_months, run)
+        else:
+            # Process now playing films
+            if not run.reached('now_playing'):
+                self.stdout.write('Processing now playing films...')
+                with self.timed_phase('now_playing'):
+                    self._process_movie_type('now_playing', max_pages, run=run)
+                run.advance('upcoming')
+            
+            # Process upcoming films
+            self.stdout.write('Processing upcoming films...')
+            with self.timed_phase('upcoming'):
+                self._process_movie_type('upcoming', max_pages, time_window_months, run=run)
         
-        # Process upcoming films
-        self.stdout.write('Processing upcoming films...')
-        upcoming_films = self._process_movie_batch('upcoming', max_pages, batch_size, batch_delay, time_window_months)
+        with self.timed_phase('reconciliation'):
+            self.reconcile_unseen_films(run)
         
-        # Combine processed film IDs
-        processed_film_ids = [film.imdb_id for film in now_playing_films + upcoming_films]
+        self.stdout.write(
+            f'Films created: {self.write_counts["created"]}, changed: {self.write_counts["changed"]}, '
+            f'unchanged: {self.write_counts["unchanged"]}'
+        )
+        concurrency = get_concurrency_controller().stats()
+        self.stdout.write(
+            f'TMDB concurrency finished at {concurrency["limit"]}/{concurrency["max_limit"]} '
+            f'after {concurrency["decreases"]} back-offs'
+        )
+        self.stdout.write(self.style.SUCCESS('Cinema database cache update completed'))
+    
+    def reconcile_unseen_films(self, run):
+        """Clear the cinema status of films a forced run did not see in any listing."""
+        # Every film written by this run, including before a resume, was stamped
+        # with a status check time after the run started
+        seen_films = Film.objects.filter(last_status_check__gte=run.started_at)
         
         # Handle films that have left cinemas or are no longer upcoming
-        if self.options.get('force', False) and processed_film_ids:
-            # Find films that were previously in cinemas but are no longer in the processed list
-            films_left_cinemas_count = Film.objects.filter(is_in_cinema=True).exclude(imdb_id__in=processed_film_ids).update(is_in_cinema=False)
+        if self.options.get('force', False) and seen_films.exists():
+            unseen_films = Film.objects.exclude(pk__in=seen_films.values('pk'))
+            
+            # Find films that were previously in cinemas but were not seen by this run
+            films_left_cinemas_count = unseen_films.filter(is_in_cinema=True).update(is_in_cinema=False)
             
-            # Find films that were previously upcoming but are no longer in the processed list
-            films_no_longer_upcoming_count = Film.objects.filter(is_upcoming=True).exclude(imdb_id__in=processed_film_ids).update(is_upcoming=False)
+            # Find films that were previously upcoming but were not seen by this run
+            films_no_longer_upcoming_count = unseen_films.filter(is_upcoming=True).update(is_upcoming=False)
             
             self.stdout.write(f'{films_left_cinemas_count} films have left cinemas')
             self.stdout.write(f'{films_no_longer_upcoming_count} films are no longer upcoming')
+            self.status_counts['left_cinemas'] += films_left_cinemas_count
+            self.status_counts['no_longer_upcoming'] += films_no_longer_upcoming_count
+    
+    def apply_date_transitions(self):
+        """Apply the cinema status transitions that follow from release dates."""
+        transitions = Film.apply_date_transitions()
+        self.stdout.write(
+            f'{transitions["released"]} films released into cinemas and '
+            f'{transitions["left_cinemas"]} past their cinema run, from release dates'
+        )
+        self.status_counts['released'] += transitions['released']
+        self.status_counts['left_cinemas'] += transitions['left_cinemas']
+    
+    def process_due_films(self, batch_size, use_parallel):
+        """Check the cinema status of the films most overdue for a status check.
         
-        self.stdout.write(self.style.SUCCESS('Cinema database cache update completed'))
+        Args:
+            batch_size (int): Number of films handed to the thread pool at a time
+            use_parallel (bool): Whether to check films with a thread pool
+        """
+        self.stdout.write('Prioritizing films that are due for a status check')
+        
+        # One indexed query for the most urgent films; the rest wait for the next run
+        limit = self.options.get('status_check_limit', DEFAULT_STATUS_CHECK_LIMIT)
+        flagged_films = list(Film.due_for_status_check(limit))
+        flagged_count = len(flagged_films)
+        self.stdout.write(f'Found {flagged_count} films due for a status check (limit {limit})')
+        
+        if flagged_count > 0:
+            # Process flagged films in batches
+            processed_count = 0
+            
+            # Use parallel processing if enabled and there are enough films
+            if use_parallel and flagged_count > 5:
+                self.stdout.write(f'Using parallel processing for {flagged_count} flagged films')
+                
+                # Process films in batches to avoid resource exhaustion
+                for i in range(0, flagged_count, batch_size):
+                    batch = flagged_films[i:i+batch_size]
+                    self.stdout.write(f'Processing batch {i//batch_size + 1} of {(flagged_count-1)//batch_size + 1} ({len(batch)} films)')
+                    
+                    # Use ThreadPoolExecutor for parallel processing; the shared
+                    # concurrency controller limits how many workers hit TMDB at once
+                    max_workers = max(1, min(get_worker_count(), len(batch)))
+                    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                        # Submit all films for processing
+                        future_to_film = {executor.submit(self.update_film_status, film, self.options.get('force', False)): film for film in batch}
+                        
+                        # Process results as they complete
+                        for future in concurrent.futures.as_completed(future_to_film):
+                            film = future_to_film[future]
+                            try:
+                                if future.result():
+                                    self.status_counts['status_updated'] += 1
+                                processed_count += 1
+                                if processed_count % 10 == 0:
+                                    self.stdout.write(f'Processed {processed_count}/{flagged_count} flagged films')
+                            except Exception as e:
+                                self.stdout.write(self.style.ERROR(f'Error processing film {film.title}: {str(e)}'))
+            else:
+                # Process films sequentially
+                for i, film in enumerate(flagged_films):
+                    if self.update_film_status(film, self.options.get('force', False)):
+                        self.status_counts['status_updated'] += 1
+                    processed_count += 1
+                    
+                    if processed_count % 10 == 0:
+                        self.stdout.write(f'Processed {processed_count}/{flagged_count} flagged films')
+            
+            self.stdout.write(f'Processed {processed_count} flagged films')
     
+    def get_discover_index(self):
+        """Get the TMDB IDs of now playing and upcoming films, built once per run.
+        
+        Status checks for every flagged film are answered from this index
+        instead of each check paging through the discover listings again.
+        Only the listing pages are fetched, up to --max-pages per movie type.
+        
+        Returns:
+            dict: Maps 'now_playing' and 'upcoming' to sets of TMDB IDs, or None
+                  if a listing could not be fetched completely
+        """
+        with self._discover_index_lock:
+            if self._discover_index is None:
+                max_pages = self.options.get('max_pages', 0)
+                time_window_months = self.options.get('time_window_months')
+                index = {
+                    'now_playing': get_discover_movie_ids('now_playing', max_pages),
+                    'upcoming': get_discover_movie_ids('upcoming', max_pages, time_window_months),
+                }
+                if None in index.values():
+                    # Remembered for the rest of the run so each check does not
+                    # page through the failing listing again
+                    self._discover_index = False
+                    self.stdout.write(self.style.WARNING(
+                        'Could not fetch the discover listings; status checks will be retried later'
+                    ))
+                else:
+                    self._discover_index = index
+                    self.stdout.write(
+                        f'Indexed {len(index["now_playing"])} now playing and '
+                        f'{len(index["upcoming"])} upcoming films for status checks'
+                    )
+            return self._discover_index or None
+
     def update_film_status(self, film, force=False):
         """Update the status of a film by checking if it's in cinema or upcoming.
         
         Args:
             film (Film): The film to update
-            force (bool): Whether to force update regardless of last check time
+            force (bool): Whether to check the film even if it is not due yet
             
         Returns:
             bool: True if the film's status was updated, False otherwise
         """
-        # Skip if the film was checked recently and force is False
-        if not force and film.last_status_check and (timezone.now() - film.last_status_check).days < 3:
-            self.stdout.write(f'Skipping status check for {film.title} - checked recently on {film.last_status_check}')
+        # Skip if the film is not due for a check yet and force is False
+        if not force and film.next_status_check_at and film.next_status_check_at > timezone.now():
+            self.stdout.write(f'Skipping status check for {film.title} - not due until {film.next_status_check_at}')
             return False
             
         try:
+            # Without complete listings a film cannot be told apart from one that
+            # left cinemas, so the check is recorded as failed and retried soon
+            discover_index = self.get_discover_index()
+            if discover_index is None:
+                self._record_status_check(film, failed=True)
+                return False
+            
             # Get the IMDb ID or TMDB ID
             imdb_id = film.imdb_id
-            tmdb_id = None
+            tmdb_id = film.tmdb_id
             
             # Check if it's a TMDB ID
-            if imdb_id.startswith('tmdb-'):
+            if not tmdb_id and imdb_id.startswith('tmdb-'):
                 tmdb_id = imdb_id.replace('tmdb-', '')
             
             # If we have a regular IMDb ID, try to get the TMDB ID
             if not tmdb_id and not imdb_id.startswith('tmdb-'):
-                # Try to get the TMDB ID from the IMDb ID
-                movie_details = get_movie_by_imdb_id(imdb_id)
-                if movie_details:
-                    tmdb_id = movie_details.get('id')
+                tmdb_id = find_tmdb_id(imdb_id)
             
             # If we have a TMDB ID, check if the film is in cinema or upcoming
             if tmdb_id:
-                # Get the movie details
-                movie_details = get_movie_details(tmdb_id)
-                if not movie_details:
-                    self.stdout.write(self.style.WARNING(f'Could not get movie details for {film.title} (TMDB ID: {tmdb_id})'))
-                    film.last_status_check = timezone.now()
-                    film.save(update_fields=['last_status_check'])
+                # The slim release dates fetch confirms the film still exists on TMDB
+                if get_movie_release_dates(tmdb_id) is None:
+                    self.stdout.write(self.style.WARNING(f'Could not get release dates for {film.title} (TMDB ID: {tmdb_id})'))
+                    self._record_status_check(film, failed=True)
                     return False
                 
-                # Check if the film is in cinema or upcoming
-                is_in_cinema = False
-                is_upcoming = False
+                # The ID is confirmed by the fetch, so keep it for the next check
+                found_id = None if film.tmdb_id else int(tmdb_id)
                 
-                # Check if the film is in cinema
-                page = 1
-                while page <= 5:  # Limit to 5 pages to avoid excessive API calls
-                    now_playing, total_pages = get_now_playing_movies(page=page)
-                    if not now_playing:
-                        break
-                    
-                    for movie in now_playing:
-                        if movie.get('id') == int(tmdb_id):
-                            is_in_cinema = True
-                            break
-                    
-                    if is_in_cinema or page >= total_pages:
-                        break
-                    
-                    page += 1
-                
-                # Check if the film is upcoming
-                if not is_in_cinema:
-                    page = 1
-                    while page <= 5:  # Limit to 5 pages to avoid excessive API calls
-                        upcoming, total_pages = get_upcoming_movies(page=page)
-                        if not upcoming:
-                            break
-                        
-                        for movie in upcoming:
-                            if movie.get('id') == int(tmdb_id):
-                                is_upcoming = True
-                                break
-                        
-                        if is_upcoming or page >= total_pages:
-                            break
-                        
-                        page += 1
+                # Check if the film is in cinema or upcoming
+                is_in_cinema = int(tmdb_id) in discover_index['now_playing']
+                is_upcoming = not is_in_cinema and int(tmdb_id) in discover_index['upcoming']
                 
                 # Update the film's status
                 if film.is_in_cinema != is_in_cinema or film.is_upcoming != is_upcoming:
-                    film.is_in_cinema = is_in_cinema
-                    film.is_upcoming = is_upcoming
-                    film.needs_status_check = False
-                    film.last_status_check = timezone.now()
-                    film.save()
+                    self._record_status_check(film, is_in_cinema=is_in_cinema, is_upcoming=is_upcoming, tmdb_id=found_id)
                     
                     status = "In Cinema" if is_in_cinema else "Upcoming" if is_upcoming else "Not in Cinema"
                     self.stdout.write(f'Updated status for {film.title} to {status}')
                     return True
                 else:
-                    film.needs_status_check = False
-                    film.last_status_check = timezone.now()
-                    film.save(update_fields=['needs_status_check', 'last_status_check'])
+                    self._record_status_check(film, tmdb_id=found_id)
                     self.stdout.write(f'Status unchanged for {film.title}')
                     return False
             else:
                 self.stdout.write(self.style.WARNING(f'Could not get TMDB ID for {film.title} (IMDb ID: {imdb_id})'))
-                film.last_status_check = timezone.now()
-                film.save(update_fields=['last_status_check'])
+                self._record_status_check(film, failed=True)
                 return False
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'Error updating status for {film.title}: {str(e)}'))
-            film.last_status_check = timezone.now()
-            film.save(update_fields=['last_status_check'])
+            self._record_status_check(film, failed=True)
             return False
 
-    def get_page_lock(self, movie_type, page):
-        """Get a lock for processing a specific page."""
-        lock_key = f"{PAGE_LOCK_PREFIX}{movie_type}_{page}"
-        if cache.add(lock_key, True, PAGE_LOCK_TIMEOUT):
-            return True
-        return False
+    def _record_status_check(self, film, is_in_cinema=None, is_upcoming=None, failed=False, tmdb_id=None):
+        """Store the outcome of a status check and schedule the next one in a single UPDATE.
+        
+        Args:
+            film (Film): The checked film
+            is_in_cinema (bool, optional): Status found by the check; None keeps the stored one
+            is_upcoming (bool, optional): Status found by the check; None keeps the stored one
+            failed (bool): Whether the check failed; it is then retried after STATUS_CHECK_DAYS_RETRY
+            tmdb_id (int, optional): TMDB ID the check looked up for a film without one
+        """
+        now = timezone.now()
+        values = {'last_status_check': now}
+        if tmdb_id:
+            values['tmdb_id'] = tmdb_id
+        if is_in_cinema is not None:
+            values.update(is_in_cinema=is_in_cinema, is_upcoming=is_upcoming)
+        if failed:
+            values['next_status_check_at'] = now + timedelta(days=Film.STATUS_CHECK_DAYS_RETRY)
+        else:
+            values['next_status_check_at'] = Film.next_status_check_expression(
+                now, checked_at=now, is_in_cinema=is_in_cinema, is_upcoming=is_upcoming
+            )
+        Film.objects.filter(pk=film.pk).update(**values)
+
+    def _page_lease_prefix(self, run):
+        """Lease name prefix shared by all discover pages of a run."""
+        return f"{PAGE_LEASE_PREFIX}{run.run_id}:"
+
+    def _take_over_run(self, run):
+        """Make this process the owner of a resumed run and free the pages its last owner held.
+        
+        Resuming takes the refresh lease, so the process that drove the run
+        before is gone. Without this, the pages it was processing would be
+        skipped as held by another worker until their leases expired. Pages
+        held by joined workers are left alone.
+        """
+        abandoned, _ = Lease.objects.filter(
+            name__startswith=self._page_lease_prefix(run), owner=run.owner, completed_at__isnull=True
+        ).delete()
+        if abandoned:
+            self.stdout.write(f'Took over {abandoned} pages abandoned by {run.owner}')
+        run.owner = self.lease_owner
+        run.save(update_fields=['owner', 'updated_at'])
+
+    def _acquire_page_lease(self, lease_name):
+        """Take a discover page lease and keep it renewed until it is handed back.
+        
+        A page can wait in the pipeline queues and take a while to fetch and
+        write, so like the refresh lease it is renewed by a heartbeat rather
+        than relying on PAGE_LEASE_TTL to cover the whole page.
+        
+        Returns:
+            Lease: The lease, or None if another worker holds it or it is completed
+        """
+        lease = Lease.acquire(lease_name, self.lease_owner, PAGE_LEASE_TTL)
+        if lease is not None:
+            lease.heartbeat = LeaseHeartbeat(lease, PAGE_LEASE_TTL)
+            lease.heartbeat.start()
+        return lease
 
-    def release_page_lock(self, movie_type, page):
-        """Release the lock for a specific page."""
-        lock_key = f"{PAGE_LOCK_PREFIX}{movie_type}_{page}"
-        cache.delete(lock_key)
+    def _release_page_lease(self, lease):
+        """Stop renewing a page lease and give it up."""
+        lease.heartbeat.stop()
+        lease.release()
 
-    def _process_movie_batch(self, movie_type, max_pages, batch_size=10, batch_delay=2, time_window_months=None):
-        """Process a batch of movies to reduce memory usage and API calls.
+    def _process_movie_type(self, movie_type, max_pages, time_window_months=None, run=None):
+        """Process every discover page of a movie type, including pages other workers gave up.
+        
+        Pages leased by a joined worker are skipped by the pipeline; this waits
+        for them and runs the pipeline again until every page is completed, so
+        reconciliation never runs ahead of a page that is still being written.
+        """
+        while True:
+            pages_held = self._process_movie_batch(movie_type, max_pages, time_window_months, run=run)
+            if not pages_held:
+                return
+            self.stdout.write(f'Waiting for {pages_held} {movie_type} pages held by other workers...')
+            time.sleep(PAGE_LEASE_POLL_SECONDS)
+
+    def _process_movie_batch(self, movie_type, max_pages, time_window_months=None, run=None):
+        """Refresh one movie type with a three-stage producer/consumer pipeline.
+        
+        A listing thread fetches discover pages, a details thread fans each
+        page's movies out to a worker pool, and the calling thread writes each
+        page to the database. The stages are connected by bounded queues, so
+        page N+1 is listed and its details fetched while page N is written,
+        and only a few pages are held in memory at any time.
+        
+        Each page is a leased work item of the run. Pages completed earlier in
+        the run, or held by another worker, are skipped. A page's lease is
+        completed in the same transaction that writes its films, so a resumed
+        run redoes exactly the pages that were not fully written. Pages dropped
+        by any stage are handed back once the pipeline has stopped.
         
         Args:
             movie_type (str): Type of movies to process ('now_playing' or 'upcoming')
-            max_pages (int): Maximum number of pages to process
-            batch_size (int): Number of films to process in each batch
-            batch_delay (int): Delay in seconds between processing batches
+            max_pages (int): Maximum number of pages to process (0 for all)
             time_window_months (int, optional): For upcoming films, the time window in months
+            run (RefreshRun): The run the pages belong to
             
         Returns:
-            list: List of Film objects that were processed
+            int: Number of pages skipped because another worker holds them
         """
-        # Check if parallel processing is enabled
         use_parallel = self.options.get('use_parallel', False)
+        max_workers = get_worker_count() if use_parallel else 1
         
         # Calculate cutoff date for upcoming films
         today = date.today()
         cutoff_date = today + timedelta(days=30 * (time_window_months or 6))
         self.stdout.write(f'Using cutoff date: {cutoff_date} for {movie_type} movies')
         
-        # Get the appropriate function based on movie type
-        if movie_type == 'now_playing':
-            get_movies_func = get_now_playing_movies
-            is_in_cinema = True
-            is_upcoming = False
-        else:  # upcoming
-            get_movies_func = get_upcoming_movies
-            is_in_cinema = False
-            is_upcoming = True
-        
-        # Get the first page to determine total_pages
-        if movie_type == 'upcoming' and time_window_months is not None:
-            first_page_movies, total_pages = get_movies_func(time_window_months=time_window_months, page=1, sort_by='popularity.desc')
-        else:
-            first_page_movies, total_pages = get_movies_func(page=1, sort_by='popularity.desc')
-        
+        # The first page determines total_pages and is fed into the pipeline as is
+        first_page_movies, total_pages = self._fetch_listing_page(movie_type, 1, time_window_months)
         self.stdout.write(f'Found {total_pages} total pages for {movie_type} movies')
         
-        # Process all pages instead of a limited number
         # Use the smaller of max_pages or total_pages
         pages_to_process = min(max_pages, total_pages) if max_pages > 0 else total_pages
-        self.stdout.write(f'Will process {pages_to_process} pages for {movie_type} movies')
+        self.stdout.write(f'Will process {pages_to_process} pages for {movie_type} movies with {max_workers} detail workers')
         
-        # Get the next page to process from the PageTracker
-        page = 1  # Always start from page 1 to ensure we get all films
-        self.stdout.write(f'Starting with page {page} for {movie_type} movies')
+        listing_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        write_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        stop = threading.Event()
+        # Set when a listing request fails for good or the TMDB circuit breaker
+        # trips; the page being processed is dropped rather than written with
+        # missing films or details
+        tmdb_failed = threading.Event()
+        breaker = get_circuit_breaker()
+        if not total_pages:
+            tmdb_failed.set()
+        pages_held = 0
+        # Leases of the pages taken by this batch and not yet completed, by page
+        page_leases = {}
         
-        total_processed = 0
-        pages_processed = 0
-        processed_films = []
+        def list_pages():
+            nonlocal pages_held
+            try:
+                for page in range(1, pages_to_process + 1):
+                    if stop.is_set():
+                        break
+                    lease_name = f'{self._page_lease_prefix(run)}{movie_type}:{page}'
+                    lease = self._acquire_page_lease(lease_name)
+                    if lease is None:
+                        if not Lease.is_completed(lease_name):
+                            pages_held += 1
+                            self.stdout.write(f'Page {page} is being processed by another worker, skipping...')
+                        continue
+                    page_leases[page] = lease
+                    if page == 1:
+                        movies, page_total = first_page_movies, total_pages
+                    else:
+                        movies, page_total = self._fetch_listing_page(movie_type, page, time_window_months)
+                    if not page_total:
+                        tmdb_failed.set()
+                        break
+                    if not movies:
+                        self.stdout.write(f'No more movies found for {movie_type} at page {page}')
+                        break
+                    if not _pipeline_put(listing_queue, (page, movies, page_total, lease), stop):
+                        break
+            finally:
+                _pipeline_put(listing_queue, None, stop)
         
-        while pages_processed < pages_to_process:
-            # Try to get a lock for this page
-            if not self.get_page_lock(movie_type, page):
-                self.stdout.write(f"Page {page} is already being processed, skipping...")
-                time.sleep(1)
-                continue
-
+        def fetch_details():
             try:
-                # Get a batch of movies with popularity sorting
-                if movie_type == 'upcoming' and time_window_months is not None:
-                    movies, total_pages = get_movies_func(time_window_months=time_window_months, page=page, sort_by='popularity.desc')
-                else:
-                    movies, total_pages = get_movies_func(page=page, sort_by='popularity.desc')
-
-                # If no movies returned, we've processed all pages
-                if not movies:
-                    self.stdout.write(f'No more movies found for {movie_type} at page {page}')
-                    break
-
-                self.stdout.write(f'Processing {len(movies)} {movie_type} movies (page {page} of {total_pages})')
-
-                # Process movies in batches to avoid resource exhaustion
-                for i in range(0, len(movies), batch_size):
-                    batch = movies[i:i+batch_size]
-                    self.stdout.write(f'Processing batch {i//batch_size + 1} of {(len(movies)-1)//batch_size + 1}')
-
-                    # Use parallel processing if enabled and batch is large enough
-                    if use_parallel and len(batch) > 3:
-                        self.stdout.write(f'Using parallel processing for batch of {len(batch)} movies')
-                        max_workers = self.options.get('max_workers') or max(1, min(8, len(batch)))
-
-                        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                            future_to_movie = {executor.submit(self.process_single_movie, movie_data, movie_type, cutoff_date): movie_data for movie_data in batch}
-
-                            for future in concurrent.futures.as_completed(future_to_movie):
-                                movie_data = future_to_movie[future]
-                                try:
-                                    film = future.result()
-                                    if film:
-                                        processed_films.append(film)
-                                except Exception as e:
-                                    self.stdout.write(self.style.ERROR(f'Error processing movie {movie_data.get("title", "Unknown")}: {str(e)}'))
-
-                    # Add delay between batches
-                    if i + batch_size < len(movies):
-                        self.stdout.write(f'Waiting {batch_delay} seconds before next batch...')
-                        time.sleep(batch_delay)
-
-                # Update the page tracker
-                PageTracker.update_tracker(movie_type, page, total_pages)
-
-                # Move to the next page
-                page = page + 1 if page < total_pages else 1
+                with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    while (item := _pipeline_get(listing_queue, stop)) is not None:
+                        page, movies, page_total, lease = item
+                        self.stdout.write(f'Fetching {len(movies)} {movie_type} movies (page {page} of {page_total})')
+                        future_to_movie = {
+                            executor.submit(self.process_listed_movie, movie_data, movie_type, cutoff_date): movie_data
+                            for movie_data in movies
+                        }
+                        records = []
+                        for future in concurrent.futures.as_completed(future_to_movie):
+                            movie_data = future_to_movie[future]
+                            try:
+                                record = future.result()
+                                if record:
+                                    records.append(record)
+                            except Exception as e:
+                                self.stdout.write(self.style.ERROR(f'Error processing movie {movie_data.get("title", "Unknown")}: {str(e)}'))
+                        if breaker.state != CircuitBreaker.CLOSED:
+                            tmdb_failed.set()
+                            break
+                        if not _pipeline_put(write_queue, (page, records, page_total, lease), stop):
+                            break
+            finally:
+                _pipeline_put(write_queue, None, stop)
+        
+        stages = [
+            threading.Thread(target=list_pages, name=f'{movie_type}-listing'),
+            threading.Thread(target=fetch_details, name=f'{movie_type}-details'),
+        ]
+        for stage in stages:
+            stage.start()
+        
+        processed_ids = []
+        pages_processed = 0
+        try:
+            # Database writes stay on this thread
+            while (item := _pipeline_get(write_queue, stop)) is not None:
+                page, records, page_total, lease = item
+                with transaction.atomic():
+                    processed_ids.extend(self.write_film_records(records))
+                    PageTracker.update_tracker(movie_type, page, page_total, run=run)
+                    lease.complete()
+                # A completed page is never handed out again, so it needs no release
+                lease.heartbeat.stop()
+                del page_leases[page]
                 pages_processed += 1
+        finally:
+            # Unblock the other stages if writing failed
+            stop.set()
+            for stage in stages:
+                stage.join()
+            # Hand back the pages that were dropped or never written, whichever
+            # stage they were left in
+            for lease in page_leases.values():
+                self._release_page_lease(lease)
+        
+        self.stdout.write(f'Processed {len(processed_ids)} {movie_type} movies across {pages_processed} pages')
+        if tmdb_failed.is_set():
+            # Fail the run so its checkpoint is kept for --resume instead of
+            # finishing with films silently missing
+            raise CommandError(
+                f'TMDB requests failed after {pages_processed} {movie_type} pages; '
+                'rerun with --resume to continue'
+            )
+        return pages_held
 
-            finally:
-                # Always release the page lock
-                self.release_page_lock(movie_type, page)
+    def _fetch_listing_page(self, movie_type, page, time_window_months=None):
+        """Fetch one discover page as listing rows, without movie details.
+        
+        Returns:
+            tuple: (listing rows, total pages); total pages is 0 if the request failed
+        """
+        results, total_pages = get_discover_page(movie_type, page, time_window_months, sort_by='popularity.desc')
+        return [format_discover_listing(movie) for movie in results if movie.get('id')], total_pages
+
+    def _process_movies_async(self, max_pages, time_window_months, run=None):
+        """Fetch now playing and upcoming films with the async engine and save them.
+        
+        Args:
+            max_pages (int): Maximum number of pages to process per movie type (0 for all)
+            time_window_months (int): For upcoming films, the time window in months
+            run (RefreshRun, optional): The run to checkpoint pages against
+            
+        Returns:
+            tuple: (now_playing_ids, upcoming_ids) lists of IMDb IDs
+        """
+        max_concurrency = self.options.get('max_concurrency') or tmdb_async.DEFAULT_CONCURRENCY
+        self.stdout.write(f'Fetching now playing and upcoming films with the async engine (max_concurrency={max_concurrency})')
+        
+        fetched = tmdb_async.fetch_cinema_movies(
+            max_pages=max_pages,
+            time_window_months=time_window_months,
+            max_concurrency=max_concurrency,
+            skip_details=set(self.fresh_films)
+        )
+        if get_circuit_breaker().state != CircuitBreaker.CLOSED:
+            # Keep the run resumable rather than writing pages with films missing
+            raise CommandError('TMDB requests failed (circuit breaker open); rerun with --resume to continue')
+        
+        cutoff_date = date.today() + timedelta(days=30 * (time_window_months or 6))
+        processed = {}
+        pages_failed = 0
+        for movie_type in ('now_playing', 'upcoming'):
+            movies, pages_fetched, total_pages, type_pages_failed = fetched[movie_type]
+            pages_failed += type_pages_failed
+            self.stdout.write(f'Fetched {len(movies)} {movie_type} movies from {pages_fetched} of {total_pages} pages')
+            
+            records = []
+            for movie_data, details in movies:
+                try:
+                    if movie_data['tmdb_id'] in self.fresh_films:
+                        # Listing row for a known film with fresh details
+                        record = self.process_listed_movie(movie_data, movie_type, cutoff_date)
+                    elif self._is_beyond_cutoff(movie_data, movie_type, cutoff_date):
+                        record = None
+                    else:
+                        record = self.build_detailed_record(movie_data, details, movie_type)
+                    if record:
+                        records.append(record)
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f'Error saving movie {movie_data.get("title", "Unknown")}: {str(e)}'))
+            
+            # Write in discover-page sized transactions
+            film_ids = []
+            for i in range(0, len(records), DISCOVER_PAGE_SIZE):
+                film_ids.extend(self.write_film_records(records[i:i + DISCOVER_PAGE_SIZE]))
+            
+            if pages_fetched:
+                PageTracker.update_tracker(movie_type, pages_fetched, total_pages, run=run)
+            self.stdout.write(f'Processed {len(film_ids)} {movie_type} movies across {pages_fetched} pages')
+            processed[movie_type] = film_ids
+        
+        if pages_failed:
+            # As with the threads engine, fail the run rather than finish with films missing
+            raise CommandError(f'TMDB requests failed for {pages_failed} discover pages; rerun with --resume to continue')
+        return processed['now_playing'], processed['upcoming']
 
-            # Add delay between pages
-            if pages_processed < pages_to_process and page <= total_pages:
-                self.stdout.write(f'Waiting {batch_delay} seconds before next page...')
-                time.sleep(batch_delay)
+    def _is_beyond_cutoff(self, movie_data, movie_type, cutoff_date):
+        """Check whether an upcoming movie's release date is beyond the cutoff date."""
+        release_date = movie_data.get('release_date')
+        if release_date:
+            release_date = datetime.strptime(release_date, '%Y-%m-%d').date()
+            if movie_type == 'upcoming' and release_date > cutoff_date:
+                self.stdout.write(f'Skipping {movie_data.get("title")} - release date {release_date} is beyond cutoff {cutoff_date}')
+                return True
+        return False
 
-        self.stdout.write(f'Processed {len(processed_films)} {movie_type} movies across {pages_processed} pages')
-        return processed_films
+    def get_fresh_films(self):
+        """Get stored films whose details are younger than TMDB_DETAILS_FRESH_DAYS.
+        
+        Returns:
+            dict: Maps TMDB ID to IMDb ID
+        """
+        fresh_days = getattr(settings, 'TMDB_DETAILS_FRESH_DAYS', 7)
+        if fresh_days <= 0:
+            return {}
+        fresh_since = timezone.now() - timedelta(days=fresh_days)
+        return dict(Film.objects.filter(
+            tmdb_id__isnull=False,
+            details_updated_at__gte=fresh_since
+        ).values_list('tmdb_id', 'imdb_id'))
+
+    def process_listed_movie(self, movie_data, movie_type, cutoff_date):
+        """Process a discover listing row, fetching full details only when needed.
+        
+        Known films with fresh details are updated from the listing row alone;
+        new films and films with stale details go through process_single_movie.
+        
+        Args:
+            movie_data (dict): A row from format_discover_listing
+            movie_type (str): Type of movie ('now_playing' or 'upcoming')
+            cutoff_date (date): Upcoming films releasing after this date are skipped
+            
+        Returns:
+            dict: The film record to write, or None
+        """
+        imdb_id = self.fresh_films.get(movie_data.get('tmdb_id'))
+        if imdb_id:
+            if self._is_beyond_cutoff(movie_data, movie_type, cutoff_date):
+                return None
+            record = {field: movie_data[field] for field in FILM_LISTING_FIELDS if movie_data.get(field) is not None}
+            return self._with_status(record, imdb_id, movie_type)
+        return self.process_single_movie(movie_data, movie_type, cutoff_date)
 
     def process_single_movie(self, movie_data, movie_type, cutoff_date):
-        """Process a single movie with proper error handling."""
+        """Fetch a movie's details and build its film record, with proper error handling."""
         try:
             # Check if the release date is beyond our cutoff
-            release_date = movie_data.get('release_date')
-            if release_date:
-                release_date = datetime.strptime(release_date, '%Y-%m-%d').date()
-                if movie_type == 'upcoming' and release_date > cutoff_date:
-                    self.stdout.write(f'Skipping {movie_data.get("title")} - release date {release_date} is beyond cutoff {cutoff_date}')
-                    return None
-
-            # Get the IMDb ID or TMDB ID
-            imdb_id = movie_data.get('imdb_id')
-            tmdb_id = movie_data.get('id')
+            if self._is_beyond_cutoff(movie_data, movie_type, cutoff_date):
+                return None
 
-            # Always fetch complete movie details
+            # Fetch complete movie details
+            tmdb_id = movie_data.get('tmdb_id') or movie_data.get('id')
+            complete_details = None
             if tmdb_id:
                 try:
                     complete_details = get_movie_details(tmdb_id)
-                    if complete_details:
-                        imdb_id = complete_details.get('imdb_id') or complete_details.get('external_ids', {}).get('imdb_id')
-                        formatted_data = format_tmdb_data_for_film(complete_details)
-                        movie_data.update(formatted_data)
                 except Exception as e:
                     self.stdout.write(self.style.WARNING(f'Error fetching complete details for {movie_data.get("title")}: {str(e)}'))
 
-            if not imdb_id and tmdb_id:
-                imdb_id = f"tmdb-{tmdb_id}"
+            return self.build_detailed_record(movie_data, complete_details, movie_type)
 
-            if not imdb_id:
-                self.stdout.write(self.style.WARNING(f'Skipping movie with no IMDb ID: {movie_data.get("title")}'))
-                return None
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'Error processing movie: {str(e)}'))
+            return None
 
-            # Set cinema status flags
-            movie_data['is_in_cinema'] = (movie_type == 'now_playing')
-            movie_data['is_upcoming'] = (movie_type == 'upcoming')
+    def build_detailed_record(self, movie_data, complete_details, movie_type):
+        """Build the film record for a listing row and its movie details.
+        
+        Films whose details have no IMDb ID, or whose details could not be
+        fetched, are stored under a tmdb- prefixed ID.
+        
+        Args:
+            movie_data (dict): A listing row; it is updated with the formatted details
+            complete_details (dict): The movie details from TMDB, or None
+            movie_type (str): Type of movie ('now_playing' or 'upcoming')
+            
+        Returns:
+            dict: The film record to write, or None
+        """
+        imdb_id = movie_data.get('imdb_id')
+        tmdb_id = movie_data.get('tmdb_id') or movie_data.get('id')
+        if complete_details:
+            imdb_id = complete_details.get('imdb_id') or complete_details.get('external_ids', {}).get('imdb_id')
+            formatted_data = format_tmdb_data_for_film(complete_details)
+            # Popularity and votes in the listing are more current than the details payload
+            for field in ('popularity', 'vote_count', 'vote_average'):
+                if field in movie_data:
+                    formatted_data[field] = movie_data[field]
+            movie_data.update(formatted_data)
+            movie_data['details_updated_at'] = timezone.now()
 
-            # Create or update film
-            film, created = Film.objects.get_or_create(
-                imdb_id=imdb_id,
-                defaults=self.get_film_defaults(movie_data)
-            )
+        if not imdb_id and tmdb_id:
+            imdb_id = f"tmdb-{tmdb_id}"
+
+        return self.build_film_record(movie_data, imdb_id, movie_type)
+
+    def build_film_record(self, movie_data, imdb_id, movie_type):
+        """Build the Film field values to write for formatted movie data.
+        
+        Fields without a value are left out, so they keep their stored value
+        when the film already exists.
+        
+        Args:
+            movie_data (dict): Formatted movie data
+            imdb_id (str): The IMDb ID (or tmdb- prefixed ID) of the film
+            movie_type (str): Type of movie ('now_playing' or 'upcoming')
+            
+        Returns:
+            dict: Film field values keyed by field name, or None if the film has no ID
+        """
+        if not imdb_id:
+            self.stdout.write(self.style.WARNING(f'Skipping movie with no IMDb ID: {movie_data.get("title")}'))
+            return None
+        return self._with_status(self.detail_fields(movie_data), imdb_id, movie_type)
+
+    def detail_fields(self, movie_data):
+        """Get the Film detail field values in formatted movie data, leaving out those without a value.
+        
+        Args:
+            movie_data (dict): Formatted movie data
+            
+        Returns:
+            dict: Film field values keyed by field name
+        """
+        record = {
+            field: movie_data[field]
+            for field in FILM_DETAIL_FIELDS + ['details_updated_at']
+            if movie_data.get(field) is not None
+        }
+        if movie_data.get('uk_release_date'):
+            record['uk_release_date'] = datetime.strptime(movie_data['uk_release_date'], '%Y-%m-%d').date()
+        return record
+
+    def _with_status(self, record, imdb_id, movie_type):
+        """Add the IMDb ID and cinema status fields to a film record."""
+        record.update({
+            'imdb_id': imdb_id,
+            'is_in_cinema': movie_type == 'now_playing',
+            'is_upcoming': movie_type == 'upcoming',
+            'last_status_check': timezone.now(),
+        })
+        return record
+
+    def write_film_records(self, records):
+        """Create or update a page of films in one transaction.
+        
+        Each record is fingerprinted (see with_fingerprints) and compared with
+        the fingerprints stored on the film: its listing fingerprint always,
+        its details fingerprint when it was built from full details. Films
+        whose TMDB content is unchanged are not rewritten; only their status fields, timestamps and
+        next status check are bumped, with one UPDATE per status combination. New films are
+        inserted with a single bulk_create, which updates the row instead if
+        another process inserted the same IMDb ID meanwhile. Changed films are
+        written with a single bulk_update covering only the changed columns.
+        
+        Args:
+            records (list): Film records from build_film_record or process_listed_movie
+            
+        Returns:
+            list: IMDb IDs of all films in the records, for reconciliation
+        """
+        records = {record['imdb_id']: with_fingerprints(record) for record in records}
+        if not records:
+            return []
+
+        with transaction.atomic():
+            stored = {
+                imdb_id: (pk, {'listing_fingerprint': listing, 'tmdb_fingerprint': details})
+                for imdb_id, pk, listing, details in Film.objects.filter(
+                    imdb_id__in=list(records)
+                ).values_list('imdb_id', 'pk', 'listing_fingerprint', 'tmdb_fingerprint')
+            }
 
-            if not created:
-                self.update_existing_film(film, movie_data)
+            new_films = []
+            new_fields = set()
+            changed_ids = []
+            unchanged = {}
+            for imdb_id, record in records.items():
+                if imdb_id not in stored:
+                    new_films.append(Film(**{**self.get_film_defaults(record), **record}))
+                    new_fields.update(record)
+                elif any(record[name] != fingerprint for name, fingerprint in stored[imdb_id][1].items()
+                         if name in record):
+                    changed_ids.append(imdb_id)
+                else:
+                    # Group unchanged films by the status values they need
+                    key = (record['is_in_cinema'], record['is_upcoming'], 'details_updated_at' in record)
+                    unchanged.setdefault(key, []).append(stored[imdb_id][0])
 
-            action = 'Created' if created else 'Updated'
-            cert_info = f" with certification {film.uk_certification}" if film.uk_certification else " (no certification)"
-            self.stdout.write(f'{action} {film.title} ({film.imdb_id}){cert_info} - {"In Cinema" if film.is_in_cinema else "Upcoming" if film.is_upcoming else "Not in Cinema"}')
+            if new_films:
+                Film.objects.bulk_create(
+                    new_films,
+                    update_conflicts=True,
+                    unique_fields=['imdb_id'],
+                    update_fields=sorted(new_fields - {'imdb_id'}),
+                )
 
-            return film
+            changed_films = []
+            if changed_ids:
+                changed_fields = set()
+                for imdb_id, film in Film.objects.in_bulk(changed_ids, field_name='imdb_id').items():
+                    record = records[imdb_id]
+                    changed = [field for field, value in record.items() if getattr(film, field) != value]
+                    for field in changed:
+                        setattr(film, field, record[field])
+                    changed_films.append(film)
+                    changed_fields.update(changed)
+                Film.objects.bulk_update(changed_films, sorted(changed_fields))
 
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f'Error processing movie: {str(e)}'))
-            return None
+            # Written films were just checked, so their next status check moves on
+            written_ids = [film.imdb_id for film in new_films + changed_films]
+            if written_ids:
+                Film.objects.filter(imdb_id__in=written_ids).update(
+                    next_status_check_at=Film.next_status_check_expression()
+                )
+
+            now = timezone.now()
+            for (is_in_cinema, is_upcoming, details_fetched), pks in unchanged.items():
+                values = {
+                    'is_in_cinema': is_in_cinema,
+                    'is_upcoming': is_upcoming,
+                    'last_status_check': now,
+                    'next_status_check_at': Film.next_status_check_expression(
+                        now, checked_at=now, is_in_cinema=is_in_cinema, is_upcoming=is_upcoming
+                    ),
+                }
+                if details_fetched:
+                    values['details_updated_at'] = now
+                Film.objects.filter(pk__in=pks).update(**values)
+
+        unchanged_count = sum(len(pks) for pks in unchanged.values())
+        self.write_counts['created'] += len(new_films)
+        self.write_counts['changed'] += len(changed_films)
+        self.write_counts['unchanged'] += unchanged_count
+        self.stdout.write(
+            f'Wrote {len(records)} films: {len(new_films)} created, {len(changed_films)} changed, '
+            f'{unchanged_count} unchanged'
+        )
+        return list(records)
 
     def get_film_defaults(self, movie_data):
         """Get default values for creating a new film."""
         return {
+            'tmdb_id': movie_data.get('tmdb_id'),
             'title': movie_data.get('title', ''),
             'year': movie_data.get('year', ''),
             'poster_url': movie_data.get('poster_url'),
@@ -531,31 +1334,10 @@ class Command(BaseCommand):
             'vote_count': movie_data.get('vote_count', 0),
             'vote_average': movie_data.get('vote_average', 0.0),
             'revenue': movie_data.get('revenue', 0),
-            'needs_status_check': False,
             'last_status_check': timezone.now(),
+            'details_updated_at': movie_data.get('details_updated_at'),
         }
 
-    def update_existing_film(self, film, movie_data):
-        """Update an existing film with new data."""
-        update_fields = {}
-        
-        for field in ['title', 'year', 'poster_url', 'director', 'plot', 'genres',
-                     'runtime', 'actors', 'is_in_cinema', 'is_upcoming', 'uk_certification',
-                     'popularity', 'vote_count', 'vote_average', 'revenue']:
-            if field in movie_data and movie_data[field] is not None:
-                update_fields[field] = movie_data[field]
-
-        update_fields['needs_status_check'] = False
-        update_fields['last_status_check'] = timezone.now()
-
-        for field, value in update_fields.items():
-            setattr(film, field, value)
-
-        if movie_data.get('uk_release_date'):
-            film.uk_release_date = movie_data['uk_release_date']
-
-        film.save()
-
     def update_json_cache(self, force):
         """Update the JSON cache files."""
         self.stdout.write('Updating JSON cache...')
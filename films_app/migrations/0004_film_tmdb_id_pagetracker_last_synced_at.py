@@ -0,0 +1,28 @@
+# Generated by Django 5.1.1 on 2026-10-17 01:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('films_app', '0003_film_last_status_check'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='film',
+            name='tmdb_id',
+            field=models.IntegerField(blank=True, db_index=True, help_text='TMDB ID for this film', null=True),
+        ),
+        migrations.AddField(
+            model_name='pagetracker',
+            name='last_synced_at',
+            field=models.DateTimeField(blank=True, help_text='Start time of the last successful sync', null=True),
+        ),
+        migrations.AlterField(
+            model_name='pagetracker',
+            name='movie_type',
+            field=models.CharField(choices=[('now_playing', 'Now Playing'), ('upcoming', 'Upcoming'), ('changes', 'Changes Feed')], max_length=20, unique=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-17 01:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('films_app', '0004_film_tmdb_id_pagetracker_last_synced_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='film',
+            name='details_updated_at',
+            field=models.DateTimeField(blank=True, help_text='When full TMDB details were last applied to this film', null=True),
+        ),
+    ]
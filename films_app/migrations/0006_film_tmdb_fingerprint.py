@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-17 01:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('films_app', '0005_film_details_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='film',
+            name='tmdb_fingerprint',
+            field=models.CharField(blank=True, default='', help_text='Hash of the TMDB data last written to this film', max_length=64),
+        ),
+    ]
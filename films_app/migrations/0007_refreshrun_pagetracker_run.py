@@ -0,0 +1,35 @@
+# Generated by Django 5.1.1 on 2026-10-17 01:32
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('films_app', '0006_film_tmdb_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RefreshRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('phase', models.CharField(choices=[('flagged', 'Flagged Films'), ('now_playing', 'Now Playing'), ('upcoming', 'Upcoming'), ('done', 'Done')], default='flagged', max_length=20)),
+                ('status', models.CharField(choices=[('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='running', max_length=20)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='pagetracker',
+            name='run',
+            field=models.ForeignKey(blank=True, help_text='Refresh run that last_page belongs to', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='page_trackers', to='films_app.refreshrun'),
+        ),
+    ]
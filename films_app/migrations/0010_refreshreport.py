@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-17 01:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('films_app', '0009_backgroundjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RefreshReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mode', models.CharField(choices=[('refresh', 'Full Refresh'), ('sync', 'Incremental Sync'), ('join', 'Joined Run')], default='refresh', max_length=20)),
+                ('status', models.CharField(choices=[('completed', 'Completed'), ('failed', 'Failed')], max_length=20)),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField()),
+                ('duration', models.FloatField(help_text='Wall time in seconds')),
+                ('metrics', models.JSONField(default=dict, help_text='Phase timings, TMDB traffic and row counts')),
+                ('run', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reports', to='films_app.refreshrun')),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.1.1 on 2026-10-17 01:56
+
+from datetime import timedelta
+from django.db import migrations, models
+from django.db.models import Case, DateTimeField, DurationField, ExpressionWrapper, F, Q, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def schedule_films(apps, schema_editor):
+    """
+    Give every film a next status check.
+
+    Flagged films are due now. The rest are scheduled from their last check by
+    a frozen copy of Film.next_status_check_expression, as historical models
+    have no custom methods.
+    """
+    Film = apps.get_model('films_app', 'Film')
+    now = timezone.now()
+    today = now.date()
+
+    def days(count):
+        return Value(timedelta(days=count))
+
+    interval = Case(
+        When(is_in_cinema=True, uk_release_date__gt=today, then=days(1)),
+        When(uk_release_date__range=(today, today + timedelta(days=14)), then=days(1)),
+        When(Q(is_in_cinema=True) | Q(is_upcoming=True), then=days(3)),
+        When(uk_release_date__isnull=True, then=days(7)),
+        default=days(14),
+        output_field=DurationField(),
+    )
+    checked = Coalesce(F('last_status_check'), Value(now, output_field=DateTimeField()))
+    Film.objects.filter(needs_status_check=True).update(next_status_check_at=now)
+    Film.objects.filter(needs_status_check=False).update(
+        next_status_check_at=ExpressionWrapper(checked + interval, output_field=DateTimeField())
+    )
+
+
+def flag_due_films(apps, schema_editor):
+    Film = apps.get_model('films_app', 'Film')
+    Film.objects.filter(next_status_check_at__lte=timezone.now()).update(needs_status_check=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('films_app', '0010_refreshreport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='film',
+            name='next_status_check_at',
+            field=models.DateTimeField(blank=True, db_index=True, help_text="When this film's cinema status is next due to be checked", null=True),
+        ),
+        migrations.RunPython(schedule_films, flag_due_films),
+        migrations.RemoveField(
+            model_name='film',
+            name='needs_status_check',
+        ),
+    ]
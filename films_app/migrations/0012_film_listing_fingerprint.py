@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-17 02:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('films_app', '0011_film_next_status_check_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='film',
+            name='listing_fingerprint',
+            field=models.CharField(blank=True, default='', help_text='Hash of the TMDB discover listing data last written to this film', max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='film',
+            name='tmdb_fingerprint',
+            field=models.CharField(blank=True, default='', help_text='Hash of the TMDB details last written to this film', max_length=64),
+        ),
+    ]
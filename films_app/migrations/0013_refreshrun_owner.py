@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-17 02:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('films_app', '0012_film_listing_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='refreshrun',
+            name='owner',
+            field=models.CharField(blank=True, default='', help_text='host:pid:thread of the process driving the run', max_length=255),
+        ),
+    ]
@@ -1,4 +1,12 @@
-from django.db import models
+import uuid
+from datetime import timedelta
+from functools import reduce
+from operator import and_, or_
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, DateTimeField, DurationField, ExpressionWrapper, F, Q, Value, When
+from django.db.models.functions import Coalesce, Concat
+from django.utils import timezone
 from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
@@ -7,6 +15,7 @@ from django.dispatch import receiver
 class Film(models.Model):
     """Model representing a film from TMDB API."""
     imdb_id = models.CharField(max_length=20, unique=True)
+    tmdb_id = models.IntegerField(blank=True, null=True, db_index=True, help_text="TMDB ID for this film")
     title = models.CharField(max_length=255)
     year = models.CharField(max_length=10)
     poster_url = models.URLField(max_length=500, blank=True, null=True)
@@ -28,8 +37,23 @@ class Film(models.Model):
     revenue = models.BigIntegerField(default=0, help_text="Total box office revenue in USD from TMDB API")
     
     # Status tracking fields
-    needs_status_check = models.BooleanField(default=False, help_text="Flag indicating this film needs a priority status check")
     last_status_check = models.DateTimeField(blank=True, null=True, help_text="When this film was last checked for status updates")
+    next_status_check_at = models.DateTimeField(blank=True, null=True, db_index=True,
+                                                help_text="When this film's cinema status is next due to be checked")
+    details_updated_at = models.DateTimeField(blank=True, null=True, help_text="When full TMDB details were last applied to this film")
+    tmdb_fingerprint = models.CharField(max_length=64, blank=True, default='', help_text="Hash of the TMDB details last written to this film")
+    listing_fingerprint = models.CharField(max_length=64, blank=True, default='', help_text="Hash of the TMDB discover listing data last written to this film")
+    
+    # Cinema status check schedule: a film is next checked this many days after
+    # its last check, by the first rule that applies. Transitions that follow
+    # from the release date are made locally by apply_date_transitions().
+    STATUS_CHECK_RELEASE_WINDOW_DAYS = 14  # Releasing within this many days, when dates often move
+    STATUS_CHECK_DAYS_AMBIGUOUS = 1        # Status the release date cannot explain
+    STATUS_CHECK_DAYS_RELEASE = 1
+    STATUS_CHECK_DAYS_SHOWING = 3
+    STATUS_CHECK_DAYS_UNDATED = 7
+    STATUS_CHECK_DAYS_DEFAULT = 14
+    STATUS_CHECK_DAYS_RETRY = 1            # After a check that could not reach TMDB
     
     def __str__(self):
         return f"{self.title} ({self.year})"
@@ -37,6 +61,176 @@ class Film(models.Model):
     class Meta:
         ordering = ['title']
     
+    @classmethod
+    def next_status_check_expression(cls, now=None, checked_at=None, is_in_cinema=None, is_upcoming=None):
+        """
+        Build an SQL expression for when each film's cinema status is next due to be checked.
+        
+        The interval after the last check depends on how close the UK release
+        date is and on what the check found. Films shown in cinemas before
+        their release date and films about to be released are due daily, as
+        their release has probably been rescheduled or soon may be, and films
+        in cinemas or upcoming every few days. Undated films are due weekly
+        and everything else fortnightly.
+        
+        Args:
+            now (datetime, optional): Current time, which places the release-date window
+            checked_at (datetime, optional): Time the status was just established; defaults to
+                the last_status_check column, or now for films never checked
+            is_in_cinema (bool, optional): Status established then; defaults to the column
+            is_upcoming (bool, optional): Status established then; defaults to the column
+            
+        Returns:
+            Expression: A datetime expression usable in update() or annotate()
+        """
+        now = now or timezone.now()
+        today = now.date()
+        window = timedelta(days=cls.STATUS_CHECK_RELEASE_WINDOW_DAYS)
+        
+        # A status given by the caller is a constant condition rather than a column test
+        def status(field, value):
+            return Q(**{field: True}) if value is None else bool(value)
+        
+        def all_of(*conditions):
+            if any(condition is False for condition in conditions):
+                return False
+            tests = [condition for condition in conditions if condition is not True]
+            return reduce(and_, tests) if tests else True
+        
+        def any_of(*conditions):
+            if any(condition is True for condition in conditions):
+                return True
+            tests = [condition for condition in conditions if condition is not False]
+            return reduce(or_, tests) if tests else False
+        
+        in_cinema = status('is_in_cinema', is_in_cinema)
+        upcoming = status('is_upcoming', is_upcoming)
+        ambiguous = all_of(in_cinema, Q(uk_release_date__gt=today))
+        showing = any_of(in_cinema, upcoming)
+        
+        rules = [
+            (ambiguous, cls.STATUS_CHECK_DAYS_AMBIGUOUS),
+            (Q(uk_release_date__range=(today, today + window)), cls.STATUS_CHECK_DAYS_RELEASE),
+            (showing, cls.STATUS_CHECK_DAYS_SHOWING),
+            (Q(uk_release_date__isnull=True), cls.STATUS_CHECK_DAYS_UNDATED),
+        ]
+        whens = []
+        default = cls.STATUS_CHECK_DAYS_DEFAULT
+        for condition, days in rules:
+            if condition is True:
+                default = days
+                break
+            if condition is not False:
+                whens.append(When(condition, then=Value(timedelta(days=days))))
+        interval = Case(*whens, default=Value(timedelta(days=default)), output_field=DurationField())
+        
+        if checked_at is not None:
+            checked = Value(checked_at, output_field=DateTimeField())
+        else:
+            checked = Coalesce(F('last_status_check'), Value(now, output_field=DateTimeField()))
+        return ExpressionWrapper(checked + interval, output_field=DateTimeField())
+    
+    @classmethod
+    def reschedule_status_checks(cls, films=None, now=None):
+        """
+        Bring films' next status checks forward to what their release date and status call for.
+        
+        Checks are only ever brought forward: films whose release date has
+        moved into the window or no longer explains their status become due,
+        while the short retry after a failed check is kept. A check that could
+        now wait longer is rescheduled when it runs.
+        
+        Args:
+            films (QuerySet, optional): Films to reschedule; defaults to all films
+            now (datetime, optional): Current time
+            
+        Returns:
+            int: Number of films rescheduled
+        """
+        now = now or timezone.now()
+        films = cls.objects.all() if films is None else films
+        next_check = cls.next_status_check_expression(now)
+        return films.filter(
+            Q(next_status_check_at__isnull=True) | Q(next_status_check_at__gt=next_check)
+        ).update(next_status_check_at=next_check)
+    
+    @classmethod
+    def status_check_due(cls, now=None):
+        """
+        Get every film whose cinema status check is due.
+        
+        Films created outside a refresh (e.g. from a film page) have no
+        scheduled check yet and are due straight away.
+        
+        Args:
+            now (datetime, optional): Current time
+            
+        Returns:
+            QuerySet: Due films, unordered
+        """
+        now = now or timezone.now()
+        return cls.objects.filter(Q(next_status_check_at__lte=now) | Q(next_status_check_at__isnull=True))
+    
+    @classmethod
+    def due_for_status_check(cls, limit, now=None):
+        """
+        Get the films most overdue for a cinema status check.
+        
+        Args:
+            limit (int): Maximum number of films to return
+            now (datetime, optional): Current time
+            
+        Returns:
+            QuerySet: Due films, unscheduled and then most overdue first
+        """
+        return cls.status_check_due(now).order_by(F('next_status_check_at').asc(nulls_first=True))[:limit]
+    
+    @classmethod
+    def apply_date_transitions(cls, now=None):
+        """
+        Move films between upcoming, in cinemas and neither by their UK release date.
+        
+        Upcoming films whose release date has arrived are now in cinemas, and
+        films released more than CINEMA_RUN_DAYS ago have left them. Each
+        transition is a single UPDATE that counts as a status check and
+        reschedules the next one, so none of them costs a TMDB request. Films without a
+        release date are left for their scheduled check.
+        
+        Args:
+            now (datetime, optional): Current time
+            
+        Returns:
+            dict: Number of films 'released' and 'left_cinemas'
+        """
+        now = now or timezone.now()
+        today = now.date()
+        run_started = today - timedelta(days=getattr(settings, 'CINEMA_RUN_DAYS', 90))
+        
+        # A film whose run is already over goes straight out, so this runs first
+        left_cinemas = cls.objects.filter(
+            Q(is_in_cinema=True) | Q(is_upcoming=True),
+            uk_release_date__lt=run_started,
+        ).update(
+            is_in_cinema=False,
+            is_upcoming=False,
+            last_status_check=now,
+            next_status_check_at=cls.next_status_check_expression(
+                now, checked_at=now, is_in_cinema=False, is_upcoming=False
+            ),
+        )
+        released = cls.objects.filter(
+            is_upcoming=True,
+            uk_release_date__lte=today,
+        ).update(
+            is_in_cinema=True,
+            is_upcoming=False,
+            last_status_check=now,
+            next_status_check_at=cls.next_status_check_expression(
+                now, checked_at=now, is_in_cinema=True, is_upcoming=False
+            ),
+        )
+        return {'released': released, 'left_cinemas': left_cinemas}
+    
     @property
     def genre_list(self):
         """Return genres as a list."""
@@ -759,41 +953,356 @@ class Activity(models.Model):
         return f"{self.user.username} - {self.activity_type} - {self.created_at.strftime('%Y-%m-%d %H:%M')}"
 
 
+class RefreshRun(models.Model):
+    """Checkpoint of a cinema cache refresh run, so an interrupted run can be resumed."""
+    
+    PHASE_CHOICES = [
+        ('flagged', 'Flagged Films'),
+        ('now_playing', 'Now Playing'),
+        ('upcoming', 'Upcoming'),
+        ('done', 'Done'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    run_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    phase = models.CharField(max_length=20, choices=PHASE_CHOICES, default='flagged')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+    owner = models.CharField(max_length=255, blank=True, default='', help_text="host:pid:thread of the process driving the run")
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['-started_at']
+    
+    def __str__(self):
+        return f"Refresh {self.run_id} - {self.get_phase_display()} ({self.get_status_display()})"
+    
+    @classmethod
+    def latest_resumable(cls):
+        """Get the most recent run that did not complete, or None."""
+        return cls.objects.exclude(status='completed').order_by('-started_at').first()
+    
+    def reached(self, phase):
+        """Check whether the run has already completed the phases before the given one."""
+        phases = [choice[0] for choice in self.PHASE_CHOICES]
+        return phases.index(self.phase) > phases.index(phase)
+    
+    def advance(self, phase):
+        """Record that the run has moved on to the given phase."""
+        self.phase = phase
+        self.save(update_fields=['phase', 'updated_at'])
+    
+    def finish(self, status='completed'):
+        """Mark the run as finished."""
+        if status == 'completed':
+            self.phase = 'done'
+        self.status = status
+        self.finished_at = timezone.now()
+        self.save(update_fields=['phase', 'status', 'finished_at', 'updated_at'])
+
+
+class RefreshReport(models.Model):
+    """Machine-readable metrics of one update_movie_cache invocation."""
+    
+    MODE_CHOICES = [
+        ('refresh', 'Full Refresh'),
+        ('sync', 'Incremental Sync'),
+        ('join', 'Joined Run'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    # Order in which phases are listed; phases a run skipped are left out
+    PHASES = ['sync', 'transitions', 'flagged', 'now_playing', 'upcoming', 'discover', 'reconciliation']
+    
+    ROW_LABELS = [
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('skipped', 'Skipped (unchanged)'),
+        ('status_updated', 'Status changed'),
+        ('released', 'Released into cinemas'),
+        ('left_cinemas', 'Left cinemas'),
+        ('no_longer_upcoming', 'No longer upcoming'),
+    ]
+    
+    run = models.ForeignKey(RefreshRun, on_delete=models.SET_NULL, blank=True, null=True, related_name='reports')
+    mode = models.CharField(max_length=20, choices=MODE_CHOICES, default='refresh')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    duration = models.FloatField(help_text="Wall time in seconds")
+    metrics = models.JSONField(default=dict, help_text="Phase timings, TMDB traffic and row counts")
+    
+    class Meta:
+        ordering = ['-started_at']
+    
+    def __str__(self):
+        return f"{self.get_mode_display()} report {self.started_at:%Y-%m-%d %H:%M} ({self.get_status_display()})"
+    
+    @property
+    def phase_timings(self):
+        """List of (phase, seconds) pairs in pipeline order."""
+        phases = self.metrics.get('phases', {})
+        return [(phase, phases[phase]) for phase in self.PHASES if phase in phases]
+    
+    @property
+    def row_counts(self):
+        """List of (label, count) pairs for the film rows the run wrote."""
+        rows = self.metrics.get('rows', {})
+        return [(label, rows[key]) for key, label in self.ROW_LABELS if key in rows]
+    
+    @property
+    def details_hit_ratio(self):
+        """Share of movie details lookups served from the cache, or None if there were none."""
+        return self.metrics.get('tmdb', {}).get('cache', {}).get('details', {}).get('hit_ratio')
+
+
 class PageTracker(models.Model):
     """Model to track the last processed page for each movie type."""
     
     MOVIE_TYPE_CHOICES = [
         ('now_playing', 'Now Playing'),
         ('upcoming', 'Upcoming'),
+        ('changes', 'Changes Feed'),
     ]
     
     movie_type = models.CharField(max_length=20, choices=MOVIE_TYPE_CHOICES, unique=True)
     last_page = models.IntegerField(default=0)
     total_pages = models.IntegerField(default=0)
     last_updated = models.DateTimeField(auto_now=True)
+    last_synced_at = models.DateTimeField(blank=True, null=True, help_text="Start time of the last successful sync")
+    run = models.ForeignKey(RefreshRun, on_delete=models.SET_NULL, blank=True, null=True, related_name='page_trackers',
+                            help_text="Refresh run that last_page belongs to")
     
     def __str__(self):
         return f"{self.get_movie_type_display()} - Page {self.last_page} of {self.total_pages}"
     
     @classmethod
-    def get_next_page(cls, movie_type):
-        """Get the next page to process for the given movie type."""
+    def get_next_page(cls, movie_type, run=None):
+        """Get the next page to process for the given movie type.
+        
+        When a run is given, pages checkpointed by a different run do not count.
+        """
         tracker, created = cls.objects.get_or_create(movie_type=movie_type)
         
         # If this is a new tracker or we've processed all pages, start from page 1
         if created or tracker.last_page >= tracker.total_pages:
             return 1
         
+        # Pages completed by another run have to be redone
+        if run is not None and tracker.run_id != run.pk:
+            return 1
+        
         # Otherwise, return the next page
         return tracker.last_page + 1
     
     @classmethod
-    def update_tracker(cls, movie_type, current_page, total_pages):
+    def update_tracker(cls, movie_type, current_page, total_pages, run=None):
         """Update the tracker with the current page and total pages."""
         tracker, _ = cls.objects.get_or_create(movie_type=movie_type)
         tracker.last_page = current_page
         tracker.total_pages = total_pages
+        tracker.run = run
         tracker.save()
+    
+    @classmethod
+    def get_last_synced_at(cls, movie_type='changes'):
+        """Get the start time of the last successful sync, or None if there was none."""
+        tracker = cls.objects.filter(movie_type=movie_type).first()
+        return tracker.last_synced_at if tracker else None
+    
+    @classmethod
+    def mark_synced(cls, synced_at, movie_type='changes'):
+        """Record the start time of a successful sync."""
+        tracker, _ = cls.objects.get_or_create(movie_type=movie_type)
+        tracker.last_synced_at = synced_at
+        tracker.save()
+
+
+class Lease(models.Model):
+    """Time-limited claim on a named resource, shared by every process using the database.
+    
+    Used for mutual exclusion between cache refresh entry points, and to hand
+    out the discover pages of a refresh run as work items. A lease that is not
+    renewed before expires_at can be taken over by another owner. A completed
+    lease marks a finished work item and is never handed out again.
+    """
+    
+    name = models.CharField(max_length=200, unique=True)
+    owner = models.CharField(max_length=255, help_text="host:pid:thread of the holder")
+    acquired_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+    
+    def __str__(self):
+        return f"{self.name} held by {self.owner} until {self.expires_at}"
+    
+    @classmethod
+    def acquire(cls, name, owner, ttl):
+        """Take the named lease if it is free, expired or already ours.
+        
+        Args:
+            name (str): The resource name
+            owner (str): Identifies the holder, see films_app.leases.lease_owner()
+            ttl (float): Seconds until the lease expires unless renewed
+            
+        Returns:
+            Lease: The lease, or None if another owner holds it or it is completed
+        """
+        now = timezone.now()
+        expires_at = now + timedelta(seconds=ttl)
+        
+        # A single UPDATE, so two processes cannot both take over an expired lease
+        taken = cls.objects.filter(name=name, completed_at__isnull=True).filter(
+            models.Q(owner=owner) | models.Q(expires_at__lte=now)
+        ).update(owner=owner, acquired_at=now, expires_at=expires_at)
+        if taken:
+            return cls.objects.get(name=name)
+        
+        try:
+            with transaction.atomic():
+                return cls.objects.create(name=name, owner=owner, acquired_at=now, expires_at=expires_at)
+        except IntegrityError:
+            return None
+    
+    @classmethod
+    def is_completed(cls, name):
+        """Check whether the named work item has been completed."""
+        return cls.objects.filter(name=name, completed_at__isnull=False).exists()
+    
+    def renew(self, ttl):
+        """Extend the lease by ttl seconds from now.
+        
+        Returns:
+            bool: False if the lease was lost to another owner
+        """
+        self.expires_at = timezone.now() + timedelta(seconds=ttl)
+        return bool(Lease.objects.filter(pk=self.pk, owner=self.owner).update(expires_at=self.expires_at))
+    
+    def complete(self):
+        """Mark the work item as done; it stays in the table so nobody redoes it."""
+        self.completed_at = timezone.now()
+        return bool(Lease.objects.filter(pk=self.pk, owner=self.owner).update(completed_at=self.completed_at))
+    
+    def release(self):
+        """Give the lease up so another owner can take it straight away."""
+        Lease.objects.filter(pk=self.pk, owner=self.owner, completed_at__isnull=True).delete()
+
+
+class BackgroundJob(models.Model):
+    """Long-running task queued from the web UI and executed by the run_background_jobs command."""
+    
+    JOB_TYPE_CHOICES = [
+        ('refresh_cinema_cache', 'Refresh Cinema Cache'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    
+    job_type = models.CharField(max_length=50, choices=JOB_TYPE_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued', db_index=True)
+    options = models.JSONField(default=dict, blank=True, help_text="Keyword arguments for the job handler")
+    log = models.TextField(blank=True, default='')
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True, related_name='background_jobs')
+    worker = models.CharField(max_length=255, blank=True, default='', help_text="host:pid of the worker that ran the job")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    
+    # Characters of the log shown while a job is in progress
+    LOG_TAIL_CHARS = 20000
+    
+    # Prefix of the Lease a worker holds while it runs a job
+    LEASE_PREFIX = 'background-job:'
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.get_job_type_display()} #{self.pk} ({self.get_status_display()})"
+    
+    @property
+    def is_finished(self):
+        """Whether the job has succeeded or failed."""
+        return self.status in ('succeeded', 'failed')
+    
+    @property
+    def log_tail(self):
+        """The end of the log, to keep progress responses small."""
+        return self.log[-self.LOG_TAIL_CHARS:]
+    
+    @property
+    def lease_name(self):
+        """Name of the Lease renewed by the worker running this job."""
+        return f"{self.LEASE_PREFIX}{self.pk}"
+    
+    @classmethod
+    def fail_abandoned(cls, ttl):
+        """Fail running jobs whose worker has stopped renewing their lease.
+        
+        A worker that crashes or is restarted leaves its job running; without
+        this, no new job of the same type could be queued.
+        
+        Args:
+            ttl (float): Seconds a job may run without a live lease, which
+                covers the moment between claiming a job and taking its lease
+            
+        Returns:
+            int: Number of jobs failed
+        """
+        now = timezone.now()
+        live_leases = set(Lease.objects.filter(
+            name__startswith=cls.LEASE_PREFIX, expires_at__gt=now
+        ).values_list('name', flat=True))
+        failed = 0
+        for job in cls.objects.filter(status='running', started_at__lt=now - timedelta(seconds=ttl)):
+            if job.lease_name in live_leases:
+                continue
+            if cls.objects.filter(pk=job.pk, status='running').update(status='failed', finished_at=now):
+                job.append_log(f"\nJob abandoned: worker {job.worker} stopped responding\n")
+                failed += 1
+        return failed
+    
+    @classmethod
+    def claim_next(cls, worker):
+        """Claim the oldest queued job for a worker.
+        
+        The claim is a conditional UPDATE, so two workers never run the same job.
+        
+        Returns:
+            BackgroundJob: The claimed job, now running, or None if the queue is empty
+        """
+        for job in cls.objects.filter(status='queued').order_by('created_at')[:10]:
+            claimed = cls.objects.filter(pk=job.pk, status='queued').update(
+                status='running', worker=worker, started_at=timezone.now()
+            )
+            if claimed:
+                job.refresh_from_db()
+                return job
+        return None
+    
+    def append_log(self, text):
+        """Append text to the log in the database without rewriting the whole row."""
+        BackgroundJob.objects.filter(pk=self.pk).update(log=Concat('log', Value(text)))
+    
+    def finish(self, status):
+        """Mark the job as succeeded or failed."""
+        self.status = status
+        self.finished_at = timezone.now()
+        BackgroundJob.objects.filter(pk=self.pk).update(status=status, finished_at=self.finished_at)
 
 
 class Cinema(models.Model):
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+from django.core.management.base import CommandError
+from django.test import TestCase
+from films_app import tmdb_async
+from films_app.models import Film
+from films_app.tmdb_api import MOVIE_DETAILS_APPEND, get_now_playing_params, get_upcoming_params
+from films_app.tmdb_client import get_circuit_breaker, get_client, get_concurrency_controller
+from films_app.tests.utils import TMDBStubMixin, make_update_command
+
+
+def details(tmdb_id, imdb_id=None):
+    return {
+        'id': tmdb_id, 'title': f'Film {tmdb_id}', 'release_date': '2026-09-01', 'overview': '',
+        'genres': [], 'credits': {'cast': [], 'crew': []}, 'release_dates': {'results': []},
+        'external_ids': {'imdb_id': imdb_id},
+    }
+
+
+@unittest.skipUnless(tmdb_async.AIOHTTP_AVAILABLE, 'the async engine requires aiohttp')
+class AsyncEngineRefreshTests(TMDBStubMixin, TestCase):
+    """Refreshing now playing and upcoming films with the async engine."""
+
+    def setUp(self):
+        super().setUp()
+        self.command = make_update_command(engine='async', max_concurrency=4)
+        self.stub_response('discover/movie', {'page': 1, 'total_pages': 1, 'results': []},
+                           get_upcoming_params(time_window_months=6, page=1))
+        for tmdb_id, imdb_id in ((1, 'tt0000001'), (2, None)):
+            self.stub_response(f'movie/{tmdb_id}', details(tmdb_id, imdb_id), {'append_to_response': MOVIE_DETAILS_APPEND})
+
+    def stub_now_playing(self, page, ids, total_pages=1):
+        body = {'page': page, 'total_pages': total_pages, 'results': [{'id': movie_id} for movie_id in ids]}
+        self.stub_response('discover/movie', body, get_now_playing_params(page=page))
+
+    def test_film_without_imdb_id_is_stored_under_tmdb_id(self):
+        self.stub_now_playing(1, [1, 2])
+
+        self.command._process_movies_async(max_pages=1, time_window_months=6)
+
+        self.assertEqual(
+            set(Film.objects.values_list('imdb_id', 'tmdb_id')),
+            {('tt0000001', 1), ('tmdb-2', 2)},
+        )
+
+    def test_invalid_json_response_is_a_failed_request(self):
+        self.stub_now_playing(1, [1, 2])
+        loads = json.loads
+
+        def fail_for_film_2(body):
+            if body.startswith(b'{"id": 2,'):
+                raise ValueError('Expecting value')
+            return loads(body)
+
+        with mock.patch.object(tmdb_async.json, 'loads', side_effect=fail_for_film_2):
+            self.command._process_movies_async(max_pages=1, time_window_months=6)
+
+        # The film is still stored from its listing row rather than aborting the refresh
+        self.assertEqual(
+            set(Film.objects.values_list('imdb_id', 'tmdb_id')),
+            {('tt0000001', 1), ('tmdb-2', 2)},
+        )
+
+    def test_failed_discover_page_fails_the_run(self):
+        self.stub_now_playing(1, [1], total_pages=2)
+
+        with self.assertRaises(CommandError):
+            self.command._process_movies_async(max_pages=2, time_window_months=6)
+
+        # Films from the pages that did arrive are still written
+        self.assertTrue(Film.objects.filter(imdb_id='tt0000001').exists())
+
+
+@unittest.skipUnless(tmdb_async.AIOHTTP_AVAILABLE, 'the async engine requires aiohttp')
+class AsyncEngineRequestTests(TMDBStubMixin, TestCase):
+    """Requests, retries and caching in the async engine."""
+
+    def run_engine(self, fetch):
+        async def run():
+            async with tmdb_async.AsyncTMDBEngine(max_concurrency=4) as engine:
+                return await fetch(engine)
+        return asyncio.run(run())
+
+    def test_server_errors_are_retried_then_fail(self):
+        self.stub_response('movie/1', {'status_message': 'Internal error.'}, status=503)
+
+        self.assertIsNone(self.run_engine(lambda engine: engine.get_json('movie/1')))
+
+        self.assertEqual(self.stub.stats()['requests'], get_client().retry_policy.max_retries + 1)
+
+    def test_open_circuit_breaker_sends_no_request(self):
+        breaker = get_circuit_breaker()
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+        self.assertIsNone(self.run_engine(lambda engine: engine.get_json('movie/1')))
+
+        self.assertEqual(self.stub.stats()['requests'], 0)
+
+    def test_details_are_served_from_the_cache_once_fetched(self):
+        self.stub_response('movie/1', details(1, 'tt0000001'), {'append_to_response': MOVIE_DETAILS_APPEND})
+
+        async def fetch_twice(engine):
+            return [await engine.fetch_details(1), await engine.fetch_details(1)]
+
+        first, second = self.run_engine(fetch_twice)
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.stub.stats()['requests'], 1)
+
+    def test_movies_of_all_pages_are_returned_in_discover_order(self):
+        for page, ids in ((1, [3, 1]), (2, [2])):
+            body = {'page': page, 'total_pages': 2, 'results': [{'id': movie_id} for movie_id in ids]}
+            self.stub_response('discover/movie', body, get_now_playing_params(page=page))
+
+        movies, pages_fetched, total_pages, pages_failed = self.run_engine(
+            lambda engine: engine.fetch_movies('now_playing', skip_details={1, 2, 3})
+        )
+
+        self.assertEqual([listing['tmdb_id'] for listing, _ in movies], [3, 1, 2])
+        self.assertEqual((pages_fetched, total_pages, pages_failed), (2, 2, 0))
+
+
+@unittest.skipUnless(tmdb_async.AIOHTTP_AVAILABLE, 'the async engine requires aiohttp')
+class AsyncEngineConcurrencyTests(TMDBStubMixin, TestCase):
+    """The async engine sharing the adaptive concurrency controller with the threads engine."""
+
+    def get_json(self, endpoint):
+        async def fetch():
+            async with tmdb_async.AsyncTMDBEngine(max_concurrency=4) as engine:
+                return await engine.get_json(endpoint)
+        return asyncio.run(fetch())
+
+    def test_throttling_reduces_shared_limit(self):
+        self.stub_response('movie/1', {'status_message': 'Too many requests'}, status=429)
+        controller = get_concurrency_controller()
+        limit = controller.limit
+
+        self.assertIsNone(self.get_json('movie/1'))
+
+        self.assertEqual(controller.stats()['decreases'], 1)
+        self.assertLess(controller.limit, limit)
+        self.assertEqual(controller.stats()['in_flight'], 0)
+
+    def test_requests_wait_for_a_free_slot(self):
+        self.stub_response('movie/1', {'id': 1})
+        controller = get_concurrency_controller()
+        while controller.try_acquire():
+            pass
+
+        async def fetch_after_release():
+            async with tmdb_async.AsyncTMDBEngine(max_concurrency=4) as engine:
+                request = asyncio.ensure_future(engine.get_json('movie/1'))
+                await asyncio.sleep(0.05)
+                self.assertFalse(request.done())
+                controller.release(0, 'error')
+                return await request
+
+        self.assertEqual(asyncio.run(fetch_after_release()), {'id': 1})
@@ -0,0 +1,87 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from films_app.models import Film
+from films_app.tmdb_api import CHANGES_MAX_DAYS, MOVIE_DETAILS_APPEND
+from films_app.tests.utils import TMDBStubMixin, make_update_command
+
+
+def details(tmdb_id, title, uk_release_date):
+    return {
+        'id': tmdb_id, 'title': title, 'release_date': '2026-01-01', 'overview': 'Plot',
+        'genres': [{'name': 'Drama'}], 'credits': {'cast': [], 'crew': []},
+        'external_ids': {'imdb_id': f'tt000000{tmdb_id}'},
+        'release_dates': {'results': [{'iso_3166_1': 'GB', 'release_dates': [
+            {'type': 3, 'certification': '15', 'release_date': f'{uk_release_date}T00:00:00.000Z'},
+        ]}]},
+    }
+
+
+class ChangesFeedSyncTests(TMDBStubMixin, TestCase):
+    """Incremental syncs that refetch the details of films changed on TMDB."""
+
+    def setUp(self):
+        super().setUp()
+        self.now = timezone.now()
+        self.since = self.now - timedelta(days=1)
+        self.release = self.now.date() + timedelta(days=5)
+        self.film = Film.objects.create(
+            imdb_id='tt0000001', tmdb_id=1, title='Old title', year='2026',
+            last_status_check=self.now - timedelta(days=3),
+            next_status_check_at=self.now + timedelta(days=11),
+        )
+        self.stub_response('movie/changes', {'page': 1, 'total_pages': 1, 'results': [{'id': 1}, {'id': 99}]},
+                           {'start_date': self.since.strftime('%Y-%m-%d'), 'page': 1})
+        self.details = details(1, 'New title', self.release.isoformat())
+        self.stub_response('movie/1', self.details, {'append_to_response': MOVIE_DETAILS_APPEND})
+        self.command = make_update_command()
+
+    def test_changed_film_details_are_refreshed(self):
+        self.assertTrue(self.command.sync_changed_films(self.since, use_parallel=False))
+
+        self.film.refresh_from_db()
+        self.assertEqual((self.film.title, self.film.uk_release_date), ('New title', self.release))
+        self.assertEqual(self.command.write_counts['changed'], 1)
+
+    def test_release_date_moving_into_window_makes_film_due(self):
+        self.command.sync_changed_films(self.since, use_parallel=False)
+
+        self.assertIn(self.film, Film.due_for_status_check(10))
+
+    def test_full_refresh_does_not_rewrite_synced_film(self):
+        self.command.sync_changed_films(self.since, use_parallel=False)
+
+        listing = {'id': 1, 'tmdb_id': 1, 'title': 'New title'}
+        record = self.command.build_detailed_record(listing, self.details, 'upcoming')
+        self.command.write_film_records([record])
+
+        self.assertEqual(self.command.write_counts['unchanged'], 1)
+
+    def test_film_stored_under_placeholder_id_is_tracked(self):
+        placeholder = Film.objects.create(imdb_id='tmdb-99', title='Placeholder', year='2026')
+
+        self.assertEqual(
+            {film.pk for film in self.command.get_tracked_films({1, 99, 100})},
+            {self.film.pk, placeholder.pk},
+        )
+
+    def test_changes_feed_pages_are_all_read(self):
+        self.stub_response('movie/changes', {'page': 1, 'total_pages': 2, 'results': [{'id': 99}]},
+                           {'start_date': self.since.strftime('%Y-%m-%d'), 'page': 1})
+        self.stub_response('movie/changes', {'page': 2, 'total_pages': 2, 'results': [{'id': 1}]},
+                           {'start_date': self.since.strftime('%Y-%m-%d'), 'page': 2})
+
+        self.command.sync_changed_films(self.since, use_parallel=False)
+
+        self.assertEqual(self.command.write_counts['changed'], 1)
+
+    def test_full_refresh_is_needed_without_a_usable_changes_feed(self):
+        self.assertFalse(self.command.sync_changed_films(None, use_parallel=False))
+        too_old = self.now - timedelta(days=CHANGES_MAX_DAYS)
+        self.assertFalse(self.command.sync_changed_films(too_old, use_parallel=False))
+        self.stub_response('movie/changes', {'status_message': 'The resource you requested could not be found.'},
+                           {'start_date': self.since.strftime('%Y-%m-%d'), 'page': 1}, status=404)
+        self.assertFalse(self.command.sync_changed_films(self.since, use_parallel=False))
+
+        self.film.refresh_from_db()
+        self.assertEqual(self.film.title, 'Old title')
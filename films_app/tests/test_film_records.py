@@ -0,0 +1,58 @@
+from datetime import date
+from django.test import TestCase
+from django.utils import timezone
+from films_app.models import Film
+from films_app.tests.utils import make_update_command
+
+LISTING = {
+    'title': 'Listed', 'year': '2026', 'poster_url': 'https://image.tmdb.org/t/p/w500/a.jpg',
+    'popularity': 12.5, 'vote_count': 40, 'vote_average': 7.1,
+}
+DETAILS = dict(
+    LISTING, tmdb_id=7, director='A Director', plot='A plot', genres='Drama', runtime='101 min',
+    actors='One, Two', uk_certification='12A', revenue=0, uk_release_date=date(2026, 10, 1),
+)
+
+
+class WriteFilmRecordsTests(TestCase):
+    """Skipping unchanged films when writing discover pages."""
+
+    def setUp(self):
+        self.command = make_update_command()
+
+    def details_record(self, **changes):
+        record = dict(DETAILS, details_updated_at=timezone.now(), **changes)
+        return self.command._with_status(record, 'tt0000007', 'now_playing')
+
+    def listing_record(self, **changes):
+        return self.command._with_status(dict(LISTING, **changes), 'tt0000007', 'now_playing')
+
+    def write(self, record):
+        self.command.write_counts = {'created': 0, 'changed': 0, 'unchanged': 0}
+        self.command.write_film_records([record])
+        return self.command.write_counts
+
+    def test_alternating_record_kinds_skip_unchanged_film(self):
+        self.assertEqual(self.write(self.details_record())['created'], 1)
+        self.assertEqual(self.write(self.listing_record())['unchanged'], 1)
+        self.assertEqual(self.write(self.details_record())['unchanged'], 1)
+        self.assertEqual(self.write(self.listing_record())['unchanged'], 1)
+
+    def test_listing_change_is_written(self):
+        self.write(self.details_record())
+        self.assertEqual(self.write(self.listing_record(popularity=99.0))['changed'], 1)
+        self.assertEqual(Film.objects.get().popularity, 99.0)
+
+    def test_details_change_is_written(self):
+        self.write(self.details_record())
+        self.write(self.listing_record())
+        self.assertEqual(self.write(self.details_record(plot='A new plot'))['changed'], 1)
+        self.assertEqual(Film.objects.get().plot, 'A new plot')
+
+    def test_unchanged_film_status_is_still_updated(self):
+        self.write(self.details_record())
+        record = self.command._with_status(dict(LISTING), 'tt0000007', 'upcoming')
+        self.assertEqual(self.write(record)['unchanged'], 1)
+        film = Film.objects.get()
+        self.assertFalse(film.is_in_cinema)
+        self.assertTrue(film.is_upcoming)
@@ -0,0 +1,50 @@
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase
+from films_app.management.commands import fix_certifications
+from films_app.models import Film
+from films_app.tests.utils import TMDBStubMixin
+
+
+def uk_release_dates(certification):
+    return {'results': [{'iso_3166_1': 'GB', 'release_dates': [{'type': 3, 'certification': certification}]}]}
+
+
+class FixCertificationsTests(TMDBStubMixin, TestCase):
+    """Filling in UK certifications from TMDB release dates."""
+
+    def setUp(self):
+        super().setUp()
+        self.stub_response('find/tt0000001', {'movie_results': [{'id': 1}]}, {'external_source': 'imdb_id'})
+        self.stub_response('movie/1/release_dates', dict(uk_release_dates('15'), id=1))
+
+    def run_command(self, *args):
+        call_command('fix_certifications', *args, stdout=StringIO())
+
+    def test_tmdb_id_found_from_imdb_id_is_saved(self):
+        film = Film.objects.create(imdb_id='tt0000001', title='Film 1', year='2026')
+
+        self.run_command()
+
+        film.refresh_from_db()
+        self.assertEqual((film.tmdb_id, film.uk_certification), (1, '15'))
+
+    def test_tmdb_id_is_saved_when_certification_is_unchanged(self):
+        film = Film.objects.create(imdb_id='tt0000001', title='Film 1', year='2026', uk_certification='15')
+
+        self.run_command('--all')
+
+        film.refresh_from_db()
+        self.assertEqual(film.tmdb_id, 1)
+
+    def test_max_workers_sizes_the_pool(self):
+        for tmdb_id in (1, 2, 3):
+            Film.objects.create(imdb_id=f'tmdb-{tmdb_id}', tmdb_id=tmdb_id, title=f'Film {tmdb_id}', year='2026')
+            self.stub_response(f'movie/{tmdb_id}/release_dates', dict(uk_release_dates('12A'), id=tmdb_id))
+
+        with mock.patch.object(fix_certifications.concurrent.futures, 'ThreadPoolExecutor',
+                               wraps=fix_certifications.concurrent.futures.ThreadPoolExecutor) as pool:
+            self.run_command('--use_parallel', '--max_workers=2')
+
+        pool.assert_called_once_with(max_workers=2)
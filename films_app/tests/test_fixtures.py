@@ -0,0 +1,14 @@
+from io import StringIO
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+from films_app.models import Film
+
+
+class FixtureTests(TestCase):
+    """The fixtures under fixtures/ still match the models."""
+
+    def test_films_fixture_loads(self):
+        call_command('loaddata', str(settings.BASE_DIR / 'fixtures' / 'films.json'), stdout=StringIO())
+
+        self.assertTrue(Film.objects.exists())
@@ -0,0 +1,58 @@
+from datetime import timedelta
+from unittest import mock
+from django.test import TestCase
+from django.utils import timezone
+from films_app import jobs
+from films_app.models import BackgroundJob, Lease
+
+
+class AbandonedJobTests(TestCase):
+    """Running jobs whose worker stopped renewing their lease."""
+
+    def start_job(self, minutes_ago):
+        return BackgroundJob.objects.create(
+            job_type='refresh_cinema_cache', status='running', worker='gone:1',
+            started_at=timezone.now() - timedelta(minutes=minutes_ago),
+        )
+
+    def test_abandoned_job_is_failed_and_a_new_job_queued(self):
+        stale = self.start_job(minutes_ago=60)
+
+        job, created = jobs.enqueue_job('refresh_cinema_cache')
+
+        self.assertTrue(created)
+        self.assertNotEqual(job.pk, stale.pk)
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, 'failed')
+        self.assertIsNotNone(stale.finished_at)
+        self.assertIn('Job abandoned', stale.log)
+
+    def test_job_with_live_lease_is_still_pending(self):
+        running = self.start_job(minutes_ago=60)
+        Lease.acquire(running.lease_name, 'worker:1', ttl=60)
+
+        job, created = jobs.enqueue_job('refresh_cinema_cache')
+
+        self.assertFalse(created)
+        self.assertEqual(job.pk, running.pk)
+
+    def test_job_just_claimed_is_not_failed(self):
+        running = self.start_job(minutes_ago=0)
+
+        self.assertEqual(BackgroundJob.fail_abandoned(jobs.JOB_LEASE_TTL), 0)
+        running.refresh_from_db()
+        self.assertEqual(running.status, 'running')
+
+    def test_run_job_holds_and_releases_job_lease(self):
+        jobs.enqueue_job('refresh_cinema_cache')
+        job = BackgroundJob.claim_next('worker:1')
+        held = []
+        handler = lambda log: held.append(Lease.objects.filter(name=job.lease_name).exists())
+
+        with mock.patch.dict(jobs.JOB_HANDLERS, {'refresh_cinema_cache': handler}):
+            jobs.run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual(held, [True])
+        self.assertFalse(Lease.objects.filter(name=job.lease_name).exists())
@@ -0,0 +1,124 @@
+import time
+from datetime import timedelta
+from unittest import mock
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from films_app.leases import LeaseHeartbeat, LeaseUnavailable, hold_lease
+from films_app.management.commands import update_movie_cache
+from films_app.models import Lease, RefreshRun
+from films_app.tmdb_api import MOVIE_DETAILS_APPEND, get_now_playing_params
+from films_app.tests.utils import TMDBStubMixin, make_update_command
+
+
+class LeaseTests(TestCase):
+    """Acquiring, expiring and completing leases."""
+
+    def test_live_lease_is_exclusive(self):
+        self.assertIsNotNone(Lease.acquire('resource', 'worker:1', ttl=60))
+
+        self.assertIsNone(Lease.acquire('resource', 'worker:2', ttl=60))
+        self.assertIsNotNone(Lease.acquire('resource', 'worker:1', ttl=60))
+
+    def test_expired_lease_can_be_taken_over(self):
+        lease = Lease.acquire('resource', 'worker:1', ttl=60)
+        Lease.objects.filter(pk=lease.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(Lease.acquire('resource', 'worker:2', ttl=60).owner, 'worker:2')
+        self.assertFalse(lease.renew(60))
+
+    def test_completed_lease_is_never_handed_out_again(self):
+        lease = Lease.acquire('page', 'worker:1', ttl=60)
+        lease.complete()
+        lease.release()
+
+        self.assertTrue(Lease.is_completed('page'))
+        self.assertIsNone(Lease.acquire('page', 'worker:2', ttl=60))
+
+    def test_held_lease_is_unavailable_to_others(self):
+        Lease.acquire('resource', 'other-host:1:1', ttl=60)
+
+        with self.assertRaises(LeaseUnavailable) as raised:
+            with hold_lease('resource', ttl=60):
+                pass
+        self.assertEqual(raised.exception.holder, 'other-host:1:1')
+
+    def test_reentered_lease_is_kept_until_the_outer_block_ends(self):
+        with hold_lease('resource', ttl=60):
+            with hold_lease('resource', ttl=60):
+                pass
+            self.assertTrue(Lease.objects.filter(name='resource').exists())
+
+        self.assertFalse(Lease.objects.filter(name='resource').exists())
+
+
+class LeaseHeartbeatTests(TMDBStubMixin, TransactionTestCase):
+    """Leases kept alive beyond their TTL by heartbeats."""
+
+    def test_heartbeat_keeps_lease_past_its_ttl(self):
+        lease = Lease.acquire('resource', 'worker:1', ttl=0.3)
+        heartbeat = LeaseHeartbeat(lease, 0.3)
+        heartbeat.start()
+        try:
+            time.sleep(0.6)
+            self.assertIsNone(Lease.acquire('resource', 'worker:2', ttl=60))
+        finally:
+            heartbeat.stop()
+        self.assertFalse(heartbeat.lost)
+
+    def test_page_lease_is_renewed_while_the_page_is_processed(self):
+        body = {'page': 1, 'total_pages': 1, 'results': [{'id': 1, 'title': 'Film 1'}]}
+        self.stub_response('discover/movie', body, get_now_playing_params(page=1))
+        self.stub_response('movie/1', {'id': 1, 'title': 'Film 1', 'external_ids': {'imdb_id': 'tt0000001'}},
+                           {'append_to_response': MOVIE_DETAILS_APPEND})
+        command = make_update_command()
+        run = RefreshRun.objects.create()
+        lease_name = f'{command._page_lease_prefix(run)}now_playing:1'
+        process_listed_movie = command.process_listed_movie
+        contested = []
+
+        def slow_process_listed_movie(*args):
+            # Outlive the page lease's TTL, then try to take the page
+            time.sleep(0.6)
+            contested.append(Lease.acquire(lease_name, 'other-worker', ttl=60))
+            return process_listed_movie(*args)
+
+        with mock.patch.object(update_movie_cache, 'PAGE_LEASE_TTL', 0.3), \
+                mock.patch.object(command, 'process_listed_movie', slow_process_listed_movie):
+            command._process_movie_batch('now_playing', 1, 6, run=run)
+
+        self.assertEqual(contested, [None])
+        self.assertTrue(Lease.is_completed(lease_name))
+
+
+class ResumedRunTests(TMDBStubMixin, TransactionTestCase):
+    """Page leases left behind by the process that drove a run before it was resumed."""
+
+    def setUp(self):
+        super().setUp()
+        body = {'page': 1, 'total_pages': 1, 'results': [{'id': 1, 'title': 'Film 1'}]}
+        self.stub_response('discover/movie', body, get_now_playing_params(page=1))
+        self.stub_response('movie/1', {'id': 1, 'title': 'Film 1', 'external_ids': {'imdb_id': 'tt0000001'}},
+                           {'append_to_response': MOVIE_DETAILS_APPEND})
+        self.command = make_update_command()
+        self.run = RefreshRun.objects.create(owner='crashed-host:1:1')
+        self.prefix = self.command._page_lease_prefix(self.run)
+
+    def test_resumed_run_takes_over_pages_of_its_previous_owner(self):
+        Lease.acquire(f'{self.prefix}now_playing:1', 'crashed-host:1:1', ttl=60)
+
+        self.command._take_over_run(self.run)
+        pages_held = self.command._process_movie_batch('now_playing', 1, 6, run=self.run)
+
+        self.assertEqual(pages_held, 0)
+        self.assertTrue(Lease.is_completed(f'{self.prefix}now_playing:1'))
+        self.run.refresh_from_db()
+        self.assertEqual(self.run.owner, self.command.lease_owner)
+
+    def test_pages_of_joined_workers_are_left_alone(self):
+        Lease.acquire(f'{self.prefix}now_playing:1', 'joined-host:2:2', ttl=60)
+
+        self.command._take_over_run(self.run)
+        pages_held = self.command._process_movie_batch('now_playing', 1, 6, run=self.run)
+
+        self.assertEqual(pages_held, 1)
+        self.assertEqual(Lease.objects.get(name=f'{self.prefix}now_playing:1').owner, 'joined-host:2:2')
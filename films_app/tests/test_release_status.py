@@ -0,0 +1,131 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from films_app.models import Film
+
+
+class UpdateReleaseStatusTests(TestCase):
+    """Date transitions and status check scheduling done without TMDB."""
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.today = self.now.date()
+
+    def create_film(self, imdb_id, **fields):
+        return Film.objects.create(imdb_id=imdb_id, title=imdb_id, year='2026', **fields)
+
+    def run_command(self, *args):
+        call_command('update_release_status', *args, stdout=StringIO())
+
+    def test_retry_after_failed_check_is_kept(self):
+        retry_at = self.now + timedelta(days=Film.STATUS_CHECK_DAYS_RETRY)
+        film = self.create_film('tt0000001', last_status_check=self.now, next_status_check_at=retry_at)
+
+        self.run_command()
+
+        film.refresh_from_db()
+        self.assertEqual(film.next_status_check_at, retry_at)
+
+    def test_release_moving_into_window_makes_film_due(self):
+        film = self.create_film(
+            'tt0000002', uk_release_date=self.today + timedelta(days=5),
+            last_status_check=self.now - timedelta(days=3),
+            next_status_check_at=self.now + timedelta(days=11),
+        )
+
+        self.run_command()
+
+        self.assertIn(film, Film.due_for_status_check(10))
+
+    def test_release_window_matches_update_movie_cache(self):
+        # Ten days out is inside the model's window but outside the old --days=7 one
+        film = self.create_film(
+            'tt0000006', uk_release_date=self.today + timedelta(days=10),
+            last_status_check=self.now - timedelta(days=3),
+            next_status_check_at=self.now + timedelta(days=11),
+        )
+
+        self.run_command('--days=7')
+
+        self.assertIn(film, Film.due_for_status_check(10))
+
+    def test_unscheduled_film_is_due_first(self):
+        overdue = self.create_film('tt0000007', next_status_check_at=self.now - timedelta(days=1))
+        unscheduled = self.create_film('tt0000008')
+
+        self.assertEqual(list(Film.due_for_status_check(10)), [unscheduled, overdue])
+
+    def test_unscheduled_film_is_scheduled(self):
+        film = self.create_film('tt0000003')
+
+        self.run_command()
+
+        film.refresh_from_db()
+        self.assertIsNotNone(film.next_status_check_at)
+
+    def test_release_dates_move_films_between_statuses(self):
+        released = self.create_film('tt0000004', is_upcoming=True, uk_release_date=self.today - timedelta(days=1))
+        finished = self.create_film('tt0000005', is_in_cinema=True, uk_release_date=self.today - timedelta(days=365))
+
+        self.run_command()
+
+        released.refresh_from_db()
+        finished.refresh_from_db()
+        self.assertEqual((released.is_in_cinema, released.is_upcoming), (True, False))
+        self.assertEqual((finished.is_in_cinema, finished.is_upcoming), (False, False))
+        self.assertGreater(released.next_status_check_at, self.now)
+
+    def test_retired_options_are_accepted_with_a_warning(self):
+        out = StringIO()
+        call_command('update_release_status', '--days=7', '--batch-size=50', '--use_parallel', stdout=out)
+
+        self.assertIn('--days is deprecated', out.getvalue())
+        self.assertIn('--batch-size is deprecated', out.getvalue())
+        self.assertIn('--use_parallel is deprecated', out.getvalue())
+
+
+class StatusCheckScheduleTests(TestCase):
+    """Intervals between status checks and the order in which due films are taken."""
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.today = self.now.date()
+
+    def create_film(self, imdb_id, **fields):
+        return Film.objects.create(imdb_id=imdb_id, title=imdb_id, year='2026', last_status_check=self.now, **fields)
+
+    def interval(self, film, **status):
+        next_check = Film.objects.annotate(
+            next_check=Film.next_status_check_expression(self.now, **status)
+        ).get(pk=film.pk).next_check
+        return (next_check - self.now).days
+
+    def test_interval_follows_release_date_and_status(self):
+        cases = [
+            ({'is_in_cinema': True, 'uk_release_date': self.today + timedelta(days=60)}, Film.STATUS_CHECK_DAYS_AMBIGUOUS),
+            ({'uk_release_date': self.today + timedelta(days=5)}, Film.STATUS_CHECK_DAYS_RELEASE),
+            ({'is_upcoming': True, 'uk_release_date': self.today + timedelta(days=60)}, Film.STATUS_CHECK_DAYS_SHOWING),
+            ({}, Film.STATUS_CHECK_DAYS_UNDATED),
+            ({'uk_release_date': self.today - timedelta(days=400)}, Film.STATUS_CHECK_DAYS_DEFAULT),
+        ]
+        for i, (fields, days) in enumerate(cases):
+            with self.subTest(fields=fields):
+                self.assertEqual(self.interval(self.create_film(f'tt100000{i}', **fields)), days)
+
+    def test_status_found_by_a_check_overrides_the_stored_one(self):
+        film = self.create_film('tt1000010', uk_release_date=self.today - timedelta(days=400))
+
+        self.assertEqual(self.interval(film, checked_at=self.now, is_in_cinema=True, is_upcoming=False),
+                         Film.STATUS_CHECK_DAYS_SHOWING)
+
+    def test_most_overdue_films_are_taken_up_to_the_limit(self):
+        for i, days_overdue in enumerate((1, 3, 2)):
+            self.create_film(f'tt100002{i}', next_status_check_at=self.now - timedelta(days=days_overdue))
+        self.create_film('tt1000029', next_status_check_at=self.now + timedelta(days=1))
+
+        self.assertEqual(
+            [film.imdb_id for film in Film.due_for_status_check(2, now=self.now)],
+            ['tt1000021', 'tt1000022'],
+        )
@@ -0,0 +1,66 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from films_app.models import Film
+from films_app.tmdb_api import get_discover_movie_ids, get_now_playing_params, get_upcoming_params
+from films_app.tests.utils import TMDBStubMixin, make_update_command
+
+
+class DiscoverIndexStatusCheckTests(TMDBStubMixin, TestCase):
+    """Status checks answered from the now playing and upcoming discover listings."""
+
+    def setUp(self):
+        super().setUp()
+        self.film = Film.objects.create(
+            imdb_id='tt0000001', tmdb_id=1, title='Showing', year='2026',
+            is_in_cinema=True, next_status_check_at=timezone.now() - timedelta(hours=1),
+        )
+        self.stub_response('movie/1/release_dates', {'id': 1, 'results': []})
+
+    def stub_listings(self, now_playing_ids, upcoming_ids):
+        for params, ids in ((get_now_playing_params(page=1), now_playing_ids),
+                            (get_upcoming_params(time_window_months=6, page=1), upcoming_ids)):
+            body = {'page': 1, 'total_pages': 1, 'results': [{'id': movie_id} for movie_id in ids]}
+            self.stub_response('discover/movie', body, params)
+
+    def test_failed_listing_is_not_an_empty_listing(self):
+        self.assertIsNone(get_discover_movie_ids('now_playing', max_pages=1))
+
+    def test_listing_ids_are_indexed(self):
+        self.stub_listings([1, 2], [3])
+        self.assertEqual(get_discover_movie_ids('now_playing', max_pages=1), {1, 2})
+
+    def test_failed_listing_keeps_status_and_retries_soon(self):
+        command = make_update_command()
+        before = timezone.now()
+
+        self.assertFalse(command.update_film_status(self.film))
+
+        self.film.refresh_from_db()
+        self.assertTrue(self.film.is_in_cinema)
+        self.assertLessEqual(
+            self.film.next_status_check_at,
+            before + timedelta(days=Film.STATUS_CHECK_DAYS_RETRY, minutes=1),
+        )
+
+    def test_complete_listing_updates_status(self):
+        self.stub_listings([], [1])
+        command = make_update_command()
+
+        self.assertTrue(command.update_film_status(self.film))
+
+        self.film.refresh_from_db()
+        self.assertFalse(self.film.is_in_cinema)
+        self.assertTrue(self.film.is_upcoming)
+
+    def test_tmdb_id_found_from_imdb_id_is_saved(self):
+        Film.objects.filter(pk=self.film.pk).update(tmdb_id=None)
+        self.film.refresh_from_db()
+        self.stub_listings([1], [])
+        self.stub_response('find/tt0000001', {'movie_results': [{'id': 1}]}, {'external_source': 'imdb_id'})
+        command = make_update_command()
+
+        command.update_film_status(self.film)
+
+        self.film.refresh_from_db()
+        self.assertEqual(self.film.tmdb_id, 1)
@@ -0,0 +1,100 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+from unittest import mock
+from django.test import SimpleTestCase
+from films_app import tmdb_cache
+from films_app.tmdb_cache import DiskCache
+
+
+class DiskCacheTests(SimpleTestCase):
+    """The SQLite-backed TMDB disk cache."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.cache = DiskCache(os.path.join(self.directory, 'cache.sqlite3'), compress=True)
+
+    def corrupt(self, key, value, compressed):
+        self.cache._connection().execute(
+            'UPDATE entries SET value = ?, compressed = ? WHERE key = ?', (value, int(compressed), key)
+        )
+
+    def test_round_trip(self):
+        self.cache.set('details', 1, {'id': 1, 'title': 'x' * 2000})
+
+        self.assertEqual(self.cache.get_entry('details', 1), ({'id': 1, 'title': 'x' * 2000}, True))
+
+    def test_stale_entry_is_served_until_it_expires(self):
+        self.cache.set('details', 1, {'id': 1}, ttl=100, fresh_ttl=10)
+        now = tmdb_cache.time.time()
+
+        with mock.patch.object(tmdb_cache.time, 'time', return_value=now + 50):
+            self.assertEqual(self.cache.get_entry('details', 1), ({'id': 1}, False))
+        with mock.patch.object(tmdb_cache.time, 'time', return_value=now + 150):
+            self.assertIsNone(self.cache.get_entry('details', 1))
+            self.assertEqual(self.cache.evict_expired(), 1)
+
+    def test_size_limit_evicts_entries_closest_to_expiry(self):
+        for key, ttl in ((1, 300), (2, 100), (3, 200)):
+            self.cache.set('details', key, {'id': key}, ttl=ttl)
+
+        self.assertEqual(self.cache.enforce_size_limit(max_bytes=2 * len('{"id":1}')), 1)
+
+        self.assertIsNone(self.cache.get('details', 2))
+        self.assertEqual(self.cache.stats()['details']['entries'], 2)
+
+    def test_purge_is_limited_to_a_namespace(self):
+        self.cache.set('details', 1, {'id': 1})
+        self.cache.set('search_results', 'query', [1])
+
+        self.assertEqual(self.cache.purge('search_results'), 1)
+
+        self.assertEqual(list(self.cache.stats()), ['details'])
+
+    def test_schema_change_rebuilds_the_store(self):
+        self.cache.set('details', 1, {'id': 1})
+
+        with mock.patch.object(DiskCache, 'SCHEMA_VERSION', DiskCache.SCHEMA_VERSION + 1):
+            cache = DiskCache(self.cache.path)
+
+        self.assertIsNone(cache.get('details', 1))
+
+    def test_corrupt_compressed_entry_is_a_miss_and_removed(self):
+        self.cache.set('details', 1, {'id': 1})
+        self.corrupt('1', b'not zlib', compressed=True)
+
+        self.assertIsNone(self.cache.get_entry('details', 1))
+        self.assertEqual(self.cache.stats(), {})
+
+    def test_corrupt_json_entry_is_a_miss_and_removed(self):
+        self.cache.set('details', 1, {'id': 1})
+        self.corrupt('1', b'{"id": ', compressed=False)
+
+        self.assertIsNone(self.cache.get('details', 1))
+        self.assertEqual(self.cache.stats(), {})
+
+    def test_database_errors_degrade_to_misses_and_no_ops(self):
+        self.cache.set('details', 1, {'id': 1})
+        locked = mock.Mock()
+        locked.execute.side_effect = sqlite3.OperationalError('database is locked')
+
+        with mock.patch.object(self.cache, '_connection', return_value=locked):
+            self.assertIsNone(self.cache.get('details', 1))
+            self.cache.set('details', 2, {'id': 2})
+            self.cache.delete('details', 1)
+            self.assertEqual(self.cache.purge(), 0)
+            self.assertEqual(self.cache.evict_expired(), 0)
+            self.assertEqual(self.cache.enforce_size_limit(max_bytes=1), 0)
+            self.assertEqual(self.cache.stats(), {})
+
+    def test_unusable_database_file_does_not_raise(self):
+        path = os.path.join(self.directory, 'corrupt.sqlite3')
+        with open(path, 'wb') as corrupt:
+            corrupt.write(b'not a database' * 100)
+
+        cache = DiskCache(path)
+
+        self.assertIsNone(cache.get('details', 1))
+        self.assertEqual(cache.evict_expired(), 0)
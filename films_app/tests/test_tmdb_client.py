@@ -0,0 +1,35 @@
+from unittest import mock
+from django.test import SimpleTestCase
+from films_app.tmdb_client import CircuitBreaker, CircuitOpenError, get_client
+from films_app.tests.utils import TMDBStubMixin
+
+
+class CircuitBreakerProbeTests(TMDBStubMixin, SimpleTestCase):
+    """Probe requests let through by a half-open circuit breaker."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = get_client()
+        self.client.breaker = self.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        self.breaker.record_failure()
+        # Make the probe due
+        self.breaker._opened_at -= 60
+
+    def test_probe_success_closes_the_circuit(self):
+        self.stub_response('movie/1', {'id': 1})
+
+        self.client.get('movie/1', retries=0)
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_probe_raising_an_unexpected_error_reopens_the_circuit(self):
+        with mock.patch.object(self.client, '_send', side_effect=ValueError('bad response')):
+            with self.assertRaises(ValueError):
+                self.client.get('movie/1', retries=0)
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.client.get('movie/1', retries=0)
+        # The next probe is let through once the reset timeout has passed again
+        self.breaker._opened_at -= 60
+        self.assertTrue(self.breaker.allow_request())
@@ -0,0 +1,90 @@
+import io
+import shutil
+import tempfile
+import threading
+from unittest import mock
+from django.test import override_settings
+from films_app import tmdb_cache, tmdb_client
+from films_app.management.commands.update_movie_cache import Command as UpdateMovieCacheCommand
+from films_app.tmdb_stub import FixtureBundle, TMDBStubServer, bundle_key
+
+# The client sends these with every request, so recorded keys include them
+CLIENT_PARAMS = {'language': 'en-GB'}
+
+
+def stub_key(endpoint, params=None):
+    """Bundle key of a request made through the shared TMDB client."""
+    return bundle_key(endpoint, dict(CLIENT_PARAMS, **(params or {})))
+
+
+class TMDBStubMixin:
+    """
+    Run each test against a local TMDBStubServer with empty TMDB caches.
+
+    Responses to replay are added with stub_response(); requests without one
+    are answered with a 404. The shared client, rate limiter, circuit breaker
+    and caches are recreated for every test, so no state leaks between tests.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.bundle = FixtureBundle()
+        self.stub = TMDBStubServer(self.bundle).start()
+        self.addCleanup(self.stub.stop)
+
+        workdir = tempfile.mkdtemp(prefix='tmdb-test-')
+        self.addCleanup(shutil.rmtree, workdir, ignore_errors=True)
+        settings_override = override_settings(
+            TMDB_API_BASE_URL=self.stub.url,
+            TMDB_API_KEY='test',
+            TMDB_CACHE_DB_PATH=f'{workdir}/tmdb_cache.sqlite3',
+            TMDB_REQUESTS_PER_SECOND=0,
+            TMDB_RETRY_BASE_DELAY=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        for module, name in (
+            (tmdb_client, '_client'),
+            (tmdb_client, '_rate_limiter'),
+            (tmdb_client, '_concurrency'),
+            (tmdb_client, '_circuit_breaker'),
+            (tmdb_cache, '_memory_cache'),
+            (tmdb_cache, '_disk_cache'),
+        ):
+            patcher = mock.patch.object(module, name, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def stub_response(self, endpoint, body, params=None, status=200):
+        """Make the stub answer a client request with body."""
+        self.bundle.put(stub_key(endpoint, params), status, body)
+
+
+def make_update_command(**options):
+    """
+    Create an update_movie_cache command set up as handle() would, for calling its methods.
+
+    Args:
+        **options: Command options overriding the defaults
+
+    Returns:
+        Command: The command, writing its output to a StringIO
+    """
+    command = UpdateMovieCacheCommand(stdout=io.StringIO(), stderr=io.StringIO())
+    command.options = {
+        'force': False,
+        'max_pages': 1,
+        'time_window_months': 6,
+        'use_parallel': False,
+        'engine': 'threads',
+        **options,
+    }
+    command._discover_index = None
+    command._discover_index_lock = threading.Lock()
+    command.lease_owner = 'test-worker'
+    command.fresh_films = {}
+    command.phase_times = {}
+    command.write_counts = {'created': 0, 'changed': 0, 'unchanged': 0}
+    command.status_counts = {'status_updated': 0, 'released': 0, 'left_cinemas': 0, 'no_longer_upcoming': 0}
+    return command
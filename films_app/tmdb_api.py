@@ -1,15 +1,19 @@
 import requests
 from django.conf import settings
 import logging
-import os
-import json
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from .tmdb_client import get_client, get_request_stats, SingleFlight, CircuitOpenError, request_key
+from .tmdb_cache import get_memory_cache, get_disk_cache
 
 logger = logging.getLogger(__name__)
 
-# In-memory cache for movie details to reduce API calls during a single run
-_movie_details_cache = {}
+# Sub-resources appended to every movie details request
+MOVIE_DETAILS_APPEND = 'credits,release_dates,external_ids'
+
+# Coalesces concurrent identical detail and search requests into one HTTP call
+_inflight = SingleFlight()
 
 def sort_and_limit_films(films, limit=None, sort_by='popularity'):
     """
@@ -44,8 +48,7 @@ def get_api_url(endpoint):
     Returns:
         str: The full URL for the API request
     """
-    base_url = "https://api.themoviedb.org/3"
-    return f"{base_url}/{endpoint}"
+    return get_client().url(endpoint)
 
 def search_movies(query, sort_by=None):
     """
@@ -59,19 +62,18 @@ def search_movies(query, sort_by=None):
         dict: The search results from TMDB
     """
     # Check in-memory cache first
-    cache_key = f"search_{query}_{sort_by}"
-    if cache_key in _movie_details_cache:
-        return _movie_details_cache[cache_key]
+    cache_key = (query, sort_by)
+    cached = get_memory_cache().get('search', cache_key)
+    if cached is not None:
+        return cached
     
     # If query is empty and sort_by is provided, use discover endpoint for popular movies
     if not query and sort_by:
-        url = get_api_url("discover/movie")
+        endpoint = "discover/movie"
     else:
-        url = get_api_url("search/movie")
+        endpoint = "search/movie"
     
     params = {
-        'api_key': settings.TMDB_API_KEY,
-        'language': 'en-GB',  # British English
         'region': 'GB',       # United Kingdom
         'page': 1,
         'include_adult': False
@@ -85,12 +87,18 @@ def search_movies(query, sort_by=None):
     if sort_by:
         params['sort_by'] = sort_by
     
+    # Concurrent callers with the same query share one in-flight request
+    return _inflight.do(request_key(endpoint, params), _fetch_search_results, endpoint, params, cache_key)
+
+def _fetch_search_results(endpoint, params, cache_key):
+    """Fetch search results from TMDB and store them in the in-memory cache."""
     try:
-        response = requests.get(url, params=params, timeout=5)  # Add timeout
+        # Searches are interactive: retry once at most rather than keep the user waiting
+        response = get_client().get(endpoint, params=params, timeout=5, retries=1)
         if response.status_code == 200:
             result = response.json()
             # Cache the result
-            _movie_details_cache[cache_key] = result
+            get_memory_cache().set('search', cache_key, result)
             return result
         else:
             logger.error(f"TMDB API error: {response.status_code} - {response.text}")
@@ -99,53 +107,263 @@ def search_movies(query, sort_by=None):
         logger.error(f"TMDB API request failed: {str(e)}")
         return {"results": []}
 
-def get_movie_details(tmdb_id, include_raw=False):
+# Freshness windows for cached movie details, in seconds. Films releasing or
+# released within RECENT_RELEASE_DAYS change often (certifications, release
+# dates), catalogue titles older than CATALOGUE_AGE_DAYS hardly ever do.
+RECENT_RELEASE_DAYS = 30
+CATALOGUE_AGE_DAYS = 365
+DETAILS_TTL_RECENT = getattr(settings, 'TMDB_DETAILS_TTL_RECENT', 6 * 60 * 60)
+DETAILS_TTL_DEFAULT = getattr(settings, 'TMDB_DETAILS_TTL_DEFAULT', 24 * 60 * 60)
+DETAILS_TTL_CATALOGUE = getattr(settings, 'TMDB_DETAILS_TTL_CATALOGUE', 30 * 24 * 60 * 60)
+
+# How long a stale entry may still be served while it is revalidated
+DETAILS_STALE_TTL = getattr(settings, 'TMDB_DETAILS_STALE_TTL', 7 * 24 * 60 * 60)
+
+# Background revalidation of stale movie details
+_revalidation_executor = None
+_revalidating = set()
+_revalidating_lock = threading.Lock()
+
+# Top-level fields of the details response that the Film model is built from
+MOVIE_DETAILS_FIELDS = (
+    'id', 'imdb_id', 'title', 'overview', 'release_date', 'poster_path', 'runtime',
+    'genres', 'popularity', 'vote_count', 'vote_average', 'revenue', 'status',
+)
+
+def project_release_dates(release_dates):
     """
-    Get detailed information about a movie from TMDB API with UK-specific parameters.
+    Reduce TMDB release dates data to the GB entries.
+    
+    Args:
+        release_dates (dict): Release dates data from TMDB, with a 'results' list
+        
+    Returns:
+        dict: The same shape, holding only the GB entries
+    """
+    return {
+        'results': [
+            country_data for country_data in (release_dates or {}).get('results', [])
+            if country_data.get('iso_3166_1') == 'GB'
+        ]
+    }
+
+def project_movie_details(data):
+    """
+    Reduce a TMDB details response to the fields format_tmdb_data_for_film needs.
+    
+    The full response carries the entire cast and crew and every country's
+    release dates. The projection keeps the same shape (so it can be passed to
+    format_tmdb_data_for_film and get_uk_certification unchanged) but only the
+    directors, the top five cast members and the GB release dates.
+    
+    Args:
+        data (dict): The movie details from TMDB
+        
+    Returns:
+        dict: The compact movie details
+    """
+    projected = {field: data.get(field) for field in MOVIE_DETAILS_FIELDS if field in data}
+    projected['genres'] = [{'name': genre['name']} for genre in data.get('genres') or []]
+    
+    credits = data.get('credits') or {}
+    projected['credits'] = {
+        'crew': [
+            {'name': crew['name'], 'job': crew['job']}
+            for crew in credits.get('crew', []) if crew.get('job') == 'Director'
+        ],
+        'cast': [{'name': cast['name']} for cast in credits.get('cast', [])[:5]],
+    }
+    
+    projected['release_dates'] = project_release_dates(data.get('release_dates'))
+    
+    external_ids = data.get('external_ids') or {}
+    projected['external_ids'] = {'imdb_id': external_ids.get('imdb_id')}
+    return projected
+
+def get_details_fresh_ttl(data):
+    """
+    Work out how long cached movie details stay fresh.
+    
+    Uses the release date closest to today, from the primary release date and
+    the GB release dates.
+    
+    Args:
+        data (dict): The (projected) movie details from TMDB
+        
+    Returns:
+        int: Freshness window in seconds
+    """
+    values = [data.get('release_date')]
+    for country_data in (data.get('release_dates') or {}).get('results', []):
+        if country_data.get('iso_3166_1') == 'GB':
+            values.extend(release.get('release_date') for release in country_data.get('release_dates', []))
+    
+    dates = []
+    for value in values:
+        if value:
+            try:
+                dates.append(datetime.fromisoformat(value[:10]).date())
+            except ValueError:
+                continue
+    if not dates:
+        return DETAILS_TTL_DEFAULT
+    
+    today = datetime.now().date()
+    if min(abs((release_date - today).days) for release_date in dates) <= RECENT_RELEASE_DAYS:
+        return DETAILS_TTL_RECENT
+    if max(dates) < today - timedelta(days=CATALOGUE_AGE_DAYS):
+        return DETAILS_TTL_CATALOGUE
+    return DETAILS_TTL_DEFAULT
+
+def get_cached_movie_details(tmdb_id, allow_stale=True):
+    """
+    Look up movie details in the in-memory cache and then the disk cache.
+    
+    A stale disk entry is still returned, and a background revalidation is
+    scheduled so the next lookup gets fresh data.
     
     Args:
         tmdb_id (int): The TMDB ID of the movie
-        include_raw (bool): Whether to include the raw API response
+        allow_stale (bool): Whether to return a stale disk entry; if not, it
+            is treated as a miss and the caller fetches fresh details
         
     Returns:
-        dict: The movie details from TMDB
+        dict: The cached movie details, or None if not cached or expired
     """
-    # Check in-memory cache first
-    cache_key = f"tmdb_{tmdb_id}"
-    if cache_key in _movie_details_cache and not include_raw:
+    stats = get_request_stats()
+    memory_cache = get_memory_cache()
+    data = memory_cache.get('details', str(tmdb_id))
+    if data is not None:
         logger.debug(f"Using cached details for TMDB ID {tmdb_id}")
-        return _movie_details_cache[cache_key]
+        stats.record_cache('details', hit=True)
+        return data
     
-    # Check disk cache
-    cache_dir = os.path.join(settings.BASE_DIR, 'cache')
-    os.makedirs(cache_dir, exist_ok=True)
-    cache_file = os.path.join(cache_dir, f"movie_{tmdb_id}.json")
+    entry = get_disk_cache().get_entry('details', tmdb_id)
+    if entry is not None and not entry[1] and not allow_stale:
+        entry = None
+    stats.record_cache('details', hit=entry is not None)
+    if entry is None:
+        return None
     
-    # If cache file exists and is less than 7 days old, use it
-    if os.path.exists(cache_file) and not include_raw:
-        file_age = time.time() - os.path.getmtime(cache_file)
-        if file_age < 7 * 24 * 60 * 60:  # 7 days in seconds
-            try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    logger.debug(f"Using disk cache for TMDB ID {tmdb_id}")
-                    data = json.load(f)
-                    _movie_details_cache[cache_key] = data  # Update in-memory cache
-                    return data
-            except Exception as e:
-                logger.warning(f"Error reading cache file for TMDB ID {tmdb_id}: {e}")
+    data, is_fresh = entry
+    if is_fresh:
+        logger.debug(f"Using disk cache for TMDB ID {tmdb_id}")
+        _set_memory_details(tmdb_id, data)  # Update in-memory cache
+    else:
+        logger.debug(f"Using stale disk cache for TMDB ID {tmdb_id}, revalidating")
+        revalidate_movie_details(tmdb_id)
+    return data
+
+def _set_memory_details(tmdb_id, data):
+    """Store movie details in memory for no longer than they stay fresh."""
+    memory_cache = get_memory_cache()
+    ttl = min(memory_cache.ttl_for('details'), get_details_fresh_ttl(data))
+    memory_cache.set('details', str(tmdb_id), data, ttl=ttl)
+
+def revalidate_movie_details(tmdb_id):
+    """
+    Refresh cached movie details in the background.
     
-    # Fetch from API - Only request the fields we actually need
-    url = get_api_url(f"movie/{tmdb_id}")
+    Repeated calls for a film that is already being revalidated are ignored.
+    
+    Args:
+        tmdb_id (int): The TMDB ID of the movie
+    """
+    global _revalidation_executor
+    if get_client().breaker.is_open:
+        # Keep serving the stale entry until TMDB is reachable again
+        return
+    key = str(tmdb_id)
+    with _revalidating_lock:
+        if key in _revalidating:
+            return
+        _revalidating.add(key)
+        if _revalidation_executor is None:
+            _revalidation_executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'TMDB_REVALIDATE_WORKERS', 4),
+                thread_name_prefix='tmdb-revalidate',
+            )
+    _revalidation_executor.submit(_revalidate_movie_details, tmdb_id)
+
+def _revalidate_movie_details(tmdb_id):
+    """Fetch movie details from TMDB and replace the stale cache entry."""
+    try:
+        endpoint, params = _movie_details_request(tmdb_id)
+        _inflight.do(request_key(endpoint, params), _fetch_movie_details, tmdb_id, endpoint, params)
+    finally:
+        with _revalidating_lock:
+            _revalidating.discard(str(tmdb_id))
+
+def cache_movie_details(tmdb_id, data):
+    """
+    Store the projected movie details in the in-memory cache and the disk cache.
+    
+    Args:
+        tmdb_id (int): The TMDB ID of the movie
+        data (dict): The movie details returned by TMDB
+        
+    Returns:
+        dict: The compact movie details that were cached
+    """
+    data = project_movie_details(data)
+    fresh_ttl = get_details_fresh_ttl(data)
+    _set_memory_details(tmdb_id, data)
+    get_disk_cache().set('details', tmdb_id, data, ttl=fresh_ttl + DETAILS_STALE_TTL, fresh_ttl=fresh_ttl)
+    return data
+
+def invalidate_movie_details(tmdb_id):
+    """
+    Drop cached movie details so the next lookup fetches them from TMDB.
+    
+    Args:
+        tmdb_id (int): The TMDB ID of the movie
+    """
+    get_memory_cache().delete('details', str(tmdb_id))
+    get_disk_cache().delete('details', tmdb_id)
+
+def _movie_details_request(tmdb_id):
+    """Return the endpoint and query parameters for a movie details request."""
+    endpoint = f"movie/{tmdb_id}"
     params = {
-        'api_key': settings.TMDB_API_KEY,
-        'language': 'en-GB',  # British English
         # Always include release_dates to get certification information
-        'append_to_response': 'credits,release_dates,external_ids'
+        'append_to_response': MOVIE_DETAILS_APPEND
     }
+    return endpoint, params
+
+def get_movie_details(tmdb_id, include_raw=False, allow_stale=True):
+    """
+    Get detailed information about a movie from TMDB API with UK-specific parameters.
+    
+    Args:
+        tmdb_id (int): The TMDB ID of the movie
+        include_raw (bool): Whether to include the raw API response. The full,
+            unprojected response is fetched and the cache is bypassed.
+        allow_stale (bool): Whether stale cached details may be returned while
+            they are revalidated in the background
+        
+    Returns:
+        dict: The movie details from TMDB, projected by project_movie_details
+              unless include_raw is set
+    """
+    # Fetch from API - Only request the fields we actually need
+    endpoint, params = _movie_details_request(tmdb_id)
     
+    if include_raw:
+        return _fetch_movie_details(tmdb_id, endpoint, params, include_raw=True)
+    
+    # Check in-memory and disk caches first
+    data = get_cached_movie_details(tmdb_id, allow_stale=allow_stale)
+    if data is not None:
+        return data
+    
+    # Concurrent callers for the same film share one in-flight request
+    return _inflight.do(request_key(endpoint, params), _fetch_movie_details, tmdb_id, endpoint, params)
+
+def _fetch_movie_details(tmdb_id, endpoint, params, include_raw=False):
+    """Fetch movie details from TMDB, caching them unless include_raw is set."""
     try:
         logger.debug(f"Fetching details for TMDB ID {tmdb_id} from API")
-        response = requests.get(url, params=params)
+        response = get_client().get(endpoint, params=params)
         response.raise_for_status()  # Raise an exception for HTTP errors
         data = response.json()
         
@@ -170,24 +388,101 @@ def get_movie_details(tmdb_id, include_raw=False):
         # If include_raw is True, add the raw response data
         if include_raw:
             data['_raw_response'] = response.text
-            data['_raw_url'] = url
+            data['_raw_url'] = get_api_url(endpoint)
             data['_raw_params'] = params
         else:
-            # Only save to cache if not including raw data
-            _movie_details_cache[cache_key] = data  # Update in-memory cache
-            
-            # Save to disk cache
-            try:
-                with open(cache_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False)
-            except Exception as e:
-                logger.warning(f"Error writing cache file for TMDB ID {tmdb_id}: {e}")
+            # Only save to cache if not including raw data; callers get the same
+            # compact record as a cache hit would return
+            data = cache_movie_details(tmdb_id, data)
         
         return data
+    except CircuitOpenError:
+        logger.warning(f"TMDB unavailable, could not fetch details for TMDB ID {tmdb_id}")
+        return None
     except Exception as e:
         logger.error(f"Error fetching movie details for TMDB ID {tmdb_id}: {e}")
         return None
 
+def get_movie_release_dates(tmdb_id):
+    """
+    Get the GB release dates of a movie without fetching its full details.
+    
+    Fresh cached details are used when available. Otherwise the much smaller
+    /movie/{id}/release_dates sub-resource is fetched and cached on its own,
+    for status and certification checks that need nothing else.
+    
+    Args:
+        tmdb_id (int): The TMDB ID of the movie
+        
+    Returns:
+        dict: Release dates data in the shape get_uk_certification expects,
+              or None if the movie could not be fetched
+    """
+    details = get_cached_movie_details(tmdb_id, allow_stale=False)
+    if details is not None:
+        return details.get('release_dates') or {'results': []}
+    
+    stats = get_request_stats()
+    data = get_memory_cache().get('release_dates', str(tmdb_id))
+    if data is None:
+        entry = get_disk_cache().get_entry('release_dates', tmdb_id)
+        if entry is not None and entry[1]:
+            data = entry[0]
+            _set_memory_release_dates(tmdb_id, data)
+    stats.record_cache('release_dates', hit=data is not None)
+    if data is not None:
+        return data
+    
+    endpoint = f"movie/{tmdb_id}/release_dates"
+    return _inflight.do(request_key(endpoint, {}), _fetch_movie_release_dates, tmdb_id, endpoint)
+
+def _set_memory_release_dates(tmdb_id, data):
+    """Store release dates in memory for no longer than they stay fresh."""
+    memory_cache = get_memory_cache()
+    ttl = min(memory_cache.ttl_for('release_dates'), get_details_fresh_ttl({'release_dates': data}))
+    memory_cache.set('release_dates', str(tmdb_id), data, ttl=ttl)
+
+def _fetch_movie_release_dates(tmdb_id, endpoint):
+    """Fetch a movie's release dates from TMDB and cache the GB entries."""
+    try:
+        logger.debug(f"Fetching release dates for TMDB ID {tmdb_id} from API")
+        response = get_client().get(endpoint)
+        response.raise_for_status()
+        data = project_release_dates(response.json())
+    except CircuitOpenError:
+        logger.warning(f"TMDB unavailable, could not fetch release dates for TMDB ID {tmdb_id}")
+        return None
+    except Exception as e:
+        logger.error(f"Error fetching release dates for TMDB ID {tmdb_id}: {e}")
+        return None
+    
+    fresh_ttl = get_details_fresh_ttl({'release_dates': data})
+    _set_memory_release_dates(tmdb_id, data)
+    get_disk_cache().set('release_dates', tmdb_id, data, ttl=fresh_ttl, fresh_ttl=fresh_ttl)
+    return data
+
+def find_tmdb_id(imdb_id):
+    """
+    Look up the TMDB ID of a movie from its IMDb ID.
+    
+    Args:
+        imdb_id (str): The IMDb ID of the movie
+        
+    Returns:
+        int: The TMDB ID, or None if TMDB does not know the movie
+    """
+    try:
+        response = get_client().get("find/" + imdb_id, params={'external_source': 'imdb_id'})
+        response.raise_for_status()
+        movie_results = response.json().get('movie_results', [])
+    except CircuitOpenError:
+        logger.warning(f"TMDB unavailable, could not look up IMDb ID {imdb_id}")
+        return None
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.error(f"Error looking up IMDb ID {imdb_id}: {e}")
+        return None
+    return movie_results[0]['id'] if movie_results else None
+
 def get_movie_by_imdb_id(imdb_id, include_raw=False):
     """
     Find a movie in TMDB using its IMDb ID.
@@ -199,14 +494,11 @@ def get_movie_by_imdb_id(imdb_id, include_raw=False):
     Returns:
         dict: The movie details from TMDB
     """
-    url = get_api_url("find/" + imdb_id)
     params = {
-        'api_key': settings.TMDB_API_KEY,
-        'language': 'en-GB',  # British English
         'external_source': 'imdb_id'
     }
     
-    response = requests.get(url, params=params)
+    response = get_client().get("find/" + imdb_id, params=params)
     data = response.json()
     
     # The find endpoint returns results categorized by media type
@@ -226,6 +518,44 @@ def get_movie_by_imdb_id(imdb_id, include_raw=False):
     
     return None
 
+# TMDB only serves the changes feed for windows of up to 14 days
+CHANGES_MAX_DAYS = 14
+
+def get_changed_movie_ids(start_date, end_date=None):
+    """
+    Get the IDs of all movies that changed on TMDB in a date range.
+    
+    Args:
+        start_date (date): First day of the range
+        end_date (date, optional): Last day of the range, defaults to today
+        
+    Returns:
+        set: TMDB IDs of changed movies, or None if the changes feed could not be read
+    """
+    params = {'start_date': start_date.strftime('%Y-%m-%d')}
+    if end_date:
+        params['end_date'] = end_date.strftime('%Y-%m-%d')
+    
+    changed_ids = set()
+    page = 1
+    total_pages = 1
+    while page <= total_pages:
+        params['page'] = page
+        try:
+            response = get_client().get("movie/changes", params=params)
+            response.raise_for_status()
+            data = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error(f"Error fetching TMDB changes page {page}: {e}")
+            return None
+        
+        changed_ids.update(result['id'] for result in data.get('results', []) if result.get('id'))
+        total_pages = data.get('total_pages', 1)
+        page += 1
+    
+    logger.info(f"{len(changed_ids)} movies changed on TMDB since {params['start_date']}")
+    return changed_ids
+
 def get_uk_certification(release_dates):
     """
     Extract the UK certification from release dates data.
@@ -310,6 +640,7 @@ def format_tmdb_data_for_film(tmdb_data):
     """
     formatted_data = {
         'imdb_id': tmdb_data.get('imdb_id', ''),
+        'tmdb_id': tmdb_data.get('id'),
         'title': tmdb_data.get('title', ''),
         'plot': tmdb_data.get('overview', ''),
         'popularity': tmdb_data.get('popularity', 0.0),
@@ -390,47 +721,192 @@ def format_tmdb_data_for_film(tmdb_data):
     
     return formatted_data
 
-def get_now_playing_movies(page=1, sort_by='popularity.desc'):
+def format_discover_movie(movie, movie_details):
     """
-    Get movies that are currently playing in theaters in the UK.
-    Optimized to reduce API calls and improve efficiency.
+    Combine a discover result with its full details into Film model data.
     
-    Args:
-        page (int, optional): Page number to fetch. Defaults to 1.
-        sort_by (str, optional): How to sort the results. Defaults to 'popularity.desc'.
+    Popularity and vote metrics are taken from the discover result, which is
+    more current than the details payload.
     
+    Args:
+        movie (dict): A single result from the discover endpoint
+        movie_details (dict): The movie details from TMDB
+        
     Returns:
-        list: List of movies currently in UK theaters for the specified page
-        int: Total number of pages available
+        dict: Formatted data for Film model
+    """
+    formatted_data = format_tmdb_data_for_film(movie_details)
+    formatted_data['is_in_cinema'] = True  # Mark as in cinema so it appears in the cinema view
+    formatted_data['popularity'] = movie.get('popularity', 0.0)
+    formatted_data['vote_count'] = movie.get('vote_count', 0)
+    formatted_data['vote_average'] = movie.get('vote_average', 0.0)
+    return formatted_data
+
+def format_discover_listing(movie):
     """
-    import logging
-    logger = logging.getLogger(__name__)
+    Format a discover result into Film model data without fetching its details.
     
-    # Use discover endpoint for more sorting flexibility
-    url = get_api_url("discover/movie")
+    Args:
+        movie (dict): A single result from the discover endpoint
+        
+    Returns:
+        dict: The listing fields (TMDB ID, title, popularity, votes, poster and
+              release date) in the shape used by format_tmdb_data_for_film
+    """
+    release_date = movie.get('release_date') or ''
+    poster_path = movie.get('poster_path')
+    return {
+        'tmdb_id': movie.get('id'),
+        'title': movie.get('title', ''),
+        'year': release_date[:4],
+        'release_date': release_date,
+        'poster_url': f"https://image.tmdb.org/t/p/w500{poster_path}" if poster_path else None,
+        'popularity': movie.get('popularity', 0.0),
+        'vote_count': movie.get('vote_count', 0),
+        'vote_average': movie.get('vote_average', 0.0),
+    }
+
+def get_now_playing_params(page=1, sort_by='popularity.desc'):
+    """
+    Build the discover parameters for films currently in UK cinemas.
     
+    Args:
+        page (int, optional): Page number to fetch. Defaults to 1.
+        sort_by (str, optional): How to sort the results. Defaults to 'popularity.desc'.
+        
+    Returns:
+        dict: Query parameters for the discover/movie endpoint
+    """
     # Get current date for release date filtering
     today = datetime.now().strftime("%Y-%m-%d")
-    three_months_ago = (datetime.now() - timedelta(days=90)).strftime("%Y-%m-%d")
+    run_started = (datetime.now() - timedelta(days=getattr(settings, 'CINEMA_RUN_DAYS', 90))).strftime("%Y-%m-%d")
     
-    params = {
-        'api_key': settings.TMDB_API_KEY,
-        'language': 'en-GB',  # British English
+    return {
         'region': 'GB',       # United Kingdom
         'page': page,
         'sort_by': sort_by,   # Sort by specified parameter
         'with_release_type': '2|3',  # Theatrical release
         'release_date.lte': today,
-        'release_date.gte': three_months_ago,  # Only films released in the last 3 months
+        'release_date.gte': run_started,  # Only films released within CINEMA_RUN_DAYS
         'vote_count.gte': 10  # Ensure some minimum votes for quality results
     }
+
+def get_upcoming_params(time_window_months=None, page=1, sort_by='popularity.desc'):
+    """
+    Build the discover parameters for films releasing in the UK in the next X months.
+    
+    Args:
+        time_window_months (int, optional): Number of months to look ahead.
+            If None, uses the UPCOMING_FILMS_MONTHS setting.
+        page (int, optional): Page number to fetch. Defaults to 1.
+        sort_by (str, optional): How to sort the results. Defaults to 'popularity.desc'.
+        
+    Returns:
+        dict: Query parameters for the discover/movie endpoint
+    """
+    # Use the setting if time_window_months is not provided
+    if time_window_months is None:
+        time_window_months = getattr(settings, 'UPCOMING_FILMS_MONTHS', 6)
+    
+    # Calculate date range for upcoming movies
+    today = datetime.now().strftime("%Y-%m-%d")
+    end_date = (datetime.now() + timedelta(days=30 * time_window_months)).strftime("%Y-%m-%d")
+    
+    return {
+        'region': 'GB',       # United Kingdom
+        'page': page,
+        'sort_by': sort_by,
+        'with_release_type': '2|3',  # Theatrical release
+        'release_date.gte': today,
+        'release_date.lte': end_date,
+        'vote_count.gte': 0   # Include films with no votes yet (they're upcoming)
+    }
+
+def get_discover_page(movie_type, page=1, time_window_months=None, sort_by='popularity.desc'):
+    """
+    Fetch one page of the now playing or upcoming discover listing, without movie details.
+    
+    Args:
+        movie_type (str): 'now_playing' or 'upcoming'
+        page (int, optional): Page number to fetch. Defaults to 1.
+        time_window_months (int, optional): For upcoming films, the time window in months
+        sort_by (str, optional): How to sort the results. Defaults to 'popularity.desc'.
+        
+    Returns:
+        list: Raw discover results for the page
+        int: Total number of pages available (0 if the request failed)
+    """
+    if movie_type == 'now_playing':
+        params = get_now_playing_params(page=page, sort_by=sort_by)
+    else:
+        params = get_upcoming_params(time_window_months=time_window_months, page=page, sort_by=sort_by)
+    
+    try:
+        response = get_client().get("discover/movie", params=params)
+        response.raise_for_status()
+        data = response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.error(f"Error fetching {movie_type} discover page {page}: {e}")
+        return [], 0
+    
+    # A successful response always counts as at least one page, so 0 only ever means failure
+    return data.get('results', []), max(data.get('total_pages') or 1, 1)
+
+def get_discover_movie_ids(movie_type, max_pages=0, time_window_months=None):
+    """
+    Collect the TMDB IDs in the now playing or upcoming discover listing.
+    
+    Only the listing pages are fetched (one request per 20 films), no movie details.
+    
+    Args:
+        movie_type (str): 'now_playing' or 'upcoming'
+        max_pages (int, optional): Maximum number of pages to read (0 for all)
+        time_window_months (int, optional): For upcoming films, the time window in months
+        
+    Returns:
+        set: TMDB IDs in the listing, or None if a listing page could not be fetched
+    """
+    movie_ids = set()
+    page = 1
+    total_pages = 1
+    while page <= total_pages and (max_pages <= 0 or page <= max_pages):
+        results, total_pages = get_discover_page(movie_type, page, time_window_months)
+        if not total_pages:
+            # A partial listing would make every film missing from it look out of cinemas
+            logger.error(f"Could not index {movie_type} movies: discover page {page} failed")
+            return None
+        movie_ids.update(movie['id'] for movie in results if movie.get('id'))
+        page += 1
+    
+    logger.info(f"Indexed {len(movie_ids)} {movie_type} movies from {page - 1} discover pages")
+    return movie_ids
+
+def get_now_playing_movies(page=1, sort_by='popularity.desc', listing_only=False):
+    """
+    Get movies that are currently playing in theaters in the UK.
+    Optimized to reduce API calls and improve efficiency.
+    
+    Args:
+        page (int, optional): Page number to fetch. Defaults to 1.
+        sort_by (str, optional): How to sort the results. Defaults to 'popularity.desc'.
+        listing_only (bool, optional): Return the discover rows formatted by
+            format_discover_listing, without fetching movie details.
+    
+    Returns:
+        list: List of movies currently in UK theaters for the specified page
+        int: Total number of pages available
+    """
+    # Use discover endpoint for more sorting flexibility
+    endpoint = "discover/movie"
+    params = get_now_playing_params(page=page, sort_by=sort_by)
     
     movies = []
     total_pages = 1
     
     try:
         logger.info(f"Fetching now playing movies page {page} (sort: {sort_by})")
-        response = requests.get(url, params=params)
+        response = get_client().get(endpoint, params=params)
+        response.raise_for_status()
         data = response.json()
         
         # Store total pages
@@ -444,31 +920,16 @@ def get_now_playing_movies(page=1, sort_by='popularity.desc'):
         results = data.get('results', [])
         logger.info(f"Processing {len(results)} movies from page {page} of {total_pages}")
         
+        if listing_only:
+            # The listing row has everything needed to refresh a known film
+            movies = [format_discover_listing(movie) for movie in results if movie.get('id')]
+            return movies, total_pages
+        
         # Process each movie to get full details
         for movie in results:
-            # Extract basic information from the results to avoid additional API calls when possible
-            basic_data = {
-                'title': movie.get('title', ''),
-                'overview': movie.get('overview', ''),
-                'release_date': movie.get('release_date', ''),
-                'poster_path': movie.get('poster_path'),
-                'popularity': movie.get('popularity', 0.0),
-                'vote_count': movie.get('vote_count', 0),
-                'vote_average': movie.get('vote_average', 0.0),
-                'id': movie.get('id')
-            }
-            
-            # Only make an additional API call if we need more detailed information
-            # that's not available in the basic results
             movie_details = get_movie_details(movie['id'])
             if movie_details:
-                formatted_data = format_tmdb_data_for_film(movie_details)
-                formatted_data['is_in_cinema'] = True
-                # Add popularity and vote metrics from the original results
-                formatted_data['popularity'] = movie.get('popularity', 0.0)
-                formatted_data['vote_count'] = movie.get('vote_count', 0)
-                formatted_data['vote_average'] = movie.get('vote_average', 0.0)
-                movies.append(formatted_data)
+                movies.append(format_discover_movie(movie, movie_details))
         
         logger.info(f"Processed {len(movies)} now playing movies from page {page}")
         
@@ -477,7 +938,7 @@ def get_now_playing_movies(page=1, sort_by='popularity.desc'):
     
     return movies, total_pages
 
-def get_upcoming_movies(time_window_months=None, page=1, sort_by='popularity.desc'):
+def get_upcoming_movies(time_window_months=None, page=1, sort_by='popularity.desc', listing_only=False):
     """
     Get movies scheduled for UK release in the next X months.
     Optimized to reduce API calls and improve efficiency.
@@ -487,44 +948,28 @@ def get_upcoming_movies(time_window_months=None, page=1, sort_by='popularity.des
             If None, uses the UPCOMING_FILMS_MONTHS setting.
         page (int, optional): Page number to fetch. Defaults to 1.
         sort_by (str, optional): How to sort the results. Defaults to 'popularity.desc'.
+        listing_only (bool, optional): Return the discover rows formatted by
+            format_discover_listing, without fetching movie details.
         
     Returns:
         list: List of upcoming movies for the specified page
         int: Total number of pages available
     """
-    from datetime import datetime, timedelta
-    import logging
-    logger = logging.getLogger(__name__)
-    
     # Use the setting if time_window_months is not provided
     if time_window_months is None:
         time_window_months = getattr(settings, 'UPCOMING_FILMS_MONTHS', 6)
     
     # Use discover endpoint for more sorting flexibility
-    url = get_api_url("discover/movie")
-    
-    # Calculate date range for upcoming movies
-    today = datetime.now().strftime("%Y-%m-%d")
-    end_date = (datetime.now() + timedelta(days=30 * time_window_months)).strftime("%Y-%m-%d")
-    
-    params = {
-        'api_key': settings.TMDB_API_KEY,
-        'language': 'en-GB',  # British English
-        'region': 'GB',       # United Kingdom
-        'page': page,
-        'sort_by': sort_by,
-        'with_release_type': '2|3',  # Theatrical release
-        'release_date.gte': today,
-        'release_date.lte': end_date,
-        'vote_count.gte': 0   # Include films with no votes yet (they're upcoming)
-    }
+    endpoint = "discover/movie"
+    params = get_upcoming_params(time_window_months=time_window_months, page=page, sort_by=sort_by)
     
     movies = []
     total_pages = 1
     
     try:
         logger.info(f"Fetching upcoming movies for next {time_window_months} months (page {page}, sort: {sort_by})")
-        response = requests.get(url, params=params)
+        response = get_client().get(endpoint, params=params)
+        response.raise_for_status()
         data = response.json()
         
         # Store total pages
@@ -538,30 +983,16 @@ def get_upcoming_movies(time_window_months=None, page=1, sort_by='popularity.des
         results = data.get('results', [])
         logger.info(f"Processing {len(results)} upcoming movies from page {page} of {total_pages}")
         
+        if listing_only:
+            # The listing row has everything needed to refresh a known film
+            movies = [format_discover_listing(movie) for movie in results if movie.get('id')]
+            return movies, total_pages
+        
         # Process each movie to get full details
         for movie in results:
-            # Extract basic information from the results to avoid additional API calls when possible
-            basic_data = {
-                'title': movie.get('title', ''),
-                'overview': movie.get('overview', ''),
-                'release_date': movie.get('release_date', ''),
-                'poster_path': movie.get('poster_path'),
-                'popularity': movie.get('popularity', 0.0),
-                'vote_count': movie.get('vote_count', 0),
-                'vote_average': movie.get('vote_average', 0.0),
-                'id': movie.get('id')
-            }
-            
-            # Only make an additional API call if we need more detailed information
             movie_details = get_movie_details(movie['id'])
             if movie_details:
-                formatted_data = format_tmdb_data_for_film(movie_details)
-                formatted_data['is_in_cinema'] = True  # Mark as in cinema so it appears in the cinema view
-                # Add popularity and vote metrics from the original results
-                formatted_data['popularity'] = movie.get('popularity', 0.0)
-                formatted_data['vote_count'] = movie.get('vote_count', 0)
-                formatted_data['vote_average'] = movie.get('vote_average', 0.0)
-                movies.append(formatted_data)
+                movies.append(format_discover_movie(movie, movie_details))
         
         logger.info(f"Processed {len(movies)} upcoming movies from page {page}")
         
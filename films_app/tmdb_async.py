@@ -0,0 +1,256 @@
+import asyncio
+import json
+import logging
+import time
+from .tmdb_client import RETRY_STATUSES, get_client, parse_retry_after
+from .tmdb_api import (
+    MOVIE_DETAILS_APPEND, get_cached_movie_details, cache_movie_details,
+    get_now_playing_params, get_upcoming_params, format_discover_listing
+)
+
+# aiohttp is only needed for the async refresh engine
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 20
+
+# Seconds between checks for a free slot in the shared concurrency controller
+SLOT_POLL_SECONDS = 0.01
+
+
+class AsyncTMDBEngine:
+    """
+    Asyncio fetch engine for the cinema cache refresh.
+
+    Discover pages and movie details are fetched concurrently over one shared
+    aiohttp session. The number of requests in flight is set by the shared
+    AdaptiveConcurrency controller, which every request reports its latency
+    and outcome to, so the async engine backs off under throttling and slow
+    responses like the threads engine; max_concurrency is only a ceiling.
+    Base URL, API key, timeout and headers come from the shared TMDBClient,
+    so pointing TMDB_API_BASE_URL at a local stub server works for both
+    engines.
+
+    Usage:
+        async with AsyncTMDBEngine(max_concurrency=20) as engine:
+            movies, pages_fetched, total_pages, pages_failed = await engine.fetch_movies('now_playing', max_pages=5)
+    """
+
+    def __init__(self, max_concurrency=DEFAULT_CONCURRENCY, client=None):
+        if not AIOHTTP_AVAILABLE:
+            raise RuntimeError("The async TMDB engine requires aiohttp (pip install aiohttp)")
+        self.client = client or get_client()
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = self.client.concurrency
+        self.semaphore = None
+        self.session = None
+
+    async def __aenter__(self):
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+            timeout=aiohttp.ClientTimeout(total=self.client.timeout),
+            headers=dict(self.client.session.headers),
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+
+    async def _acquire_slot(self):
+        """Wait for a slot in the shared concurrency controller without blocking the event loop."""
+        while not self.concurrency.try_acquire():
+            await asyncio.sleep(SLOT_POLL_SECONDS)
+
+    async def get_json(self, endpoint, params=None):
+        """
+        Fetch a TMDB endpoint and decode the JSON body.
+
+        Transient failures are retried with the shared client's retry policy,
+        and no request is sent while the shared circuit breaker is open.
+
+        Args:
+            endpoint (str): The API endpoint, e.g. 'movie/550'
+            params (dict, optional): Query parameters in addition to the defaults
+
+        Returns:
+            dict: The decoded response, or None if the request failed
+        """
+        # aiohttp only accepts str, int and float query values
+        query = {key: str(value) for key, value in self.client.build_params(params).items()}
+        policy, breaker, stats = self.client.retry_policy, self.client.breaker, self.client.stats
+        for attempt in range(policy.max_retries + 1):
+            if not breaker.allow_request():
+                logger.warning(f"TMDB circuit breaker is open, not requesting {endpoint}")
+                stats.record_error()
+                return None
+            delay = None
+            async with self.semaphore:
+                # Take a concurrency slot before a rate token so no token is spent waiting
+                await self._acquire_slot()
+                started = time.monotonic()
+                outcome = 'error'
+                try:
+                    # Share the process-wide TMDB quota with the synchronous client
+                    wait = self.client.rate_limiter.reserve()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    started = time.monotonic()
+                    async with self.session.get(self.client.url(endpoint), params=query) as response:
+                        outcome = 'throttled' if response.status == 429 else 'ok'
+                        if response.status >= 500:
+                            breaker.record_failure()
+                        else:
+                            breaker.record_success()
+                        if response.status == 200:
+                            body = await response.read()
+                            stats.record_request(endpoint, response.status, response.content_length or len(body))
+                            try:
+                                return json.loads(body)
+                            except ValueError as e:
+                                # e.g. a truncated body or a proxy's error page; the sync client fails the same way
+                                logger.error(f"TMDB API request for {endpoint} returned invalid JSON: {e}")
+                                stats.record_error()
+                                return None
+                        stats.record_request(endpoint, response.status, response.content_length or 0)
+                        if response.status in RETRY_STATUSES:
+                            delay = policy.backoff(attempt, parse_retry_after(response.headers.get('Retry-After')))
+                        reason = f"HTTP {response.status}"
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if isinstance(e, asyncio.TimeoutError):
+                        outcome = 'timeout'
+                    stats.record_request(endpoint)
+                    breaker.record_failure()
+                    delay = policy.backoff(attempt)
+                    reason = str(e) or type(e).__name__
+                finally:
+                    self.concurrency.release(time.monotonic() - started, outcome)
+            if delay is None or attempt >= policy.max_retries:
+                logger.error(f"TMDB API request for {endpoint} failed: {reason}")
+                stats.record_error()
+                return None
+            stats.record_retry()
+            logger.warning(f"TMDB request {endpoint} failed ({reason}), retry {attempt + 1}/{policy.max_retries} in {delay:.1f}s")
+            # Back off outside the semaphore so other requests can proceed
+            await asyncio.sleep(delay)
+
+    async def fetch_details(self, tmdb_id):
+        """
+        Get movie details, using the shared in-memory and disk caches.
+
+        Args:
+            tmdb_id (int): The TMDB ID of the movie
+
+        Returns:
+            dict: The movie details, or None if they could not be fetched
+        """
+        # The disk cache is SQLite; its reads and writes run in worker threads
+        # so they do not block the event loop
+        data = await asyncio.to_thread(get_cached_movie_details, tmdb_id)
+        if data is not None:
+            return data
+
+        data = await self.get_json(f"movie/{tmdb_id}", {'append_to_response': MOVIE_DETAILS_APPEND})
+        if data:
+            data = await asyncio.to_thread(cache_movie_details, tmdb_id, data)
+        return data
+
+    async def fetch_discover_page(self, movie_type, page, time_window_months=None):
+        """
+        Fetch one discover page for now playing or upcoming films.
+
+        Args:
+            movie_type (str): 'now_playing' or 'upcoming'
+            page (int): Page number to fetch
+            time_window_months (int, optional): For upcoming films, the time window in months
+
+        Returns:
+            tuple: (results, total_pages)
+        """
+        if movie_type == 'now_playing':
+            params = get_now_playing_params(page=page)
+        else:
+            params = get_upcoming_params(time_window_months=time_window_months, page=page)
+
+        data = await self.get_json("discover/movie", params)
+        if not data:
+            return [], 0
+        return data.get('results', []), data.get('total_pages', 1)
+
+    async def _fetch_movie(self, movie, skip_details):
+        """Format a discover result as a listing row and fetch its details unless skipped."""
+        listing = format_discover_listing(movie)
+        if movie['id'] in skip_details:
+            return listing, None
+        return listing, await self.fetch_details(movie['id'])
+
+    async def fetch_movies(self, movie_type, max_pages=0, time_window_months=None, skip_details=frozenset()):
+        """
+        Fetch every discover page and all of their movie details concurrently.
+
+        Args:
+            movie_type (str): 'now_playing' or 'upcoming'
+            max_pages (int): Maximum number of pages to fetch (0 for all)
+            time_window_months (int, optional): For upcoming films, the time window in months
+            skip_details (set, optional): TMDB IDs whose details are not fetched
+
+        Returns:
+            tuple: (movies, pages_fetched, total_pages, pages_failed) where movies
+                   is a list of (format_discover_listing row, details) pairs in
+                   discover order; details is None when skipped or not fetched
+        """
+        first_results, total_pages = await self.fetch_discover_page(movie_type, 1, time_window_months)
+        if not total_pages:
+            return [], 0, 0, 1
+
+        pages_to_fetch = min(max_pages, total_pages) if max_pages > 0 else total_pages
+        logger.info(f"Fetching {pages_to_fetch} of {total_pages} {movie_type} pages")
+
+        other_pages = await asyncio.gather(*[
+            self.fetch_discover_page(movie_type, page, time_window_months)
+            for page in range(2, pages_to_fetch + 1)
+        ])
+        results = list(first_results)
+        pages_failed = 0
+        for page_results, page_total in other_pages:
+            if not page_total:
+                pages_failed += 1
+            results.extend(page_results)
+
+        movies = await asyncio.gather(*[
+            self._fetch_movie(movie, skip_details) for movie in results if movie.get('id')
+        ])
+        logger.info(f"Fetched {len(movies)} {movie_type} movies")
+        return movies, pages_to_fetch - pages_failed, total_pages, pages_failed
+
+
+async def _fetch_cinema_movies(max_pages, time_window_months, max_concurrency, skip_details):
+    async with AsyncTMDBEngine(max_concurrency=max_concurrency) as engine:
+        now_playing, upcoming = await asyncio.gather(
+            engine.fetch_movies('now_playing', max_pages, skip_details=skip_details),
+            engine.fetch_movies('upcoming', max_pages, time_window_months, skip_details=skip_details),
+        )
+    return {'now_playing': now_playing, 'upcoming': upcoming}
+
+
+def fetch_cinema_movies(max_pages=0, time_window_months=None, max_concurrency=DEFAULT_CONCURRENCY,
+                        skip_details=frozenset()):
+    """
+    Fetch now playing and upcoming films with the async engine.
+
+    Args:
+        max_pages (int): Maximum number of discover pages per movie type (0 for all)
+        time_window_months (int, optional): For upcoming films, the time window in months
+        max_concurrency (int): Ceiling on TMDB requests in flight; the shared adaptive
+            concurrency controller sets the actual limit below it
+        skip_details (set, optional): TMDB IDs to return as listing rows without fetching details
+
+    Returns:
+        dict: Maps 'now_playing' and 'upcoming' to (movies, pages_fetched, total_pages, pages_failed)
+    """
+    return asyncio.run(_fetch_cinema_movies(max_pages, time_window_months, max_concurrency, skip_details))
@@ -0,0 +1,423 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_TTL = 3600
+
+# Disk cache defaults: entries live for 7 days and the store is capped at 200 MB
+DEFAULT_DISK_TTL = 7 * 86400
+DEFAULT_DISK_MAX_BYTES = 200 * 1024 * 1024
+
+# Values smaller than this are stored uncompressed; zlib gains little on them
+COMPRESS_MIN_BYTES = 256
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded LRU cache with per-namespace TTLs.
+
+    Entries are keyed by (namespace, key). When the cache is full the least
+    recently used entry is evicted, whatever its namespace. Hits and misses
+    are counted per namespace.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttls=None, default_ttl=DEFAULT_TTL):
+        """
+        Create a cache.
+
+        Args:
+            max_entries (int): Maximum number of entries across all namespaces
+            ttls (dict, optional): Maps namespace to time-to-live in seconds
+            default_ttl (int): TTL for namespaces not listed in ttls
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = {}
+        self._misses = {}
+
+    def ttl_for(self, namespace):
+        """Return the TTL in seconds for a namespace."""
+        return self.ttls.get(namespace, self.default_ttl)
+
+    def get(self, namespace, key, default=None):
+        """
+        Get a value from the cache.
+
+        Args:
+            namespace (str): The cache namespace, e.g. 'search' or 'details'
+            key: The key within the namespace
+            default: Value to return on a miss
+
+        Returns:
+            The cached value, or default if it is missing or expired
+        """
+        cache_key = (namespace, key)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(cache_key)
+                    self._hits[namespace] = self._hits.get(namespace, 0) + 1
+                    return value
+                del self._entries[cache_key]
+            self._misses[namespace] = self._misses.get(namespace, 0) + 1
+            return default
+
+    def set(self, namespace, key, value, ttl=None):
+        """
+        Store a value in the cache.
+
+        Args:
+            namespace (str): The cache namespace
+            key: The key within the namespace
+            value: The value to store
+            ttl (int, optional): Overrides the namespace TTL for this entry
+        """
+        cache_key = (namespace, key)
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.ttl_for(namespace))
+        with self._lock:
+            self._entries[cache_key] = (expires_at, value)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, namespace, key):
+        """Remove a single entry if present."""
+        with self._lock:
+            self._entries.pop((namespace, key), None)
+
+    def clear(self, namespace=None):
+        """
+        Remove all entries, or only those in one namespace.
+
+        Args:
+            namespace (str, optional): Only clear this namespace
+        """
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+            else:
+                for cache_key in [k for k in self._entries if k[0] == namespace]:
+                    del self._entries[cache_key]
+
+    def stats(self):
+        """
+        Return cache statistics.
+
+        Returns:
+            dict: Size, capacity and per-namespace hit/miss counts
+        """
+        with self._lock:
+            namespaces = set(self._hits) | set(self._misses)
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'namespaces': {
+                    namespace: {
+                        'hits': self._hits.get(namespace, 0),
+                        'misses': self._misses.get(namespace, 0),
+                    }
+                    for namespace in sorted(namespaces)
+                },
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class DiskCache:
+    """
+    Persistent TMDB cache in a single SQLite file.
+
+    Replaces the one-JSON-file-per-entry layout: every entry is a row keyed by
+    (namespace, key) with an expiry timestamp, so lookups are a single indexed
+    query and purges are a single DELETE. The database runs in WAL mode, so
+    readers in other processes (gunicorn workers, cron scripts) are not
+    blocked by a writer, and every write is one atomic statement. Values can
+    optionally be zlib-compressed; each row records whether it was.
+
+    Each entry has two deadlines: it is fresh until fresh_until and may still
+    be served (stale, while it is revalidated) until expires_at.
+
+    The cache is only an optimisation, so database errors (a locked or
+    corrupt file) are logged and turn lookups into misses and changes into
+    no-ops instead of failing the caller.
+    """
+
+    SCHEMA_VERSION = 3
+
+    def __init__(self, path, max_bytes=DEFAULT_DISK_MAX_BYTES, default_ttl=DEFAULT_DISK_TTL, compress=False):
+        """
+        Open (and create if needed) a cache database.
+
+        Args:
+            path (str): Path of the SQLite file
+            max_bytes (int): Total value size above which enforce_size_limit() evicts entries
+            default_ttl (int): TTL in seconds for entries stored without one
+            compress (bool): Whether to zlib-compress values of COMPRESS_MIN_BYTES or more
+        """
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.compress = compress
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._create_schema()
+
+    def _connection(self):
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        """Create the entries table, rebuilding it if the schema version changed."""
+        try:
+            conn = self._connection()
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            if version != self.SCHEMA_VERSION:
+                # The store only holds cached API responses, so it is safe to rebuild
+                conn.execute('DROP TABLE IF EXISTS entries')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                ' namespace TEXT NOT NULL,'
+                ' key TEXT NOT NULL,'
+                ' value BLOB NOT NULL,'
+                ' compressed INTEGER NOT NULL DEFAULT 0,'
+                ' size INTEGER NOT NULL,'
+                ' created_at REAL NOT NULL,'
+                ' fresh_until REAL NOT NULL,'
+                ' expires_at REAL NOT NULL,'
+                ' PRIMARY KEY (namespace, key)'
+                ') WITHOUT ROWID'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at)')
+            conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+        except sqlite3.Error as e:
+            # Lookups then miss and writes are dropped, as for any other cache error
+            logger.warning(f"Error creating TMDB cache database {self.path}: {e}")
+
+    def get(self, namespace, key):
+        """
+        Get a value from the cache, whether it is fresh or stale.
+
+        Args:
+            namespace (str): The cache namespace, e.g. 'details' or 'search_results'
+            key: The key within the namespace
+
+        Returns:
+            The cached value, or None if it is missing or expired
+        """
+        entry = self.get_entry(namespace, key)
+        return entry[0] if entry else None
+
+    def get_entry(self, namespace, key):
+        """
+        Get a value from the cache along with its freshness.
+
+        Args:
+            namespace (str): The cache namespace
+            key: The key within the namespace
+
+        Returns:
+            tuple: (value, is_fresh), or None if the entry is missing, expired or corrupt
+        """
+        now = time.time()
+        try:
+            row = self._connection().execute(
+                'SELECT value, compressed, fresh_until FROM entries'
+                ' WHERE namespace = ? AND key = ? AND expires_at > ?',
+                (namespace, str(key), now)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Error reading {namespace} cache entry {key}: {e}")
+            return None
+        if row is None:
+            return None
+        value, compressed, fresh_until = row
+        try:
+            if compressed:
+                value = zlib.decompress(value)
+            value = json.loads(value)
+        except (zlib.error, ValueError) as e:
+            # A corrupt entry is dropped and refetched rather than failing every lookup
+            logger.warning(f"Discarding corrupt {namespace} cache entry {key}: {e}")
+            self.delete(namespace, key)
+            return None
+        return value, fresh_until > now
+
+    def set(self, namespace, key, value, ttl=None, fresh_ttl=None):
+        """
+        Store a value in the cache, replacing any existing entry atomically.
+
+        Args:
+            namespace (str): The cache namespace
+            key: The key within the namespace
+            value: A JSON-serialisable value
+            ttl (int, optional): Time in seconds until the entry expires
+            fresh_ttl (int, optional): Time in seconds until the entry becomes
+                stale, defaults to ttl
+        """
+        payload = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        compressed = self.compress and len(payload) >= COMPRESS_MIN_BYTES
+        if compressed:
+            payload = zlib.compress(payload)
+        now = time.time()
+        ttl = ttl or self.default_ttl
+        fresh_ttl = min(fresh_ttl, ttl) if fresh_ttl is not None else ttl
+        try:
+            self._connection().execute(
+                'INSERT OR REPLACE INTO entries'
+                ' (namespace, key, value, compressed, size, created_at, fresh_until, expires_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (namespace, str(key), payload, int(compressed), len(payload), now, now + fresh_ttl, now + ttl)
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Error writing {namespace} cache entry {key}: {e}")
+
+    def delete(self, namespace, key):
+        """Remove a single entry if present."""
+        try:
+            self._connection().execute(
+                'DELETE FROM entries WHERE namespace = ? AND key = ?', (namespace, str(key))
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Error deleting {namespace} cache entry {key}: {e}")
+
+    def purge(self, namespace=None):
+        """
+        Remove all entries, or only those in one namespace.
+
+        Args:
+            namespace (str, optional): Only purge this namespace
+
+        Returns:
+            int: Number of entries removed
+        """
+        try:
+            conn = self._connection()
+            if namespace is None:
+                return conn.execute('DELETE FROM entries').rowcount
+            return conn.execute('DELETE FROM entries WHERE namespace = ?', (namespace,)).rowcount
+        except sqlite3.Error as e:
+            logger.warning(f"Error purging {namespace or 'all'} cache entries: {e}")
+            return 0
+
+    def evict_expired(self):
+        """
+        Remove all expired entries.
+
+        Returns:
+            int: Number of entries removed
+        """
+        try:
+            return self._connection().execute(
+                'DELETE FROM entries WHERE expires_at <= ?', (time.time(),)
+            ).rowcount
+        except sqlite3.Error as e:
+            logger.warning(f"Error evicting expired cache entries: {e}")
+            return 0
+
+    def enforce_size_limit(self, max_bytes=None):
+        """
+        Evict the entries closest to expiry until the store fits in max_bytes.
+
+        Args:
+            max_bytes (int, optional): Size cap, defaults to the cache's max_bytes
+
+        Returns:
+            int: Number of entries removed
+        """
+        max_bytes = max_bytes or self.max_bytes
+        try:
+            conn = self._connection()
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+            if total <= max_bytes:
+                return 0
+
+            # Walk entries in expiry order and find the cutoff that frees enough space
+            excess = total - max_bytes
+            freed = 0
+            cutoff = None
+            for expires_at, size in conn.execute('SELECT expires_at, size FROM entries ORDER BY expires_at'):
+                freed += size
+                cutoff = expires_at
+                if freed >= excess:
+                    break
+            return conn.execute('DELETE FROM entries WHERE expires_at <= ?', (cutoff,)).rowcount
+        except sqlite3.Error as e:
+            logger.warning(f"Error enforcing the TMDB cache size limit: {e}")
+            return 0
+
+    def stats(self):
+        """
+        Return entry counts and sizes per namespace.
+
+        Returns:
+            dict: Maps namespace to {'entries': int, 'bytes': int}
+        """
+        try:
+            rows = self._connection().execute(
+                'SELECT namespace, COUNT(*), COALESCE(SUM(size), 0) FROM entries GROUP BY namespace'
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Error reading TMDB cache stats: {e}")
+            return {}
+        return {namespace: {'entries': count, 'bytes': size} for namespace, count, size in rows}
+
+
+_memory_cache = None
+_memory_cache_lock = threading.Lock()
+_disk_cache = None
+
+
+def get_memory_cache():
+    """Return the process-wide in-memory TMDB cache, configured from settings."""
+    global _memory_cache
+    if _memory_cache is None:
+        with _memory_cache_lock:
+            if _memory_cache is None:
+                search_ttl = getattr(settings, 'TMDB_CACHE_SEARCH_TTL', 3600)
+                _memory_cache = LRUCache(
+                    max_entries=getattr(settings, 'TMDB_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES),
+                    ttls={
+                        'search': search_ttl,
+                        'search_results': search_ttl,
+                        'details': getattr(settings, 'TMDB_CACHE_DETAILS_TTL', 86400),
+                        'release_dates': getattr(settings, 'TMDB_CACHE_DETAILS_TTL', 86400),
+                    },
+                )
+    return _memory_cache
+
+
+def get_disk_cache():
+    """Return the process-wide persistent TMDB cache, configured from settings."""
+    global _disk_cache
+    if _disk_cache is None:
+        with _memory_cache_lock:
+            if _disk_cache is None:
+                path = getattr(settings, 'TMDB_CACHE_DB_PATH', None) or os.path.join(settings.BASE_DIR, 'cache', 'tmdb_cache.sqlite3')
+                _disk_cache = DiskCache(
+                    path,
+                    max_bytes=getattr(settings, 'TMDB_CACHE_MAX_BYTES', DEFAULT_DISK_MAX_BYTES),
+                    compress=getattr(settings, 'TMDB_CACHE_COMPRESS', True),
+                )
+    return _disk_cache
@@ -0,0 +1,814 @@
+import logging
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://api.themoviedb.org/3"
+DEFAULT_TIMEOUT = 10
+DEFAULT_POOL_SIZE = 10
+DEFAULT_REQUESTS_PER_SECOND = 40
+DEFAULT_CONCURRENCY_INITIAL = 4
+DEFAULT_CONCURRENCY_MIN = 1
+DEFAULT_CONCURRENCY_MAX = 16
+DEFAULT_LATENCY_TOLERANCE = 2.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BASE_DELAY = 0.5
+DEFAULT_RETRY_MAX_DELAY = 30
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_RESET_SECONDS = 30
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of sending a request while the TMDB circuit breaker is open."""
+
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `burst`. Each request
+    takes one token; when the bucket is empty callers wait their turn instead
+    of sleeping for a fixed interval, so throughput tracks the quota exactly.
+    """
+
+    def __init__(self, rate, burst=None):
+        """
+        Create a limiter.
+
+        Args:
+            rate (float): Requests per second. Zero or less disables limiting.
+            burst (int, optional): Bucket capacity. Defaults to one second of requests.
+        """
+        self.rate = rate
+        self.capacity = max(1, burst or int(rate) or 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """
+        Take tokens from the bucket without blocking.
+
+        Args:
+            tokens (int): Number of tokens to take
+
+        Returns:
+            float: Seconds the caller must wait before sending its request
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens=1):
+        """Block until the requested tokens are available."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    """
+    Thread-safe AIMD limit on the number of TMDB requests in flight.
+
+    Every successful request raises the limit by 1/limit, so it grows by about
+    one slot per round of requests while TMDB is healthy. A 429 response, a
+    timeout, or a p95 latency above `latency_tolerance` times the healthy
+    baseline multiplies the limit by `backoff`. Worker pools are sized to
+    `max_limit` and the controller decides how many of their threads may talk
+    to TMDB at once.
+    """
+
+    def __init__(self, initial=DEFAULT_CONCURRENCY_INITIAL, min_limit=DEFAULT_CONCURRENCY_MIN,
+                 max_limit=DEFAULT_CONCURRENCY_MAX, latency_tolerance=DEFAULT_LATENCY_TOLERANCE,
+                 backoff=0.5, latency_window=50):
+        """
+        Create a controller.
+
+        Args:
+            initial (int): Starting limit
+            min_limit (int): The limit never drops below this
+            max_limit (int): The limit never grows above this
+            latency_tolerance (float): Back off when p95 latency exceeds the baseline by this factor
+            backoff (float): Multiplier applied to the limit on congestion
+            latency_window (int): Number of recent latencies the p95 is computed over
+        """
+        self.min_limit = max(1, int(min_limit))
+        self.max_limit = max(self.min_limit, int(max_limit))
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self._limit = float(min(self.max_limit, max(self.min_limit, initial)))
+        self._in_flight = 0
+        self._latencies = deque(maxlen=latency_window)
+        self._baseline_p95 = None
+        self._last_decrease = 0.0
+        self._decreases = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self):
+        """The current number of requests allowed in flight."""
+        return int(self._limit)
+
+    def set_max_limit(self, max_limit):
+        """Change the ceiling, e.g. to honour a --max_workers option."""
+        with self._condition:
+            self.max_limit = max(self.min_limit, int(max_limit))
+            self._limit = min(self._limit, float(self.max_limit))
+            self._condition.notify_all()
+
+    def acquire(self):
+        """Block until a request slot is free and take it."""
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def try_acquire(self):
+        """
+        Take a request slot if one is free, without blocking.
+
+        For callers that must not block, such as the async engine's event loop.
+
+        Returns:
+            bool: True if a slot was taken
+        """
+        with self._condition:
+            if self._in_flight >= int(self._limit):
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self, latency, outcome='ok'):
+        """
+        Free a request slot and adjust the limit from the request's outcome.
+
+        Args:
+            latency (float): Seconds the request took
+            outcome (str): 'ok', 'throttled' (HTTP 429), 'timeout' or 'error'.
+                Errors free the slot without changing the limit.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if outcome in ('throttled', 'timeout'):
+                self._decrease(outcome)
+            elif outcome == 'ok':
+                self._latencies.append(latency)
+                p95 = self._p95()
+                if p95 is not None and self._baseline_p95 and p95 > self._baseline_p95 * self.latency_tolerance:
+                    self._decrease(f'p95 latency {p95:.2f}s')
+                else:
+                    if p95 is not None:
+                        # Track the healthy latency slowly so gradual drift is tolerated
+                        self._baseline_p95 = p95 if self._baseline_p95 is None else 0.9 * self._baseline_p95 + 0.1 * p95
+                    self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+            self._condition.notify_all()
+
+    def _p95(self):
+        """Return the p95 of the latency window, or None until the window is full."""
+        if len(self._latencies) < self._latencies.maxlen:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[math.ceil(0.95 * len(ordered)) - 1]
+
+    def _decrease(self, reason):
+        """Multiplicatively reduce the limit, at most once per congestion event."""
+        now = time.monotonic()
+        # Requests that were already in flight report the same congestion;
+        # wait for the latency window to refill before backing off again
+        if now - self._last_decrease < max(1.0, self._baseline_p95 or 0):
+            return
+        old_limit = self.limit
+        self._limit = max(float(self.min_limit), self._limit * self.backoff)
+        self._last_decrease = now
+        self._decreases += 1
+        self._latencies.clear()
+        logger.info(f"TMDB concurrency reduced from {old_limit} to {self.limit} ({reason})")
+
+    def stats(self):
+        """Return a snapshot of the controller state for logging."""
+        with self._condition:
+            return {
+                'limit': self.limit,
+                'max_limit': self.max_limit,
+                'in_flight': self._in_flight,
+                'baseline_p95': self._baseline_p95,
+                'decreases': self._decreases,
+            }
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header.
+
+    Args:
+        value (str): Either a number of seconds or an HTTP date
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter for transient TMDB failures.
+
+    The n-th retry waits a random time between zero and
+    min(max_delay, base_delay * 2**n), so workers that failed together do not
+    retry together. A Retry-After header from the server takes precedence.
+    """
+
+    def __init__(self, max_retries=DEFAULT_MAX_RETRIES, base_delay=DEFAULT_RETRY_BASE_DELAY,
+                 max_delay=DEFAULT_RETRY_MAX_DELAY):
+        """
+        Create a policy.
+
+        Args:
+            max_retries (int): Retries after the first attempt
+            base_delay (float): Backoff ceiling for the first retry, in seconds
+            max_delay (float): Longest wait before a retry, in seconds
+        """
+        self.max_retries = max(0, int(max_retries))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        Seconds to wait before retrying.
+
+        Args:
+            attempt (int): Zero-based number of the attempt that just failed
+            retry_after (float, optional): Wait requested by the server
+
+        Returns:
+            float: The delay, or None when the server asks for a longer wait
+                than max_delay and the request should not be retried
+        """
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_delay else None
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker for the TMDB API.
+
+    After `failure_threshold` consecutive failures (connection errors,
+    timeouts and 5xx responses) the circuit opens and requests fail
+    immediately with CircuitOpenError, so callers fall back to cached data
+    instead of waiting on timeouts. After `reset_timeout` seconds one probe
+    request is let through; its success closes the circuit, its failure
+    opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=DEFAULT_BREAKER_THRESHOLD, reset_timeout=DEFAULT_BREAKER_RESET_SECONDS):
+        """
+        Create a breaker.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit
+            reset_timeout (float): Seconds the circuit stays open before a probe
+        """
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        """Whether requests are currently being refused."""
+        with self._lock:
+            return self.state == self.OPEN and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def allow_request(self):
+        """
+        Check whether a request may be sent, claiming the probe when one is due.
+
+        Returns:
+            bool: True if the request may be sent
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                # Let exactly one probe through; the others keep failing fast
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        """Record a response from a healthy server and close the circuit."""
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("TMDB circuit breaker closed")
+            self.state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        """Record a failed request, opening the circuit at the threshold."""
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"TMDB circuit breaker opened after {self._failures} consecutive failures")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls into a single execution.
+
+    The first caller for a key runs the function; callers arriving with the
+    same key while it is in flight wait for it and share its result (or its
+    exception). Once the call completes the key is forgotten, so later callers
+    are expected to hit a cache instead.
+    """
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Run func(*args, **kwargs) unless an identical call is already in flight.
+
+        Args:
+            key: Hashable key identifying the call, see request_key()
+            func (callable): The function to run
+
+        Returns:
+            The function's result, shared by every coalesced caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+
+        if not leader:
+            logger.debug(f"Waiting for in-flight TMDB request {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class RequestStats:
+    """
+    Thread-safe counters of TMDB traffic, for run reports.
+
+    Counters only ever grow. A caller measuring one run takes a snapshot()
+    when it starts and passes it to report() when it finishes, so concurrent
+    users of the process-wide instance never reset each other's numbers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    def record_request(self, endpoint, status=None, nbytes=0):
+        """
+        Count one request sent to TMDB.
+
+        Args:
+            endpoint (str): The API endpoint; IDs are folded, see endpoint_label()
+            status (int, optional): HTTP status, or None if no response arrived
+            nbytes (int): Size of the response body
+        """
+        with self._lock:
+            self._counts['calls', endpoint_label(endpoint)] += 1
+            self._counts['bytes'] += nbytes
+            if status == 429:
+                self._counts['throttled'] += 1
+
+    def record_retry(self):
+        """Count a request that is about to be retried."""
+        with self._lock:
+            self._counts['retries'] += 1
+
+    def record_error(self):
+        """Count a request that failed for good, after any retries."""
+        with self._lock:
+            self._counts['errors'] += 1
+
+    def record_cache(self, namespace, hit):
+        """
+        Count a cache lookup.
+
+        Args:
+            namespace (str): Cache namespace, e.g. 'details'
+            hit (bool): Whether the lookup was served from the cache
+        """
+        with self._lock:
+            self._counts['cache', namespace, 'hits' if hit else 'misses'] += 1
+
+    def snapshot(self):
+        """Return a copy of the counters, to pass to report() later."""
+        with self._lock:
+            return Counter(self._counts)
+
+    def report(self, since=None):
+        """
+        Summarise the traffic counted since a snapshot.
+
+        Args:
+            since (Counter, optional): A snapshot() taken earlier; defaults to
+                everything counted by this process
+
+        Returns:
+            dict: calls (per endpoint), total_calls, bytes, retries, errors,
+                  throttled and cache (per namespace hits, misses and hit_ratio)
+        """
+        counts = self.snapshot()
+        if since:
+            counts.subtract(since)
+        calls = {key[1]: n for key, n in counts.items() if key[0] == 'calls' and n > 0}
+        cache = {}
+        for key, n in counts.items():
+            if key[0] == 'cache' and n > 0:
+                cache.setdefault(key[1], {'hits': 0, 'misses': 0})[key[2]] = n
+        for entry in cache.values():
+            entry['hit_ratio'] = round(entry['hits'] / (entry['hits'] + entry['misses']), 3)
+        return {
+            'calls': dict(sorted(calls.items())),
+            'total_calls': sum(calls.values()),
+            'bytes': counts['bytes'],
+            'retries': counts['retries'],
+            'errors': counts['errors'],
+            'throttled': counts['throttled'],
+            'cache': cache,
+        }
+
+
+def endpoint_label(endpoint):
+    """
+    Fold the IDs in a TMDB endpoint so requests can be counted per endpoint.
+
+    Args:
+        endpoint (str): The API endpoint, e.g. 'movie/550' or 'find/tt0137523'
+
+    Returns:
+        str: The endpoint with IDs replaced, e.g. 'movie/{id}'
+    """
+    return re.sub(r'(?<=/)(tt)?\d+(?=/|$)', '{id}', endpoint.strip('/'))
+
+
+def request_key(endpoint, params=None):
+    """
+    Build a hashable key identifying a TMDB request by endpoint and parameters.
+
+    Args:
+        endpoint (str): The API endpoint
+        params (dict, optional): Query parameters
+
+    Returns:
+        tuple: The request key
+    """
+    return (endpoint, tuple(sorted((str(k), str(v)) for k, v in (params or {}).items())))
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Return the process-wide TMDB rate limiter, configured from settings."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = TokenBucket(
+                    rate=getattr(settings, 'TMDB_REQUESTS_PER_SECOND', DEFAULT_REQUESTS_PER_SECOND),
+                    burst=getattr(settings, 'TMDB_RATE_BURST', None),
+                )
+    return _rate_limiter
+
+
+_concurrency = None
+_concurrency_lock = threading.Lock()
+
+
+def get_concurrency_controller():
+    """Return the process-wide TMDB concurrency controller, configured from settings."""
+    global _concurrency
+    if _concurrency is None:
+        with _concurrency_lock:
+            if _concurrency is None:
+                _concurrency = AdaptiveConcurrency(
+                    initial=getattr(settings, 'TMDB_CONCURRENCY_INITIAL', DEFAULT_CONCURRENCY_INITIAL),
+                    min_limit=getattr(settings, 'TMDB_CONCURRENCY_MIN', DEFAULT_CONCURRENCY_MIN),
+                    max_limit=getattr(settings, 'TMDB_CONCURRENCY_MAX', DEFAULT_CONCURRENCY_MAX),
+                    latency_tolerance=getattr(settings, 'TMDB_LATENCY_TOLERANCE', DEFAULT_LATENCY_TOLERANCE),
+                )
+    return _concurrency
+
+
+_circuit_breaker = None
+_circuit_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker():
+    """Return the process-wide TMDB circuit breaker, configured from settings."""
+    global _circuit_breaker
+    if _circuit_breaker is None:
+        with _circuit_breaker_lock:
+            if _circuit_breaker is None:
+                _circuit_breaker = CircuitBreaker(
+                    failure_threshold=getattr(settings, 'TMDB_BREAKER_THRESHOLD', DEFAULT_BREAKER_THRESHOLD),
+                    reset_timeout=getattr(settings, 'TMDB_BREAKER_RESET_SECONDS', DEFAULT_BREAKER_RESET_SECONDS),
+                )
+    return _circuit_breaker
+
+
+_request_stats = RequestStats()
+
+
+def get_request_stats():
+    """Return the process-wide TMDB traffic counters."""
+    return _request_stats
+
+
+class TMDBClient:
+    """
+    HTTP client for the TMDB API backed by a pooled keep-alive session.
+
+    A single client is shared by every function in tmdb_api so that worker
+    threads reuse open connections instead of doing a new TCP+TLS handshake
+    for every request. Every request passes through the process-wide rate
+    limiter, concurrency controller and circuit breaker, and transient
+    failures are retried according to the retry policy.
+    """
+
+    def __init__(self, api_key=None, base_url=None, timeout=None, pool_size=None, language='en-GB'):
+        """
+        Create a client.
+
+        Args:
+            api_key (str, optional): TMDB API key. Defaults to settings.TMDB_API_KEY.
+            base_url (str, optional): API root URL. Defaults to settings.TMDB_API_BASE_URL.
+            timeout (float, optional): Default timeout in seconds for every request.
+            pool_size (int, optional): Maximum number of pooled connections per host.
+            language (str, optional): Default language parameter sent with every request.
+        """
+        self.api_key = api_key if api_key is not None else getattr(settings, 'TMDB_API_KEY', '')
+        self.base_url = (base_url or getattr(settings, 'TMDB_API_BASE_URL', DEFAULT_BASE_URL)).rstrip('/')
+        self.timeout = timeout or getattr(settings, 'TMDB_HTTP_TIMEOUT', DEFAULT_TIMEOUT)
+        self.pool_size = pool_size or getattr(settings, 'TMDB_HTTP_POOL_SIZE', DEFAULT_POOL_SIZE)
+        self.language = language
+        self.rate_limiter = get_rate_limiter()
+        self.concurrency = get_concurrency_controller()
+        self.breaker = get_circuit_breaker()
+        self.stats = get_request_stats()
+        self.retry_policy = RetryPolicy(
+            max_retries=getattr(settings, 'TMDB_MAX_RETRIES', DEFAULT_MAX_RETRIES),
+            base_delay=getattr(settings, 'TMDB_RETRY_BASE_DELAY', DEFAULT_RETRY_BASE_DELAY),
+            max_delay=getattr(settings, 'TMDB_RETRY_MAX_DELAY', DEFAULT_RETRY_MAX_DELAY),
+        )
+        self.session = self._build_session(self.pool_size)
+
+    def _build_session(self, pool_size):
+        """Build a requests session with a connection pool of the given size."""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=False)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+            'User-Agent': 'YourCinemaFilms/1.0',
+        })
+        return session
+
+    def resize_pool(self, pool_size):
+        """
+        Resize the connection pool, e.g. to match a ThreadPoolExecutor's max_workers.
+
+        Args:
+            pool_size (int): The new maximum number of pooled connections
+        """
+        pool_size = max(1, int(pool_size))
+        if pool_size == self.pool_size:
+            return
+        # Requests already in flight keep using the old session until they finish
+        self.session = self._build_session(pool_size)
+        self.pool_size = pool_size
+        logger.debug(f"Resized TMDB connection pool to {pool_size}")
+
+    def url(self, endpoint):
+        """
+        Construct the full URL for a TMDB API endpoint.
+
+        Args:
+            endpoint (str): The API endpoint to access
+
+        Returns:
+            str: The full URL for the API request
+        """
+        return f"{self.base_url}/{endpoint.lstrip('/')}"
+
+    def build_params(self, params=None):
+        """Merge the default parameters (API key and language) with the given ones."""
+        merged = {'api_key': self.api_key, 'language': self.language}
+        if params:
+            merged.update(params)
+        return merged
+
+    def get(self, endpoint, params=None, timeout=None, retries=None):
+        """
+        Send a GET request to a TMDB endpoint.
+
+        429 and 5xx responses and failed requests (connection errors,
+        timeouts) are retried with jittered exponential backoff, honouring
+        Retry-After.
+
+        Args:
+            endpoint (str): The API endpoint, e.g. 'movie/550'
+            params (dict, optional): Query parameters in addition to the defaults
+            timeout (float, optional): Overrides the client's default timeout
+            retries (int, optional): Overrides the retry policy's max_retries,
+                e.g. 0 for interactive requests that should fail fast
+
+        Returns:
+            requests.Response: The HTTP response; the last one if retries ran out
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            requests.exceptions.RequestException: If the request fails
+        """
+        max_retries = self.retry_policy.max_retries if retries is None else retries
+        attempt = 0
+        while True:
+            if not self.breaker.allow_request():
+                self.stats.record_error()
+                raise CircuitOpenError(f"TMDB circuit breaker is open, not requesting {endpoint}")
+            try:
+                response = self._send(endpoint, params, timeout)
+            except requests.exceptions.RequestException as e:
+                self.breaker.record_failure()
+                if attempt >= max_retries:
+                    self.stats.record_error()
+                    raise
+                delay = self.retry_policy.backoff(attempt)
+                reason = str(e)
+            except Exception:
+                # A half-open breaker waits for its probe's outcome, so any
+                # unexpected error must still count against it
+                self.breaker.record_failure()
+                self.stats.record_error()
+                raise
+            else:
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    # A 429 still comes from a healthy server
+                    self.breaker.record_success()
+                if response.status_code not in RETRY_STATUSES or attempt >= max_retries:
+                    return self._final(response)
+                delay = self.retry_policy.backoff(attempt, parse_retry_after(response.headers.get('Retry-After')))
+                if delay is None:
+                    return self._final(response)
+                reason = f"HTTP {response.status_code}"
+            attempt += 1
+            self.stats.record_retry()
+            logger.warning(f"TMDB request {endpoint} failed ({reason}), retry {attempt}/{max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+    def _send(self, endpoint, params=None, timeout=None):
+        """Send a single GET request through the concurrency controller and rate limiter."""
+        # Take a concurrency slot before a rate token so no token is spent waiting
+        self.concurrency.acquire()
+        started = time.monotonic()
+        outcome = 'error'
+        try:
+            self.rate_limiter.acquire()
+            started = time.monotonic()
+            response = self.session.get(
+                self.url(endpoint),
+                params=self.build_params(params),
+                timeout=timeout or self.timeout,
+            )
+            outcome = 'throttled' if response.status_code == 429 else 'ok'
+            # Prefer the size on the wire; compressed bodies are larger once decoded
+            nbytes = response.headers.get('Content-Length')
+            self.stats.record_request(
+                endpoint, response.status_code, int(nbytes) if nbytes and nbytes.isdigit() else len(response.content)
+            )
+            return response
+        except requests.exceptions.Timeout:
+            outcome = 'timeout'
+            self.stats.record_request(endpoint)
+            raise
+        except requests.exceptions.RequestException:
+            self.stats.record_request(endpoint)
+            raise
+        finally:
+            self.concurrency.release(time.monotonic() - started, outcome)
+
+    def _final(self, response):
+        """Count an unsuccessful final response as an error and return it."""
+        if response.status_code >= 400:
+            self.stats.record_error()
+        return response
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide TMDB client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = TMDBClient()
+    return _client
+
+
+def configure_client(pool_size=None, max_concurrency=None):
+    """
+    Adjust the shared client for the current workload.
+
+    Args:
+        pool_size (int, optional): Connection pool size. Defaults to the
+            concurrency ceiling when max_concurrency is given.
+        max_concurrency (int, optional): Ceiling for the adaptive concurrency limit
+
+    Returns:
+        TMDBClient: The shared client
+    """
+    client = get_client()
+    if max_concurrency:
+        client.concurrency.set_max_limit(max_concurrency)
+        pool_size = pool_size or client.concurrency.max_limit
+    if pool_size:
+        with _client_lock:
+            client.resize_pool(pool_size)
+    return client
+
+
+def get_worker_count():
+    """
+    Number of worker threads for a pool of TMDB-bound tasks.
+
+    Pools are sized to the concurrency ceiling; the adaptive limit decides how
+    many of their threads have a request in flight at any moment.
+    """
+    return get_concurrency_controller().max_limit
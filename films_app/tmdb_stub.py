@@ -0,0 +1,276 @@
+import gzip
+import json
+import logging
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import requests
+from django.conf import settings
+from .tmdb_client import endpoint_label
+
+logger = logging.getLogger(__name__)
+
+# Path prefix of the TMDB API version; the stub serves it so that
+# TMDB_API_BASE_URL only needs its host changed
+API_PREFIX = '/3'
+
+# Query parameters that never select a different response
+IGNORED_PARAMS = frozenset({'api_key'})
+
+# Discover queries carry dates relative to today; they are matched on the
+# parameter name only so a bundle recorded on one day replays on another
+DATE_VALUE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+NOT_FOUND_BODY = {
+    'success': False,
+    'status_code': 34,
+    'status_message': 'The resource you requested could not be found.',
+}
+
+
+def bundle_key(endpoint, params=None):
+    """
+    Build the key a TMDB response is stored under in a fixture bundle.
+
+    Args:
+        endpoint (str): The API endpoint, e.g. 'movie/550'
+        params (dict, optional): Query parameters of the request
+
+    Returns:
+        str: The endpoint followed by its normalised, sorted query string
+    """
+    items = sorted(
+        (key, '{date}' if DATE_VALUE.match(str(value)) else str(value))
+        for key, value in (params or {}).items()
+        if key not in IGNORED_PARAMS
+    )
+    endpoint = endpoint.strip('/')
+    return f"{endpoint}?{urlencode(items)}" if items else endpoint
+
+
+class FixtureBundle:
+    """
+    Recorded TMDB responses, keyed by bundle_key().
+
+    Bundles are JSON files, gzip-compressed when the path ends in '.gz'.
+    """
+
+    VERSION = 1
+
+    def __init__(self, responses=None):
+        self._responses = dict(responses or {})
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a bundle from disk.
+
+        Args:
+            path (str): Path of the bundle file
+
+        Returns:
+            FixtureBundle: The loaded bundle
+        """
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data.get('responses', {}))
+
+    def save(self, path):
+        """
+        Write the bundle to disk.
+
+        Args:
+            path (str): Path of the bundle file
+        """
+        with self._lock:
+            data = {
+                'version': self.VERSION,
+                'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                'responses': dict(sorted(self._responses.items())),
+            }
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+
+    def get(self, key):
+        """Return the recorded (status, body) for a key, or None."""
+        with self._lock:
+            entry = self._responses.get(key)
+        return (entry['status'], entry['body']) if entry else None
+
+    def put(self, key, status, body):
+        """Record a response."""
+        with self._lock:
+            self._responses[key] = {'status': status, 'body': body}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._responses)
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    """Hands every GET to the TMDBStubServer it belongs to."""
+
+    def do_GET(self):
+        status, headers, body = self.server.respond(self.path)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+class TMDBStubServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the TMDB API.
+
+    In replay mode responses come from a FixtureBundle, with optional latency
+    and injected 503 and 429 responses so retry, back-off and concurrency
+    behaviour can be measured reproducibly. In record mode requests are
+    forwarded to the real API and the responses added to the bundle.
+
+    Point TMDB_API_BASE_URL at `server.url` to use it.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, bundle, host='127.0.0.1', port=0, upstream=None, latency=0.0, jitter=0.0,
+                 error_rate=0.0, throttle_rate=0.0, seed=None):
+        """
+        Create a server; call start() or serve_forever() to run it.
+
+        Args:
+            bundle (FixtureBundle): Responses to replay, or to record into
+            host (str): Interface to listen on
+            port (int): Port to listen on; 0 picks a free one
+            upstream (str, optional): Real API root URL; enables record mode
+            latency (float): Seconds added to every replayed response
+            jitter (float): Maximum random deviation from latency, in seconds
+            error_rate (float): Share of replayed requests answered with a 503
+            throttle_rate (float): Share of replayed requests answered with a 429
+            seed (int, optional): Seed for injected latency and failures
+        """
+        super().__init__((host, port), _StubRequestHandler)
+        self.bundle = bundle
+        self.upstream = upstream.rstrip('/') if upstream else None
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._session = requests.Session() if upstream else None
+        self._stats_lock = threading.Lock()
+        self._stats = {'requests': 0, 'recorded': 0, 'misses': 0, 'errors_injected': 0, 'throttles_injected': 0}
+        self._endpoints = {}
+        self._thread = None
+
+    @property
+    def url(self):
+        """Base URL to use as TMDB_API_BASE_URL."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self):
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name='tmdb-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the listening socket."""
+        self.shutdown()
+        self.server_close()
+        if self._session:
+            self._session.close()
+
+    def stats(self):
+        """
+        Return request counters.
+
+        Returns:
+            dict: requests, recorded, misses, errors_injected, throttles_injected
+                  and endpoints (requests per endpoint)
+        """
+        with self._stats_lock:
+            return dict(self._stats, endpoints=dict(sorted(self._endpoints.items())))
+
+    def _count(self, name, endpoint=None):
+        with self._stats_lock:
+            self._stats[name] += 1
+            if endpoint is not None:
+                label = endpoint_label(endpoint)
+                self._endpoints[label] = self._endpoints.get(label, 0) + 1
+
+    def respond(self, path):
+        """
+        Build the response to a GET request.
+
+        Args:
+            path (str): Request path and query string
+
+        Returns:
+            tuple: (status, headers, body bytes)
+        """
+        parts = urlsplit(path)
+        endpoint = parts.path
+        if endpoint.startswith(API_PREFIX + '/'):
+            endpoint = endpoint[len(API_PREFIX):]
+        params = dict(parse_qsl(parts.query))
+        self._count('requests', endpoint)
+
+        if self.upstream:
+            return self._record(endpoint, params)
+
+        with self._random_lock:
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            roll = self._random.random()
+        if delay:
+            time.sleep(delay)
+        if roll < self.throttle_rate:
+            self._count('throttles_injected')
+            return self._json(429, {'status_code': 25, 'status_message': 'Your request count is over the allowed limit.'},
+                              {'Retry-After': '1'})
+        if roll < self.throttle_rate + self.error_rate:
+            self._count('errors_injected')
+            return self._json(503, {'status_code': 11, 'status_message': 'Internal error.'})
+
+        entry = self.bundle.get(bundle_key(endpoint, params))
+        if entry is None:
+            self._count('misses')
+            logger.debug(f"No recorded response for {bundle_key(endpoint, params)}")
+            return self._json(404, NOT_FOUND_BODY)
+        return self._json(*entry)
+
+    def _record(self, endpoint, params):
+        """Forward a request to the real API and record its response."""
+        try:
+            response = self._session.get(f"{self.upstream}/{endpoint.lstrip('/')}", params=params, timeout=30)
+            body = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.warning(f"Recording {endpoint} failed: {str(e)}")
+            return self._json(502, {'status_code': 11, 'status_message': str(e)})
+        # Transient failures would be replayed forever, so only keep definite answers
+        if response.status_code in (200, 404):
+            self.bundle.put(bundle_key(endpoint, params), response.status_code, body)
+            self._count('recorded')
+        headers = {'Retry-After': response.headers['Retry-After']} if 'Retry-After' in response.headers else {}
+        return self._json(response.status_code, body, headers)
+
+    def _json(self, status, body, headers=None):
+        return status, dict(headers or {}, **{'Content-Type': 'application/json'}), json.dumps(body).encode('utf-8')
+
+
+def get_default_bundle_path():
+    """Path of the fixture bundle used when none is given, from settings."""
+    return getattr(settings, 'TMDB_STUB_BUNDLE', None)
+
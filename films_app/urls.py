@@ -41,6 +41,7 @@ urlpatterns = [
     path('user/<str:username>/', views.user_profile_view, name='user_profile'),
     path('user-vote-status/', views.get_user_vote_status, name='get_user_vote_status'),
     path('update-cinema-cache/', views.update_cinema_cache, name='update_cinema_cache'),
+    path('background-jobs/<int:job_id>/', views.background_job_status, name='background_job_status'),
     
     # Cinema preferences URLs
     path('cinema_preferences/', views.cinema_preferences, name='cinema_preferences'),
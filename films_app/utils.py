@@ -1,12 +1,11 @@
 import re
 import requests
-import json
 import os
-import time
 from django.conf import settings
 from django.http import HttpResponse
 from .models import Film, GenreTag, Vote
 from .tmdb_api import get_movie_by_imdb_id, search_movies, format_tmdb_data_for_film
+from .tmdb_cache import get_memory_cache, get_disk_cache
 
 # List of common profanity words to filter
 # This is a basic list - in a production environment, you would use a more comprehensive list
@@ -147,11 +146,13 @@ def fetch_and_update_film_from_tmdb(imdb_id, force_update=False):
                 film.uk_certification = formatted_data.get('uk_certification', film.uk_certification)
                 film.uk_release_date = formatted_data.get('uk_release_date', film.uk_release_date)
                 film.popularity = formatted_data.get('popularity', film.popularity)
+                film.tmdb_id = formatted_data.get('tmdb_id') or film.tmdb_id
                 film.save()
             else:
                 # Create new film
                 film = Film(
                     imdb_id=imdb_id,
+                    tmdb_id=formatted_data.get('tmdb_id'),
                     title=formatted_data.get('title', ''),
                     year=formatted_data.get('year', ''),
                     poster_url=formatted_data.get('poster_url', ''),
@@ -180,64 +181,28 @@ def get_cache_directory():
     os.makedirs(cache_dir, exist_ok=True)
     return cache_dir
 
-# In-memory cache for search results with timestamp
-_search_results_cache = {}
 # Cache expiration time in seconds (7 days)
 CACHE_EXPIRATION = 7 * 86400
 
 def get_cached_search_results(query):
     """Get cached search results if available."""
-    # Check in-memory cache first (fastest)
-    cache_entry = _search_results_cache.get(query)
-    if cache_entry:
-        timestamp, results = cache_entry
-        # Check if in-memory cache is still valid
-        if time.time() - timestamp < CACHE_EXPIRATION:
-            return results
+    # Check the shared in-memory cache first (fastest); entries expire after TMDB_CACHE_SEARCH_TTL
+    results = get_memory_cache().get('search_results', query)
+    if results is not None:
+        return results
     
     # Check disk cache only if in-memory cache is not available or expired
-    cache_dir = get_cache_directory()
-    cache_file = os.path.join(cache_dir, f"search_{query.replace(' ', '_')}.json")
-    
-    if os.path.exists(cache_file):
-        # Check if cache is fresh (less than 7 days old)
-        if (os.path.getmtime(cache_file) > (time.time() - CACHE_EXPIRATION)):
-            try:
-                with open(cache_file, 'r') as f:
-                    results = json.load(f)
-                    # Update in-memory cache with timestamp
-                    _search_results_cache[query] = (time.time(), results)
-                    return results
-            except Exception:
-                # If there's an error reading the cache, return None
-                return None
+    results = get_disk_cache().get('search_results', query)
+    if results is not None:
+        # Update in-memory cache
+        get_memory_cache().set('search_results', query, results)
     
-    return None
+    return results
 
 def cache_search_results(query, results):
-    """Cache search results to a JSON file and in-memory."""
-    # Update in-memory cache with current timestamp
-    _search_results_cache[query] = (time.time(), results)
-    
-    # Update disk cache in a separate thread to avoid blocking
-    try:
-        import threading
-        threading.Thread(target=_write_cache_to_disk, args=(query, results)).start()
-    except ImportError:
-        # If threading is not available, write directly
-        _write_cache_to_disk(query, results)
-
-def _write_cache_to_disk(query, results):
-    """Write cache to disk in a separate function that can be run in a thread."""
-    cache_dir = get_cache_directory()
-    cache_file = os.path.join(cache_dir, f"search_{query.replace(' ', '_')}.json")
-    
-    try:
-        with open(cache_file, 'w') as f:
-            json.dump(results, f)
-    except Exception:
-        # Log the error but continue
-        pass
+    """Cache search results in memory and in the disk cache."""
+    get_memory_cache().set('search_results', query, results)
+    get_disk_cache().set('search_results', query, results, ttl=CACHE_EXPIRATION)
 
 def require_http_method(request, method='POST'):
     """
@@ -2,14 +2,12 @@ import json
 import os
 import requests
 import logging
-import sys
 import re
 import base64
 import time
 import urllib.parse
 from datetime import datetime, timedelta, date
 from dateutil.relativedelta import relativedelta
-from io import StringIO
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
@@ -49,7 +47,7 @@ except ImportError:
 from .models import (
     Film, Vote, UserProfile, GenreTag, Activity,
     CinemaVote, PageTracker, Cinema, CinemaPreference,
-    Achievement
+    Achievement, BackgroundJob, RefreshReport
 )
 from .utils import (
     contains_profanity, validate_and_format_genre_tag, require_http_method,
@@ -61,6 +59,7 @@ from .tmdb_api import (
     get_movie_details, format_tmdb_data_for_film,
     search_movies, sort_and_limit_films
 )
+from .jobs import enqueue_job
 
 
 def landing(request):
@@ -497,6 +496,7 @@ def film_detail(request, imdb_id):
                     # Create the film in our database
                     film = Film.objects.create(
                         imdb_id=imdb_id,
+                        tmdb_id=film_data.get('tmdb_id'),
                         title=film_data.get('title', ''),
                         year=film_data.get('year', ''),
                         director=film_data.get('director', ''),
@@ -2019,109 +2019,42 @@ def get_cinema_vote_status(request):
 
 @staff_member_required
 def update_cinema_cache(request):
-    """Update the cinema cache with current and upcoming UK releases."""
+    """Queue a cinema cache refresh and return its progress panel.
+    
+    The refresh runs in the run_background_jobs worker; the panel polls
+    background_job_status until the job finishes.
+    """
     logger = logging.getLogger(__name__)
     
     if request.method != 'POST':
         return HttpResponseNotAllowed(['POST'])
     
-    # Capture command output
-    output = StringIO()
-    sys.stdout = output
-    
-    try:
-        # Clean up cache files before updating
-        logger.info("Cleaning up cache files before update")
-        cleanup_output = cleanup_cache_files()
-        
-        # First run the update_release_status command to flag films that need checking
-        logger.info("Running update_release_status command to flag films for status checks")
-        call_command(
-            'update_release_status',
-            days=7,
-            batch_size=50,
-            use_parallel=True
-        )
-        
-        # Run the management command with optimized parameters
-        logger.info("Starting cinema cache update with optimized parameters")
-        call_command(
-            'update_movie_cache',
-            force=True,
-            max_pages=2,         # Limited to 2 pages for web UI to avoid timeouts
-            batch_size=15,       # Increased batch size for better performance
-            batch_delay=1,       # Reduced delay between batches
-            prioritize_flags=True,
-            time_window_months=6, # 6 months for upcoming films
-            use_parallel=True     # Enable parallel processing
-        )
-        
-        result = f"{cleanup_output}\n\n{output.getvalue()}"
-        status = 'success'
-        logger.info("Cinema cache update completed successfully")
-    except Exception as e:
-        result = f"Error: {str(e)}"
-        status = 'error'
-        logger.error(f"Cinema cache update failed: {str(e)}")
-    finally:
-        sys.stdout = sys.__stdout__
+    # A refresh that is already queued or running is shown instead of queueing another
+    job, created = enqueue_job('refresh_cinema_cache', user=request.user, max_pages=0)
+    if not created:
+        logger.info(f"Cinema cache refresh already pending as {job}")
     
-    # Get the last update timestamp
+    return render(request, 'films_app/partials/cache_update_progress.html', _background_job_context(job))
+
+@staff_member_required
+def background_job_status(request, job_id):
+    """Return the progress panel of a background job, for HTMX polling."""
+    job = get_object_or_404(BackgroundJob, pk=job_id)
+    return render(request, 'films_app/partials/cache_update_progress.html', _background_job_context(job))
+
+def _background_job_context(job):
+    """Template context for the background job progress panel."""
     last_update = None
-    try:
+    if job.status == 'succeeded':
         latest_tracker = PageTracker.objects.order_by('-last_updated').first()
         if latest_tracker:
             last_update = latest_tracker.last_updated
-    except Exception as e:
-        logger.error(f"Error getting last update timestamp: {str(e)}")
-    
-    template = (
-        'films_app/partials/cache_update_success.html'
-        if status == 'success'
-        else 'films_app/partials/cache_update_error.html'
-    )
-    
-    return render(request, template, {
-        'output': result.replace('\n', '<br>'),
-        'last_update': last_update
-    })
-
-def cleanup_cache_files():
-    """Clean up all JSON cache files to ensure fresh data."""
-    import logging
-    import glob
-    import os
-    from films_app.utils import get_cache_directory
-    
-    logger = logging.getLogger(__name__)
-    output = "Cleaning up cache files...\n"
-    
-    # Get cache directory
-    cache_dir = get_cache_directory()
-    
-    # Find all JSON files in the cache directory
-    json_files = glob.glob(os.path.join(cache_dir, "*.json"))
-    
-    # Keep track of how many files were deleted
-    deleted_count = 0
-    
-    # Delete all JSON files except for cache_info.json and cinema_cache_info.json
-    for file_path in json_files:
-        file_name = os.path.basename(file_path)
-        
-        # Skip cache info files
-        if file_name in ['cache_info.json', 'cinema_cache_info.json']:
-            continue
-        
-        try:
-            os.remove(file_path)
-            deleted_count += 1
-            output += f"Deleted cache file: {file_name}\n"
-        except Exception as e:
-            output += f"Error deleting cache file {file_name}: {str(e)}\n"
-    
-    output += f"Cleaned up {deleted_count} cache files\n"
-    return output
+    return {
+        'job': job,
+        'log': job.log if job.is_finished else job.log_tail,
+        'last_update': last_update,
+        'report': RefreshReport.objects.first() if job.is_finished else None,
+    }
 
 def filter_cinema_films(request):
     """Filter cinema films by title."""
@@ -164,6 +164,13 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.environ.get('DJANGO_DB_PATH', os.path.join(BASE_DIR, 'db.sqlite3')),
+        'OPTIONS': {
+            # Take the write lock when a transaction begins, so refresh worker
+            # threads and lease updates wait for each other instead of failing
+            # with "database is locked" when a read transaction turns into a write
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
@@ -313,8 +320,65 @@ else:
 # TMDB API settings
 TMDB_API_KEY = os.environ.get('TMDB_API_KEY', '')
 TMDB_SORT_BY = os.environ.get('TMDB_SORT_BY', 'revenue.desc,vote_count.desc,popularity.desc')
+TMDB_API_BASE_URL = os.environ.get('TMDB_API_BASE_URL', 'https://api.themoviedb.org/3')
+TMDB_HTTP_TIMEOUT = float(os.environ.get('TMDB_HTTP_TIMEOUT', '10'))
+TMDB_HTTP_POOL_SIZE = int(os.environ.get('TMDB_HTTP_POOL_SIZE', '10'))
+# Process-wide TMDB rate limit (token bucket); 0 disables limiting
+TMDB_REQUESTS_PER_SECOND = float(os.environ.get('TMDB_REQUESTS_PER_SECOND', '40'))
+TMDB_RATE_BURST = int(os.environ.get('TMDB_RATE_BURST', '40'))
+# Adaptive (AIMD) limit on concurrent TMDB requests: grows while latency is
+# healthy, halves on 429s, timeouts or a p95 latency above the tolerance factor
+TMDB_CONCURRENCY_INITIAL = int(os.environ.get('TMDB_CONCURRENCY_INITIAL', '4'))
+TMDB_CONCURRENCY_MIN = int(os.environ.get('TMDB_CONCURRENCY_MIN', '1'))
+TMDB_CONCURRENCY_MAX = int(os.environ.get('TMDB_CONCURRENCY_MAX', '16'))
+TMDB_LATENCY_TOLERANCE = float(os.environ.get('TMDB_LATENCY_TOLERANCE', '2.0'))
+# Retries for 429/5xx responses, connection errors and timeouts (jittered
+# exponential backoff, Retry-After honoured up to TMDB_RETRY_MAX_DELAY seconds)
+TMDB_MAX_RETRIES = int(os.environ.get('TMDB_MAX_RETRIES', '3'))
+TMDB_RETRY_BASE_DELAY = float(os.environ.get('TMDB_RETRY_BASE_DELAY', '0.5'))
+TMDB_RETRY_MAX_DELAY = float(os.environ.get('TMDB_RETRY_MAX_DELAY', '30'))
+# Circuit breaker: stop calling TMDB after this many consecutive failures and
+# serve cached data until a probe request succeeds
+TMDB_BREAKER_THRESHOLD = int(os.environ.get('TMDB_BREAKER_THRESHOLD', '5'))
+TMDB_BREAKER_RESET_SECONDS = float(os.environ.get('TMDB_BREAKER_RESET_SECONDS', '30'))
+
+# In-memory TMDB cache (per process): maximum entries and TTLs in seconds
+TMDB_CACHE_MAX_ENTRIES = int(os.environ.get('TMDB_CACHE_MAX_ENTRIES', '2000'))
+TMDB_CACHE_SEARCH_TTL = int(os.environ.get('TMDB_CACHE_SEARCH_TTL', '3600'))
+TMDB_CACHE_DETAILS_TTL = int(os.environ.get('TMDB_CACHE_DETAILS_TTL', '86400'))
+
+# Persistent TMDB cache: a single SQLite file shared by all processes
+TMDB_CACHE_DB_PATH = os.environ.get('TMDB_CACHE_DB_PATH', os.path.join(BASE_DIR, 'cache', 'tmdb_cache.sqlite3'))
+TMDB_CACHE_MAX_BYTES = int(os.environ.get('TMDB_CACHE_MAX_BYTES', str(200 * 1024 * 1024)))
+TMDB_CACHE_COMPRESS = os.environ.get('TMDB_CACHE_COMPRESS', 'True') == 'True'
+
+# Movie details freshness (seconds): films releasing within 30 days, the
+# default, and catalogue titles released over a year ago. Stale details are
+# served for up to TMDB_DETAILS_STALE_TTL while being revalidated in the background.
+TMDB_DETAILS_TTL_RECENT = int(os.environ.get('TMDB_DETAILS_TTL_RECENT', str(6 * 3600)))
+TMDB_DETAILS_TTL_DEFAULT = int(os.environ.get('TMDB_DETAILS_TTL_DEFAULT', '86400'))
+TMDB_DETAILS_TTL_CATALOGUE = int(os.environ.get('TMDB_DETAILS_TTL_CATALOGUE', str(30 * 86400)))
+TMDB_DETAILS_STALE_TTL = int(os.environ.get('TMDB_DETAILS_STALE_TTL', str(7 * 86400)))
+TMDB_REVALIDATE_WORKERS = int(os.environ.get('TMDB_REVALIDATE_WORKERS', '4'))
+
+# Known films whose stored details are younger than this are refreshed from the
+# discover listing alone, without a details request; 0 always fetches details
+TMDB_DETAILS_FRESH_DAYS = int(os.environ.get('TMDB_DETAILS_FRESH_DAYS', '7'))
+
+# Recorded TMDB responses replayed by the tmdb_stub and benchmark_refresh commands
+TMDB_STUB_BUNDLE = os.environ.get('TMDB_STUB_BUNDLE', os.path.join(BASE_DIR, 'fixtures', 'tmdb_bundle.json.gz'))
+
+# Database leases for cache refreshes (seconds). The refresh lease and the
+# discover page leases are renewed by heartbeats while they are held.
+REFRESH_LEASE_TTL = int(os.environ.get('REFRESH_LEASE_TTL', '300'))
+PAGE_LEASE_TTL = int(os.environ.get('PAGE_LEASE_TTL', '300'))
+# A running background job whose worker has not renewed its lease for this
+# long is considered abandoned and failed, so a new one can be queued
+JOB_LEASE_TTL = int(os.environ.get('JOB_LEASE_TTL', '300'))
 
 # Cinema settings - consolidated
+# Films are treated as showing in cinemas for this many days after their UK release
+CINEMA_RUN_DAYS = int(os.environ.get('CINEMA_RUN_DAYS', '90'))
 UPCOMING_FILMS_MONTHS = int(os.environ.get('UPCOMING_FILMS_MONTHS', '6'))
 MAX_CINEMA_FILMS = int(os.environ.get('MAX_CINEMA_FILMS', '20'))
 CACHE_UPDATE_INTERVAL_MINUTES = int(os.environ.get('CACHE_UPDATE_INTERVAL_MINUTES', '15'))
@@ -8,7 +8,6 @@ import os
 import sys
 import django
 import logging
-import glob
 import time
 import concurrent.futures
 from datetime import datetime, timedelta
@@ -30,95 +29,11 @@ django.setup()
 
 # Now we can import Django-specific modules
 from django.core.management import call_command
-from django.core.cache import cache
-from django.db.models import Q, Count
+from django.db.models import Count
 from django.utils import timezone
 from films_app.models import PageTracker, Film
-from films_app.utils import get_cache_directory
-
-# Lock key for preventing duplicate runs
-LOCK_KEY = 'cinema_cache_update_lock'
-LOCK_TIMEOUT = 3600  # 1 hour in seconds
-
-def cleanup_old_cache_files():
-    """Clean up all JSON cache files daily to ensure fresh data."""
-    logger.info("Cleaning up cache files")
-    
-    # Get cache directory
-    cache_dir = get_cache_directory()
-    
-    # Find all JSON files in the cache directory
-    json_files = glob.glob(os.path.join(cache_dir, "*.json"))
-    
-    # Keep track of how many files were deleted
-    deleted_count = 0
-    
-    # Delete all JSON files except for cache_info.json and cinema_cache_info.json
-    for file_path in json_files:
-        file_name = os.path.basename(file_path)
-        
-        # Skip cache info files
-        if file_name in ['cache_info.json', 'cinema_cache_info.json']:
-            continue
-        
-        try:
-            os.remove(file_path)
-            deleted_count += 1
-            logger.info(f"Deleted cache file: {file_name}")
-        except Exception as e:
-            logger.warning(f"Error deleting cache file {file_name}: {str(e)}")
-    
-    logger.info(f"Cleaned up {deleted_count} cache files")
-
-def optimize_status_check_flags():
-    """
-    Optimize which films need status checks by using smarter filtering.
-    This reduces the number of films that need to be checked against the API.
-    """
-    logger.info("Optimizing status check flags")
-    today = timezone.now().date()
-    
-    # Get the count before optimization
-    initial_count = Film.objects.filter(needs_status_check=True).count()
-    logger.info(f"Initial films flagged for status checks: {initial_count}")
-    
-    # Clear flags for films that were checked recently (within the last 3 days)
-    # This prevents checking the same films too frequently
-    recent_check_cutoff = today - timedelta(days=3)
-    
-    # Use bulk update to clear flags for recently checked films
-    recently_checked_films = Film.objects.filter(
-        needs_status_check=True,
-        last_status_check__gte=recent_check_cutoff
-    )
-    
-    # Only perform the update if there are films to update
-    recently_checked_count = recently_checked_films.count()
-    if recently_checked_count > 0:
-        recently_checked_films.update(needs_status_check=False)
-        logger.info(f"Cleared status check flags for {recently_checked_count} recently checked films")
-    
-    # Prioritize films with upcoming or recent release dates
-    priority_window = today + timedelta(days=30)  # Next 30 days
-    past_window = today - timedelta(days=14)      # Last 14 days
-    
-    # Flag films with release dates in the priority window
-    priority_films = Film.objects.filter(
-        Q(uk_release_date__gte=past_window) & 
-        Q(uk_release_date__lte=priority_window) &
-        Q(needs_status_check=False)
-    )
-    
-    priority_count = priority_films.count()
-    if priority_count > 0:
-        priority_films.update(needs_status_check=True)
-        logger.info(f"Flagged {priority_count} priority films with upcoming/recent release dates")
-    
-    # Get the final count after optimization
-    final_count = Film.objects.filter(needs_status_check=True).count()
-    logger.info(f"Final films flagged for status checks after optimization: {final_count}")
-    
-    return final_count
+from films_app.jobs import cleanup_cache_files
+from films_app.leases import REFRESH_LEASE, LeaseUnavailable, hold_lease
 
 def optimize_database_queries():
     """
@@ -163,88 +78,73 @@ def main():
     start_time = timezone.now()
     logger.info(f"Starting cinema cache update at {start_time}")
     
-    # Check if another update process is already running
-    if cache.get(LOCK_KEY):
-        logger.warning("Another update process is already running. Exiting.")
+    # Hold the database refresh lease so the web-triggered refresh and other
+    # hosts cannot run at the same time; update_movie_cache re-enters it
+    try:
+        with hold_lease(REFRESH_LEASE):
+            return run_update(start_time)
+    except LeaseUnavailable as e:
+        logger.warning(f"Another update process is already running ({e.holder}). Exiting.")
         return 0
-    
-    # Set a lock to prevent duplicate runs
-    cache.set(LOCK_KEY, True, LOCK_TIMEOUT)
-    
+
+def run_update(start_time):
+    """Clean up, schedule status checks and run update_movie_cache."""
+    # Check if an update was performed recently
     try:
-        # Check if an update was performed recently
-        try:
-            # Get the most recently updated tracker
-            latest_tracker = PageTracker.objects.order_by('-last_updated').first()
-            
-            # Get the cache update interval from settings
-            from django.conf import settings
-            cache_interval = getattr(settings, 'CACHE_UPDATE_INTERVAL_MINUTES', 1440)  # Default to 24 hours
-            
-            if latest_tracker and (timezone.now() - latest_tracker.last_updated) < timedelta(minutes=cache_interval):
-                logger.info(f"Skipping update - last update was at {latest_tracker.last_updated}, less than {cache_interval} minutes ago")
-                return 0
-        except Exception as e:
-            logger.warning(f"Error checking last update time: {str(e)}")
+        # Get the most recently updated tracker
+        latest_tracker = PageTracker.objects.order_by('-last_updated').first()
         
-        # Clean up cache files before updating
-        logger.info("Cleaning up cache files before update")
-        cleanup_old_cache_files()
+        # Get the cache update interval from settings
+        from django.conf import settings
+        cache_interval = getattr(settings, 'CACHE_UPDATE_INTERVAL_MINUTES', 1440)  # Default to 24 hours
         
-        # Perform database optimizations
-        optimize_database_queries()
-        
-        # Optimize which films need status checks
-        flagged_count = optimize_status_check_flags()
-        logger.info(f"Optimized status check flags: {flagged_count} films flagged for checking")
-        
-        # First, run the update_release_status command to flag films that need checking
-        try:
-            logger.info("Running update_release_status command to flag films for status checks")
-            call_command(
-                'update_release_status',
-                days=7,
-                batch_size=50,
-                use_parallel=True
-            )
-        except Exception as e:
-            logger.warning(f"Error running update_release_status: {str(e)}")
+        if latest_tracker and (timezone.now() - latest_tracker.last_updated) < timedelta(minutes=cache_interval):
+            logger.info(f"Skipping update - last update was at {latest_tracker.last_updated}, less than {cache_interval} minutes ago")
+            return 0
+    except Exception as e:
+        logger.warning(f"Error checking last update time: {str(e)}")
+    
+    # Clean up cache files before updating
+    logger.info("Cleaning up cache files before update")
+    cleanup_cache_files()
+    
+    # Perform database optimizations
+    optimize_database_queries()
+    
+    # First, run the update_release_status command to reschedule status checks
+    try:
+        logger.info("Running update_release_status command to schedule status checks")
+        call_command('update_release_status')
+    except Exception as e:
+        logger.warning(f"Error running update_release_status: {str(e)}")
+    
+    # Get the count of films due for a status check
+    due_count = Film.status_check_due().count()
+    logger.info(f"Found {due_count} films due for status checks")
+    
+    try:
+        # Run the management command with improved parameters
+        logger.info("Starting cinema cache update with optimized parameters")
         
-        # Get the count of films flagged for status checks
-        flagged_count = Film.objects.filter(needs_status_check=True).count()
-        logger.info(f"Found {flagged_count} films flagged for status checks")
+        # Process all films with optimized parameters
+        call_command(
+            'update_movie_cache',
+            force=True,
+            max_pages=0,         # Process all available pages (0 means all)
+            batch_size=15,       # Batch size for processing
+            prioritize_flags=True,
+            time_window_months=6, # 6 months for upcoming films
+            use_parallel=True,    # Enable parallel processing; concurrency adapts up to TMDB_CONCURRENCY_MAX
+            resume=True           # Continue an interrupted run instead of starting over
+        )
         
-        try:
-            # Run the management command with improved parameters
-            logger.info("Starting cinema cache update with optimized parameters")
-            
-            # Add explicit ThreadPoolExecutor configuration
-            max_workers = max(1, min(32, (os.cpu_count() or 1) * 4))  # Ensure at least 1 worker, max 32
-            
-            # Process all films with optimized parameters
-            call_command(
-                'update_movie_cache',
-                force=True,
-                max_pages=0,         # Process all available pages (0 means all)
-                batch_size=15,       # Batch size for processing
-                batch_delay=1,       # Delay between batches
-                prioritize_flags=True,
-                time_window_months=6, # 6 months for upcoming films
-                use_parallel=True,    # Enable parallel processing
-                max_workers=max_workers  # Add explicit max_workers parameter
-            )
-            
-            end_time = timezone.now()
-            duration = end_time - start_time
-            logger.info(f"Cinema cache update completed successfully in {duration}")
-            return 0
-        except Exception as e:
-            logger.error(f"Error updating cinema cache: {str(e)}")
-            return 1
-    finally:
-        # Release the lock when done
-        cache.delete(LOCK_KEY)
-        logger.info("Released update lock")
+        end_time = timezone.now()
+        duration = end_time - start_time
+        logger.info(f"Cinema cache update completed successfully in {duration}")
+        return 0
+    except Exception as e:
+        logger.error(f"Error updating cinema cache: {str(e)}")
+        return 1
 
 if __name__ == "__main__":
     sys.exit(main()) 
\ No newline at end of file
@@ -15,8 +15,8 @@ docker exec $(docker ps -qf "name=yourcinemafilms_web") bash -c "echo '=== Cinem
 
 # First run the update_release_status command to flag films that need checking
 echo "Running update_release_status command via Docker..."
-docker-compose exec -T web bash -c "echo 'Running update_release_status command...' >> $LOG_FILE && python manage.py update_release_status --days=7 --batch-size=50 --use-parallel >> $LOG_FILE 2>&1" || \
-docker exec $(docker ps -qf "name=yourcinemafilms_web") bash -c "echo 'Running update_release_status command...' >> $LOG_FILE && python manage.py update_release_status --days=7 --batch-size=50 --use-parallel >> $LOG_FILE 2>&1"
+docker-compose exec -T web bash -c "echo 'Running update_release_status command...' >> $LOG_FILE && python manage.py update_release_status >> $LOG_FILE 2>&1" || \
+docker exec $(docker ps -qf "name=yourcinemafilms_web") bash -c "echo 'Running update_release_status command...' >> $LOG_FILE && python manage.py update_release_status >> $LOG_FILE 2>&1"
 
 # Run the Django management command using Docker with optimized parameters
 echo "Running update_movie_cache command via Docker with optimized parameters..."